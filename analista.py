@@ -0,0 +1,249 @@
+"""Analista Virtual: respostas locais para perguntas comuns e análises do Gemini em segundo plano.
+
+O SDK do Gemini só é importado quando uma pergunta realmente precisa da IA (ver GeminiAnalista),
+então abrir o Dashboard não paga essa importação.
+"""
+import hashlib
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import streamlit as st
+
+import respostas_rapidas
+from formatacao import normalizar_texto
+from nucleo import CacheLeituras, cancelar_analise, rastreador
+from sandbox_analista import ErroSandbox, executar_codigo
+
+# --- CLASSE ANALISTA VIRTUAL ---
+MODELO_REVALIDAR_SEGUNDOS = 3600
+RESPOSTAS_TTL_SEGUNDOS = 3600
+RESPOSTAS_MAX_ENTRADAS = 500
+
+class GeminiAnalista:
+    def __init__(self, api_key):
+        # Importado só na primeira pergunta que vai à IA: o SDK é a importação mais cara do app
+        import google.generativeai as genai
+        self.genai = genai
+        genai.configure(api_key=api_key)
+        self._lock = threading.Lock()
+        self._resolver_modelo()
+
+    def _resolver_modelo(self):
+        self.model_name = self._obter_modelo_disponivel()
+        self.model = self.genai.GenerativeModel(self.model_name)
+        self.resolvido_em = time.monotonic()
+
+    def revalidar(self):
+        """Relista os modelos de tempos em tempos (a instância é compartilhada pelo processo)"""
+        if time.monotonic() - self.resolvido_em < MODELO_REVALIDAR_SEGUNDOS: return
+        with self._lock:
+            if time.monotonic() - self.resolvido_em >= MODELO_REVALIDAR_SEGUNDOS:
+                self._resolver_modelo()
+
+    def _obter_modelo_disponivel(self):
+        try:
+            for m in self.genai.list_models():
+                if 'generateContent' in m.supported_generation_methods:
+                    if 'gemini' in m.name: return m.name
+            return 'gemini-pro'
+        except: return 'gemini-pro'
+
+    def analisar(self, df, pergunta, nome_empresa, historico_chat=None, ao_receber=None, ao_status=None, cancelar=None):
+        """Roda fora da thread do Streamlit: o texto gerado é repassado a `ao_receber` conforme chega,
+        avisos de espera vão para `ao_status` e o Event `cancelar` interrompe esperas e o streaming"""
+        from google.api_core import exceptions as google_exceptions
+
+        def esperar(segundos, aviso):
+            if ao_status: ao_status(aviso)
+            with rastreador.span("gemini.espera", segundos=segundos):
+                if cancelar: return cancelar.wait(segundos)
+                time.sleep(segundos)
+            return False
+
+        df_view = df.copy()
+        for col in df_view.columns:
+            if pd.api.types.is_datetime64_any_dtype(df_view[col]):
+                df_view[col] = df_view[col].dt.strftime('%Y-%m-%d')
+        
+        info = df_view.dtypes.to_string()
+        head = df_view.head(3).to_string()
+        detalhe = ""
+        if 'vendedor' in df_view.columns:
+            detalhe = ("Cada linha é o total de um dia para um vendedor e canal ('' = não informado); "
+                       "'qtd' é o número de vendas somadas na linha.")
+
+        contexto_str = ""
+        if historico_chat:
+            ultimas = historico_chat[-4:]
+            for msg in ultimas:
+                role = "Usuário" if msg["role"] == "user" else "IA"
+                contexto_str += f"{role}: {msg['content']}\n"
+
+        prompt = f"""
+        Você é um Analista de Dados Python Sênior.
+        
+        DADOS DISPONÍVEIS (Apenas desta empresa):
+        Colunas: {info}
+        Amostra: {head}
+        {detalhe}
+        
+        HISTÓRICO DA CONVERSA:
+        {contexto_str}
+        
+        PERGUNTA ATUAL: "{pergunta}"
+        
+        REGRAS DE OURO:
+        1. Para perguntas sobre tempo (Dia, Mês, Ano, Dia da Semana), AGRUPE e SOME os valores.
+           Ex: df.groupby('data_venda')['valor_venda'].sum()
+        
+        2. IMPORTANTE: O Pandas retorna dias em Inglês. Se a resposta tiver dias da semana, TRADUZA PARA PORTUGUÊS (ex: Monday->Segunda).
+        
+        3. Salve a resposta final (texto formatado) na variável 'resultado'.
+        4. Formate dinheiro como "R$ X.XXX,XX".
+        5. Retorne APENAS o código Python. Sem markdown.
+        """
+
+        modelo = self.model
+        max_tentativas = 3
+        for tentativa in range(max_tentativas):
+            try:
+                gerado = ""
+                with rastreador.span("gemini.gerar", tentativa=tentativa + 1, modelo=modelo.model_name):
+                    for parte in modelo.generate_content(prompt, stream=True):
+                        if cancelar and cancelar.is_set(): return "Análise cancelada.", False
+                        gerado += parte.text
+                        if ao_receber: ao_receber(gerado)
+                codigo = re.sub(r"```python|```", "", gerado).strip()
+                if ao_status: ao_status("Executando análise...")
+                
+                # Código gerado roda num processo isolado, com limites de CPU, memória e saída
+                try:
+                    with rastreador.span("sandbox.executar"):
+                        resposta_final = executar_codigo(codigo, df)
+                except ErroSandbox as e:
+                    return f"⚠️ {e}", False
+                
+                if resposta_final is not None:
+                    return f"{resposta_final}\n\n*Você está consultando dados da empresa: {nome_empresa}*", True
+                else:
+                    return "O código rodou mas não gerou a resposta.", False
+
+            except google_exceptions.ResourceExhausted:
+                wait_time = (tentativa + 1) * 8
+                if esperar(wait_time, f"Alta demanda na IA... Aguardando {wait_time}s..."): return "Análise cancelada.", False
+                if tentativa == 1: modelo = self.genai.GenerativeModel('gemini-pro')
+                continue
+                
+            except Exception as e:
+                if "429" in str(e) or "quota" in str(e).lower():
+                    if esperar(5, "Limite de uso da IA... Aguardando 5s..."): return "Análise cancelada.", False
+                    continue
+                return f"Erro técnico: {str(e)}", False
+        
+        return "⚠️ O sistema de IA está sobrecarregado no momento. Tente novamente em 1 minuto.", False
+
+@st.cache_resource
+def get_analista(api_key):
+    # Cliente configurado e modelo resolvido uma vez por processo
+    return GeminiAnalista(api_key)
+
+@st.cache_resource
+def init_cache_respostas():
+    cfg = st.secrets.get("analista", {})
+    return CacheLeituras(
+        ttl=cfg.get("respostas_ttl_segundos", RESPOSTAS_TTL_SEGUNDOS),
+        max_entradas=cfg.get("respostas_max_entradas", RESPOSTAS_MAX_ENTRADAS),
+        rotulo="resposta"
+    )
+
+cache_respostas = init_cache_respostas()
+
+def fingerprint_df(df):
+    return hashlib.sha1(pd.util.hash_pandas_object(df, index=False).values.tobytes()).hexdigest()
+
+def resposta_rapida(company_id, df, pergunta, nome_empresa, contexto):
+    """Perguntas comuns (melhor dia, total, quanto falta...) respondidas localmente a partir de
+    agregados do mês, sem ida ao Gemini. Retorna None se a pergunta não for reconhecida"""
+    params = {"df": fingerprint_df(df)}
+    agregados = cache_respostas.obter(
+        company_id, "agregados", params, lambda: respostas_rapidas.calcular_agregados(df)
+    )
+    return respostas_rapidas.responder(pergunta, agregados, contexto, nome_empresa)
+
+# --- ANÁLISES EM SEGUNDO PLANO ---
+ANALISTA_WORKERS = 4
+
+class TarefaAnalise:
+    """Estado de uma pergunta em andamento, compartilhado entre o worker e a sessão"""
+    def __init__(self, pergunta):
+        self.pergunta = pergunta
+        self.parcial = ""
+        self.status = "Analisando dados..."
+        self.resposta = None
+        self.concluida = False
+        self.cancelar = threading.Event()
+        self.future = None
+        self.entregue = False  # Resposta já copiada para o histórico do chat
+
+@st.cache_resource
+def init_pool_analista():
+    workers = st.secrets.get("analista", {}).get("workers", ANALISTA_WORKERS)
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="analista")
+
+def _executar_analise(tarefa, analista, company_id, params, df, nome_empresa, historico):
+    try:
+        # Roda no pool: o span é a raiz desta thread, com tentativas, esperas e o sandbox dentro
+        with rastreador.span("analista.analisar", pagina="Dashboard", tenant=company_id):
+            analista.revalidar()
+            resposta, sucesso = analista.analisar(
+                df, tarefa.pergunta, nome_empresa, historico,
+                ao_receber=lambda texto: setattr(tarefa, 'parcial', texto),
+                ao_status=lambda msg: setattr(tarefa, 'status', msg),
+                cancelar=tarefa.cancelar
+            )
+        if sucesso: cache_respostas.guardar(company_id, "analista", params, resposta)
+    except Exception as e:
+        resposta = f"Erro técnico: {str(e)}"
+    tarefa.resposta = resposta
+    tarefa.concluida = True
+
+def responder_pergunta(company_id, df, pergunta, nome_empresa, historico_chat=None):
+    """Responde na hora pelo cache (empresa, conteúdo do df, pergunta normalizada). Senão dispara a
+    análise no pool de workers e retorna None; o andamento aparece em `acompanhar_analise`"""
+    params = {"df": fingerprint_df(df), "pergunta": normalizar_texto(pergunta)}
+    resposta = cache_respostas.consultar(company_id, "analista", params)
+    if resposta is not None: return resposta
+
+    cancelar_analise()  # Uma nova pergunta substitui a que estava pendente
+    analista = get_analista(st.secrets["google"]["api_key"])
+    tarefa = TarefaAnalise(pergunta)
+    tarefa.future = init_pool_analista().submit(
+        _executar_analise, tarefa, analista, company_id, params, df.copy(), nome_empresa, list(historico_chat or [])
+    )
+    st.session_state.tarefa_analise = tarefa
+    return None
+
+def entregar_resposta(tarefa):
+    if not tarefa.entregue:
+        tarefa.entregue = True
+        st.session_state.chat_history.append({"role": "assistant", "content": tarefa.resposta})
+
+@st.fragment(run_every=0.5)
+def acompanhar_analise():
+    # Só este trecho reroda enquanto a resposta não chega; o resto do painel segue interativo
+    tarefa = st.session_state.get('tarefa_analise')
+    if tarefa is None: return
+    if tarefa.concluida:
+        # Exibe aqui mesmo, sem rerodar a página; o chat passa a mostrá-la pelo histórico
+        entregar_resposta(tarefa)
+        with st.chat_message("assistant"): st.markdown(tarefa.resposta)
+        return
+    with st.chat_message("assistant"):
+        st.caption(f"⏳ {tarefa.status}")
+        if tarefa.parcial: st.code(re.sub(r"```python|```", "", tarefa.parcial).strip(), language="python")
+        if st.button("⏹️ Cancelar", key="cancelar_analise"):
+            cancelar_analise()
+            st.rerun(scope="fragment")
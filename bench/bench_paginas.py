@@ -0,0 +1,209 @@
+"""Benchmark por página do app, rodando headless via Streamlit AppTest contra um tenant sintético.
+
+Uso:
+    python bench/bench_paginas.py --anos 5 --feriados 200 --membros 100 --reruns 5 --saida bench.json
+    python bench/bench_paginas.py --saida novo.json --comparar bench.json
+    python bench/bench_paginas.py --vendas-dia 500 --saida transacoes.json --comparar bench.json
+
+Para cada página mede, por rerun: tempo total, chamadas ao backend (round trips) e a
+divisão do tempo entre pandas, plotly e backend (amostragem de pilha). O primeiro rerun
+de cada página é frio (caches do Streamlit limpos); os demais são quentes.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+import repositorio
+from repositorio import RepositorioSQLite
+from tenants import gerar_tenant
+
+PAGINAS = ["Dashboard", "Extrato", "Tendências", "Metas", "Equipe", "Configurações"]
+ARQUIVOS_PAGINAS = {
+    "Dashboard": "paginas/dashboard.py", "Extrato": "paginas/extrato.py", "Tendências": "paginas/tendencias.py",
+    "Metas": "paginas/metas.py", "Equipe": "paginas/equipe.py", "Configurações": "paginas/configuracoes.py",
+}
+# Módulos do app que guardam recursos em variáveis globais (recriados ao serem reimportados)
+MODULOS_APP = ("nucleo", "analista", "graficos")
+APP = os.path.join(RAIZ, "appv05.py")
+
+
+class AmostradorPilha:
+    """Amostra periodicamente as pilhas das outras threads e classifica cada amostra pela
+    biblioteca mais externa na pilha (plotly, pandas ou backend)."""
+    CATEGORIAS = (("plotly", os.sep + "plotly" + os.sep), ("pandas", os.sep + "pandas" + os.sep), ("backend", "repositorio.py"))
+
+    def __init__(self, intervalo=0.0005):
+        self.intervalo = intervalo
+        self.amostras = Counter()
+        self._parar = threading.Event()
+        self._thread = None
+
+    def _classificar(self, frame):
+        pilha = []
+        while frame is not None:
+            pilha.append(frame.f_code.co_filename)
+            frame = frame.f_back
+        for arquivo in reversed(pilha):
+            for categoria, marcador in self.CATEGORIAS:
+                if marcador in arquivo: return categoria
+        return "outros"
+
+    def _loop(self):
+        ignorar = {threading.get_ident(), threading.main_thread().ident}
+        while not self._parar.wait(self.intervalo):
+            for tid, frame in sys._current_frames().items():
+                if tid in ignorar: continue
+                if APP in [f.f_code.co_filename for f in _subir(frame)]:
+                    self.amostras[self._classificar(frame)] += 1
+
+    def __enter__(self):
+        self.amostras.clear()
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._parar.set()
+        self._thread.join()
+
+    def fracoes(self):
+        total = sum(self.amostras.values()) or 1
+        return {c: n / total for c, n in self.amostras.items()}
+
+
+def _subir(frame):
+    while frame is not None:
+        yield frame
+        frame = frame.f_back
+
+
+def preparar_banco(args):
+    caminho = os.path.join(tempfile.mkdtemp(prefix="bench_metas_"), "bench.db")
+    repo = RepositorioSQLite(caminho)
+    t0 = time.perf_counter()
+    tenant = gerar_tenant(repo, anos=args.anos, n_feriados=args.feriados, n_membros=args.membros, seed=args.seed,
+                          vendas_por_dia=args.vendas_dia)
+    print(f"Tenant gerado em {time.perf_counter() - t0:.1f}s ({caminho})")
+    return caminho, tenant
+
+
+def medir_pagina(caminho, tenant, pagina, reruns):
+    chamadas = []
+    observador = lambda metodo, *_: chamadas.append(metodo)
+
+    at = AppTest.from_file(APP, default_timeout=120)
+    at.secrets["backend"] = {"tipo": "sqlite", "caminho": caminho, "observar": True}
+    at.session_state["user"] = tenant["admin"]
+    at.session_state["company"] = {"id": tenant["company_id"], "name": tenant["nome"]}
+
+    # Navega até a página, depois limpa os caches para que o primeiro rerun medido seja frio
+    at.run()
+    st.cache_resource.clear()
+    st.cache_data.clear()
+    for modulo in MODULOS_APP: sys.modules.pop(modulo, None)
+    at.switch_page(ARQUIVOS_PAGINAS[pagina])
+
+    resultado = {"rerun_ms": [], "chamadas_backend": [], "pandas_ms": [], "plotly_ms": [], "backend_ms": [], "erros": []}
+    repositorio.OBSERVADORES.append(observador)
+    try:
+        for _ in range(reruns):
+            chamadas.clear()
+            with AmostradorPilha() as amostrador:
+                t0 = time.perf_counter()
+                at.run()
+                ms = (time.perf_counter() - t0) * 1000
+            fracoes = amostrador.fracoes()
+            resultado["rerun_ms"].append(round(ms, 2))
+            resultado["chamadas_backend"].append(len(chamadas))
+            for categoria in ("pandas", "plotly", "backend"):
+                resultado[f"{categoria}_ms"].append(round(ms * fracoes.get(categoria, 0), 2))
+            resultado["erros"].extend(str(e.value) for e in at.exception)
+    finally:
+        repositorio.OBSERVADORES.remove(observador)
+
+    quentes = resultado["rerun_ms"][1:] or resultado["rerun_ms"]
+    resultado["frio_ms"] = resultado["rerun_ms"][0]
+    resultado["quente_p50_ms"] = round(statistics.median(quentes), 2)
+    resultado["chamadas_frio"] = resultado["chamadas_backend"][0]
+    resultado["chamadas_quente"] = (resultado["chamadas_backend"][1:] or resultado["chamadas_backend"])[-1]
+    return resultado
+
+
+def versao_codigo():
+    try:
+        return subprocess.check_output(["git", "describe", "--always", "--dirty"], cwd=RAIZ, text=True).strip()
+    except Exception:
+        return "desconhecida"
+
+
+def comparar(atual, anterior):
+    config_antes = anterior.get("config", {})
+    diferentes = sorted(k for k in atual["config"].keys() | config_antes.keys() if atual["config"].get(k) != config_antes.get(k))
+    if diferentes:
+        print("\nConfig diferente: " + ", ".join(f"{k} {config_antes.get(k)}->{atual['config'].get(k)}" for k in diferentes))
+    print(f"\n{'Página':<15}{'frio (ms)':>22}{'quente p50 (ms)':>24}{'chamadas':>14}")
+    for pagina, r in atual["paginas"].items():
+        a = anterior["paginas"].get(pagina)
+        if not a: continue
+        def delta(campo):
+            antes, depois = a[campo], r[campo]
+            pct = (depois - antes) / antes * 100 if antes else 0
+            return f"{antes:.0f}->{depois:.0f} ({pct:+.0f}%)"
+        print(f"{pagina:<15}{delta('frio_ms'):>22}{delta('quente_p50_ms'):>24}{a['chamadas_quente']:>7}->{r['chamadas_quente']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark headless das páginas do app")
+    parser.add_argument("--anos", type=int, default=5)
+    parser.add_argument("--feriados", type=int, default=200)
+    parser.add_argument("--membros", type=int, default=100)
+    parser.add_argument("--reruns", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--vendas-dia", type=int, default=0, help="Vendas individuais por dia (0 = um lançamento avulso)")
+    parser.add_argument("--paginas", nargs="*", default=PAGINAS)
+    parser.add_argument("--saida", default="bench_resultados.json")
+    parser.add_argument("--comparar", default=None, help="JSON de uma execução anterior")
+    args = parser.parse_args()
+
+    caminho, tenant = preparar_banco(args)
+    resultados = {
+        "versao": versao_codigo(),
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "streamlit": st.__version__,
+        "config": {k: getattr(args, k) for k in ("anos", "feriados", "membros", "vendas_dia", "reruns", "seed")},
+        "paginas": {}
+    }
+    for pagina in args.paginas:
+        r = medir_pagina(caminho, tenant, pagina, args.reruns)
+        resultados["paginas"][pagina] = r
+        print(f"{pagina:<15} frio {r['frio_ms']:>8.1f} ms | quente p50 {r['quente_p50_ms']:>8.1f} ms | "
+              f"chamadas {r['chamadas_frio']}/{r['chamadas_quente']} | erros {len(r['erros'])}")
+
+    with open(args.saida, "w", encoding="utf-8") as f:
+        json.dump(resultados, f, ensure_ascii=False, indent=2)
+    print(f"Resultados em {args.saida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            comparar(resultados, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Tempo de partida a frio do app: cada medição roda num processo Python novo, headless via AppTest.
+
+Uso:
+    python bench/bench_partida.py --repeticoes 3
+    python bench/bench_partida.py --pagina Dashboard --top 15 --saida partida.json
+
+Mede, no processo filho, o tempo para importar o Streamlit e o do primeiro rerun (tela de login
+ou a página pedida, num tenant sintético), lista os módulos mais caros de importar
+(python -X importtime) e quais dependências pesadas chegaram a ser carregadas.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+APP = os.path.join(RAIZ, "appv05.py")
+PESADOS = ("numpy", "pandas", "plotly", "google.generativeai", "supabase", "openpyxl", "xlsxwriter", "pyarrow")
+ARQUIVOS_PAGINAS = {
+    "Dashboard": "paginas/dashboard.py", "Extrato": "paginas/extrato.py", "Tendências": "paginas/tendencias.py",
+    "Metas": "paginas/metas.py", "Equipe": "paginas/equipe.py", "Configurações": "paginas/configuracoes.py",
+}
+
+
+def filho(args):
+    """Roda dentro do processo novo: imprime um JSON com os tempos na última linha"""
+    t0 = time.perf_counter()
+    from streamlit.testing.v1 import AppTest
+    t_streamlit = time.perf_counter() - t0
+
+    at = AppTest.from_file(APP, default_timeout=120)
+    at.secrets["backend"] = {"tipo": "sqlite", "caminho": args.caminho}
+    if args.pagina != "Login":
+        tenant = json.loads(args.tenant)
+        at.session_state["user"] = SimpleNamespace(**tenant["admin"])
+        at.session_state["company"] = {"id": tenant["company_id"], "name": tenant["nome"]}
+        at.switch_page(ARQUIVOS_PAGINAS[args.pagina])
+    t1 = time.perf_counter()
+    at.run()
+    t_rerun = time.perf_counter() - t1
+
+    print(json.dumps({
+        "streamlit_ms": round(t_streamlit * 1000, 1), "primeiro_rerun_ms": round(t_rerun * 1000, 1),
+        "carregados": [m for m in PESADOS if m in sys.modules], "erros": [str(e.value) for e in at.exception],
+    }))
+
+
+def ler_importtime(stderr, top):
+    """Módulos de primeiro nível mais caros (tempo cumulativo, em ms) da saída do -X importtime"""
+    custos = []
+    for linha in stderr.splitlines():
+        if not linha.startswith("import time:") or "|" not in linha: continue
+        _, cumulativo, nome = linha.split("|")
+        if not cumulativo.strip().isdigit(): continue
+        if nome.startswith("  "): continue  # importado por outro módulo: já conta no cumulativo do pai
+        custos.append((nome.strip(), int(cumulativo) / 1000))
+    return sorted(custos, key=lambda c: -c[1])[:top]
+
+
+def preparar_banco():
+    from repositorio import RepositorioSQLite
+    from tenants import gerar_tenant
+
+    caminho = os.path.join(tempfile.mkdtemp(prefix="bench_partida_"), "bench.db")
+    tenant = gerar_tenant(RepositorioSQLite(caminho), anos=1, n_feriados=20, n_membros=5)
+    tenant["admin"] = {"id": tenant["admin"].id, "email": tenant["admin"].email}
+    return caminho, tenant
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tempo de partida a frio do app")
+    parser.add_argument("--pagina", default="Login", choices=["Login"] + list(ARQUIVOS_PAGINAS))
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--saida", default=None)
+    parser.add_argument("--filho", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--caminho", help=argparse.SUPPRESS)
+    parser.add_argument("--tenant", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.filho: return filho(args)
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    caminho, tenant = preparar_banco()
+    medicoes, importtime = [], []
+    for _ in range(args.repeticoes):
+        t0 = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", os.path.abspath(__file__), "--filho", "--pagina", args.pagina,
+             "--caminho", caminho, "--tenant", json.dumps(tenant)],
+            capture_output=True, text=True, cwd=RAIZ
+        )
+        total_ms = (time.perf_counter() - t0) * 1000
+        if proc.returncode != 0:
+            sys.exit(proc.stderr[-2000:])
+        medicao = json.loads(proc.stdout.strip().splitlines()[-1])
+        medicao["processo_ms"] = round(total_ms, 1)
+        medicoes.append(medicao)
+        importtime = ler_importtime(proc.stderr, args.top)
+
+    resumo = {
+        campo: round(statistics.median(m[campo] for m in medicoes), 1)
+        for campo in ("processo_ms", "streamlit_ms", "primeiro_rerun_ms")
+    }
+    print(f"{args.pagina}: processo {resumo['processo_ms']:.0f} ms | import streamlit {resumo['streamlit_ms']:.0f} ms | "
+          f"primeiro rerun {resumo['primeiro_rerun_ms']:.0f} ms (mediana de {len(medicoes)})")
+    print(f"Dependências pesadas carregadas: {', '.join(medicoes[-1]['carregados']) or 'nenhuma'}")
+    if medicoes[-1]["erros"]: print(f"Erros no app: {medicoes[-1]['erros']}")
+    print("\nImports mais caros (cumulativo):")
+    for nome, ms in importtime:
+        print(f"  {nome:<40}{ms:>10.1f} ms")
+
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            json.dump({"pagina": args.pagina, "resumo": resumo, "medicoes": medicoes, "imports": importtime}, f,
+                      ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
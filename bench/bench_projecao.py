@@ -0,0 +1,77 @@
+"""Tempo da projeção do fechamento (Monte Carlo) por empresa e em lote, sem banco nem Streamlit.
+
+Uso:
+    python bench/bench_projecao.py --empresas 50 --simulacoes 5000
+
+Gera seis meses de totais diários sintéticos por empresa (com peso por dia da semana e alguns
+feriados) e mede projetar_mes numa empresa e projetar_empresas para todas.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from calendario_uteis import CalendarioUteis
+from projecao import JANELA_HISTORICO_DIAS, projetar_empresas, projetar_mes
+
+PESOS_SEMANA = (0.9, 1.0, 1.0, 1.1, 1.4, 0.7, 0.0)
+
+
+def gerar_entrada(rng, hoje):
+    feriados = [hoje - timedelta(days=int(d)) for d in rng.choice(JANELA_HISTORICO_DIAS, 6, replace=False)]
+    calendario = CalendarioUteis([0, 1, 2, 3, 4, 5], feriados)
+    dias = np.arange(np.datetime64(hoje - timedelta(days=JANELA_HISTORICO_DIAS), "D"), np.datetime64(hoje, "D"))
+    dias = dias[calendario.eh_dia_util(dias)]
+    base = rng.uniform(1000, 20000)
+    pesos = np.array(PESOS_SEMANA)[(dias.astype(np.int64) + 3) % 7]
+    valores = rng.gamma(4.0, base * pesos / 4.0)
+    meta = base * len(dias) / 6 * rng.uniform(0.8, 1.3)
+    return calendario, dias.astype(str).tolist(), valores.round(2).tolist(), meta
+
+
+def cronometrar(funcao, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        t0 = time.perf_counter()
+        funcao()
+        tempos.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(tempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tempo da projeção Monte Carlo do fechamento do mês")
+    parser.add_argument("--empresas", type=int, default=50)
+    parser.add_argument("--simulacoes", type=int, default=5000)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    hoje = date.today()
+    entradas = {f"empresa_{i}": gerar_entrada(rng, hoje) for i in range(args.empresas)}
+    calendario, datas, valores, meta = entradas["empresa_0"]
+
+    uma = cronometrar(lambda: projetar_mes(calendario, datas, valores, hoje.year, hoje.month, meta, hoje,
+                                           args.simulacoes, rng=rng), args.repeticoes)
+    lote = cronometrar(lambda: projetar_empresas(entradas, hoje.year, hoje.month, hoje, args.simulacoes, args.seed),
+                       args.repeticoes)
+    projecao = projetar_mes(calendario, datas, valores, hoje.year, hoje.month, meta, hoje, args.simulacoes, rng=rng)
+
+    print(f"Uma empresa: {uma:.1f} ms | lote de {args.empresas}: {lote:.1f} ms "
+          f"({lote / args.empresas:.1f} ms/empresa) | {args.simulacoes} simulações (mediana de {args.repeticoes})")
+    if projecao:
+        banda = projecao["banda"]
+        chance = projecao["probabilidade"]
+        print(f"Exemplo: p10 {banda[10]:.0f} · p50 {banda[50]:.0f} · p90 {banda[90]:.0f} · meta {meta:.0f} · "
+              f"chance {'-' if chance is None else f'{chance * 100:.0f}%'} · {projecao['dias_restantes'].size} dias restantes")
+
+
+if __name__ == "__main__":
+    main()
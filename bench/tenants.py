@@ -0,0 +1,72 @@
+"""Geração de tenants sintéticos para benchmarks (sempre no backend SQLite)."""
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+TELAS = ["Dashboard", "Extrato", "Tendências", "Metas", "Equipe", "Configurações"]
+CANAIS = ["Loja", "Online", "Telefone"]
+SENHA_BENCH = "bench123"
+
+
+def gerar_tenant(repo, nome="Tenant Bench", anos=5, n_feriados=200, n_membros=100, seed=42,
+                 vendas_por_dia=0, n_vendedores=10):
+    """Cria uma empresa com `anos` de vendas diárias, feriados, metas e membros. Com
+    `vendas_por_dia` > 0, o total de cada dia é dividido nessa quantidade de vendas individuais
+    (vendedor e canal sorteados) em vez de um lançamento avulso por dia.
+    Retorna {"company_id", "nome", "admin"} (admin = usuário com .id/.email)."""
+    rng = np.random.default_rng(seed)
+    slug = nome.lower().replace(" ", "-")
+    hoje = date.today()
+
+    admin = repo.cadastrar(f"admin@{slug}.bench", SENHA_BENCH)
+    company_id = repo.criar_empresa(nome)
+    repo.adicionar_membro(company_id, admin.id, "admin", TELAS)
+
+    for i in range(n_membros - 1):
+        u = repo.cadastrar(f"membro{i:04d}@{slug}.bench", SENHA_BENCH)
+        role = rng.choice(["viewer", "data_entry"], p=[0.7, 0.3])
+        repo.adicionar_membro(company_id, u.id, str(role), TELAS[:int(rng.integers(1, 4))])
+
+    repo.salvar_config_dias(company_id, [0, 1, 2, 3, 4, 5])
+
+    # Vendas: base diária com sazonalidade semanal e anual + ruído
+    dias = pd.date_range(end=pd.Timestamp(hoje), periods=anos * 365, freq="D")
+    fator_semana = np.array([1.0, 0.9, 0.95, 1.05, 1.3, 1.5, 0.4])[dias.dayofweek]
+    fator_ano = 1 + 0.15 * np.sin(2 * np.pi * dias.dayofyear / 365)
+    valores = np.round(rng.gamma(4.0, 1250.0, len(dias)) * fator_semana * fator_ano, 2)
+    if vendas_por_dia > 0:
+        pesos = rng.random((len(dias), vendas_por_dia))
+        partes = np.round(valores[:, None] * pesos / pesos.sum(axis=1, keepdims=True), 2)
+        vendedores = rng.integers(0, n_vendedores, partes.shape)
+        canais = rng.integers(0, len(CANAIS), partes.shape)
+        datas = dias.strftime("%Y-%m-%d")
+        for i in range(0, len(dias), 30):  # ~um mês por lote
+            repo.registrar_vendas(company_id, [
+                {"data_venda": datas[d], "valor_venda": float(partes[d, j]),
+                 "vendedor": f"Vendedor {vendedores[d, j] + 1:02d}", "canal": CANAIS[canais[d, j]]}
+                for d in range(i, min(i + 30, len(dias))) for j in range(vendas_por_dia)
+            ])
+    else:
+        repo.salvar_vendas_lote(company_id, [
+            {"data_venda": d, "valor_venda": float(v)}
+            for d, v in zip(dias.strftime("%Y-%m-%d"), valores)
+        ])
+
+    # Feriados espalhados pelo período (inclui o ano corrente inteiro)
+    candidatos = pd.date_range(start=dias[0], end=pd.Timestamp(date(hoje.year, 12, 31)), freq="D")
+    escolhidos = np.sort(rng.choice(len(candidatos), size=min(n_feriados, len(candidatos)), replace=False))
+    repo.salvar_feriados(company_id, [
+        {"data": d, "descricao": f"Feriado {i + 1}"}
+        for i, d in enumerate(candidatos[escolhidos].strftime("%Y-%m-%d"))
+    ])
+
+    # Metas: realizado do mês + 10% (meses futuros do ano corrente usam a média)
+    mensal = pd.Series(valores, index=dias).resample("MS").sum()
+    for inicio, total in mensal.items():
+        repo.salvar_meta(company_id, inicio.year, inicio.month, float(round(total * 1.1, -2)))
+    media = float(mensal.mean())
+    for mes in range(hoje.month + 1, 13):
+        repo.salvar_meta(company_id, hoje.year, mes, round(media * 1.1, -2))
+
+    return {"company_id": company_id, "nome": nome, "admin": admin}
@@ -0,0 +1,57 @@
+"""Calendário de dias úteis por empresa (dias de trabalho + feriados) sobre np.busdaycalendar.
+
+Todas as consultas são vetorizadas: recebem arrays de anos/meses ou de datas e respondem
+para todos de uma vez, então séries de vários anos custam uma única chamada ao numpy.
+"""
+from datetime import date
+
+import numpy as np
+
+
+class CalendarioUteis:
+    def __init__(self, dias_trabalho, feriados):
+        mascara = [0] * 7
+        for dia in dias_trabalho: mascara[int(dia)] = 1
+        self.dias_trabalho = sorted({int(d) for d in dias_trabalho})
+        self.feriados = np.unique(np.asarray(list(feriados), dtype="datetime64[D]"))
+        # numpy não aceita semana sem nenhum dia de trabalho: nesse caso nenhum dia é útil
+        self._cal = np.busdaycalendar(weekmask=mascara, holidays=self.feriados) if any(mascara) else None
+
+    @staticmethod
+    def _inicios_meses(anos, meses):
+        anos = np.asarray(anos, dtype=int)
+        meses = np.asarray(meses, dtype=int)
+        return ((anos - 1970) * 12 + (meses - 1)).astype("datetime64[M]")
+
+    def _contar(self, inicio, fim):
+        if self._cal is None: return np.zeros(np.broadcast(inicio, fim).shape, dtype=int)
+        return np.busday_count(inicio, fim, busdaycal=self._cal)
+
+    def dias_uteis_meses(self, anos, meses, referencia=None):
+        """Para cada (ano, mês): dias úteis no total, já decorridos (antes de `referencia`) e
+        restantes (de `referencia`, inclusive, até o fim do mês). `referencia` padrão: hoje.
+        Retorna um dict de arrays {"total", "decorridos", "restantes"}."""
+        mes_ini = self._inicios_meses(anos, meses)
+        inicio = mes_ini.astype("datetime64[D]")
+        fim = (mes_ini + 1).astype("datetime64[D]")  # exclusivo
+        ref = np.datetime64(referencia or date.today(), "D")
+        corte = np.minimum(np.maximum(ref, inicio), fim)
+
+        total = self._contar(inicio, fim)
+        decorridos = self._contar(inicio, corte)
+        return {"total": total, "decorridos": decorridos, "restantes": total - decorridos}
+
+    def dias_uteis_restantes(self, ano, mes, referencia=None):
+        return int(self.dias_uteis_meses([ano], [mes], referencia)["restantes"][0])
+
+    def eh_dia_util(self, datas):
+        datas = np.asarray(datas, dtype="datetime64[D]")
+        if self._cal is None: return np.zeros(datas.shape, dtype=bool)
+        return np.is_busday(datas, busdaycal=self._cal)
+
+    def proximo_dia_util(self, datas):
+        """Primeiro dia útil estritamente depois de cada data (NaT se a semana não tem dia útil)"""
+        datas = np.asarray(datas, dtype="datetime64[D]")
+        if self._cal is None: return np.full(datas.shape, np.datetime64("NaT"), dtype="datetime64[D]")
+        # Volta para o último dia útil <= data e anda um: funciona para datas úteis ou não
+        return np.busday_offset(datas, 1, roll="backward", busdaycal=self._cal)
@@ -0,0 +1,131 @@
+"""Exportação de vendas (totais diários e por vendedor/canal), metas e feriados para Excel ou CSV, de uma ou várias empresas.
+
+As linhas são lidas do backend página a página e escritas direto no arquivo de destino:
+o Excel usa o modo constant_memory do xlsxwriter (cada linha vai para disco assim que é
+escrita) e o CSV é gravado em streaming dentro de um .zip (um CSV por tabela). Em nenhum
+momento o período inteiro fica em memória.
+"""
+import csv
+import io
+import zipfile
+from datetime import date
+
+from formatacao import MESES_PT, format_moeda
+
+TABELAS_EXPORTACAO = {"vendas": "Vendas", "vendedores": "Vendas por vendedor", "metas": "Metas", "feriados": "Feriados"}
+LINHAS_POR_PAGINA = 1000
+
+CABECALHOS = {
+    "vendas": ["Empresa", "Data", "Valor"],
+    "vendedores": ["Empresa", "Data", "Vendedor", "Canal", "Valor", "Vendas"],
+    "metas": ["Empresa", "Ano", "Mês", "Meta"],
+    "feriados": ["Empresa", "Data", "Descrição"],
+}
+
+
+def _data(valor):
+    return valor if isinstance(valor, date) else date.fromisoformat(str(valor)[:10])
+
+
+# --- LEITURA PAGINADA ---
+def linhas_vendas(repo, empresas, inicio, fim):
+    """(empresa, data, valor) de cada lançamento, da data mais recente para a mais antiga"""
+    for empresa in empresas:
+        antes_de = None
+        while True:
+            pagina = repo.listar_vendas_pagina(empresa['id'], inicio, fim, LINHAS_POR_PAGINA, antes_de)
+            for v in pagina:
+                yield empresa['name'], _data(v['data_venda']), float(v['valor_venda'])
+            if len(pagina) < LINHAS_POR_PAGINA: break
+            antes_de = pagina[-1]['data_venda']
+
+
+def linhas_vendedores(repo, empresas, inicio, fim):
+    """(empresa, data, vendedor, canal, valor, vendas) dos totais diários por vendedor, lidos mês a mês"""
+    for empresa in empresas:
+        mes = date(inicio.year, inicio.month, 1)
+        while mes <= fim:
+            proximo = date(mes.year + mes.month // 12, mes.month % 12 + 1, 1)
+            ate = min(fim, date.fromordinal(proximo.toordinal() - 1))
+            for v in repo.listar_vendas_vendedor(empresa['id'], max(inicio, mes), ate):
+                yield (empresa['name'], _data(v['data_venda']), v['vendedor'] or "", v['canal'] or "",
+                       float(v['total']), int(v['qtd']))
+            mes = proximo
+
+
+def linhas_metas(repo, empresas, inicio, fim):
+    primeiro, ultimo = (inicio.year, inicio.month), (fim.year, fim.month)
+    for empresa in empresas:
+        for m in repo.listar_metas(empresa['id']):
+            if primeiro <= (m['ano'], m['mes']) <= ultimo:
+                yield empresa['name'], m['ano'], MESES_PT[m['mes']], float(m['meta_mensal'])
+
+
+def linhas_feriados(repo, empresas, inicio, fim):
+    for empresa in empresas:
+        for f in repo.listar_feriados(empresa['id']):
+            dia = _data(f['data'])
+            if inicio <= dia <= fim:
+                yield empresa['name'], dia, f['descricao']
+
+
+LEITORES = {"vendas": linhas_vendas, "vendedores": linhas_vendedores, "metas": linhas_metas, "feriados": linhas_feriados}
+
+
+# --- ESCRITA ---
+def exportar_xlsx(destino, repo, empresas, inicio, fim, tabelas, ao_progredir=None):
+    """Escreve uma aba por tabela em `destino` (caminho ou arquivo binário). Retorna {tabela: linhas}"""
+    import xlsxwriter
+
+    livro = xlsxwriter.Workbook(destino, {"constant_memory": True, "in_memory": False})
+    fmt_cabecalho = livro.add_format({"bold": True, "bg_color": "#0091EA", "font_color": "white"})
+    fmt_data = livro.add_format({"num_format": "dd/mm/yyyy"})
+    fmt_moeda = livro.add_format({"num_format": '"R$" #,##0.00'})
+    formatos = {
+        "vendas": [None, fmt_data, fmt_moeda],
+        "vendedores": [None, fmt_data, None, None, fmt_moeda, None],
+        "metas": [None, None, None, fmt_moeda],
+        "feriados": [None, fmt_data, None],
+    }
+    contagem = {}
+    try:
+        for tabela in tabelas:
+            aba = livro.add_worksheet(TABELAS_EXPORTACAO[tabela])
+            aba.write_row(0, 0, CABECALHOS[tabela], fmt_cabecalho)
+            aba.set_column(0, 0, 30)
+            aba.set_column(1, len(CABECALHOS[tabela]) - 1, 16)
+            n = 0
+            for n, linha in enumerate(LEITORES[tabela](repo, empresas, inicio, fim), start=1):
+                for col, (valor, fmt) in enumerate(zip(linha, formatos[tabela])):
+                    if isinstance(valor, date): aba.write_datetime(n, col, valor, fmt)
+                    else: aba.write(n, col, valor, fmt)
+                if ao_progredir and n % LINHAS_POR_PAGINA == 0: ao_progredir(tabela, n)
+            contagem[tabela] = n
+    finally:
+        livro.close()
+    return contagem
+
+
+def _formatar_csv(valor):
+    if isinstance(valor, date): return valor.strftime("%d/%m/%Y")
+    if isinstance(valor, float): return format_moeda(valor)
+    return valor
+
+
+def exportar_csv_zip(destino, repo, empresas, inicio, fim, tabelas, ao_progredir=None):
+    """Um CSV (separador ';', UTF-8 com BOM, para abrir direto no Excel) por tabela dentro de um .zip"""
+    contagem = {}
+    with zipfile.ZipFile(destino, "w", compression=zipfile.ZIP_DEFLATED) as pacote:
+        for tabela in tabelas:
+            with pacote.open(f"{tabela}.csv", "w", force_zip64=True) as bruto:
+                texto = io.TextIOWrapper(bruto, encoding="utf-8-sig", newline="")
+                escritor = csv.writer(texto, delimiter=";")
+                escritor.writerow(CABECALHOS[tabela])
+                n = 0
+                for n, linha in enumerate(LEITORES[tabela](repo, empresas, inicio, fim), start=1):
+                    escritor.writerow([_formatar_csv(v) for v in linha])
+                    if ao_progredir and n % LINHAS_POR_PAGINA == 0: ao_progredir(tabela, n)
+                texto.flush()
+                texto.detach()
+                contagem[tabela] = n
+    return contagem
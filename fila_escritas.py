@@ -0,0 +1,116 @@
+"""Fila de escritas em segundo plano, com nova tentativa e coalescência por chave.
+
+A tela enfileira a escrita e segue em frente; os workers gravam no backend. Enquanto uma
+escrita não começou, um novo envio com a mesma chave (ex.: a venda do mesmo dia) substitui o
+anterior, então editar o mesmo dia várias vezes vira uma única gravação. Escritas da mesma
+chave nunca rodam em paralelo e são aplicadas na ordem de envio.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+WORKERS = 2
+TENTATIVAS = 3
+ESPERA_BASE_SEGUNDOS = 0.5
+FALHAS_MAX = 500
+
+
+class Escrita:
+    """Uma gravação pendente. `dados` é o que a tela usa para mostrar o valor otimista"""
+    def __init__(self, chave, funcao, args, dados=None, autor=None, ao_gravar=None):
+        self.chave = chave
+        self.funcao = funcao
+        self.args = args
+        self.dados = dados
+        self.autor = autor
+        self.ao_gravar = ao_gravar
+        self.status = "pendente"  # pendente | gravando | ok | falhou
+        self.erro = None
+        self.tentativas = 0
+        self.enviada_em = time.time()
+
+
+class FilaEscritas:
+    def __init__(self, workers=WORKERS, tentativas=TENTATIVAS, espera_base=ESPERA_BASE_SEGUNDOS):
+        self.tentativas = tentativas
+        self.espera_base = espera_base
+        self._pendentes = OrderedDict()  # chave -> Escrita ainda não iniciada
+        self._gravando = {}              # chave -> Escrita em andamento
+        self._falhas = OrderedDict()     # chave -> última Escrita que falhou (até ser descartada)
+        self._cond = threading.Condition()
+        for i in range(workers):
+            threading.Thread(target=self._loop, name=f"escritas-{i}", daemon=True).start()
+
+    def enviar(self, chave, funcao, *args, dados=None, autor=None, ao_gravar=None):
+        """Enfileira `funcao(*args)`. Se já houver uma escrita da chave esperando, ela é substituída"""
+        escrita = Escrita(chave, funcao, args, dados, autor, ao_gravar)
+        with self._cond:
+            self._pendentes.pop(chave, None)
+            self._pendentes[chave] = escrita
+            self._falhas.pop(chave, None)
+            self._cond.notify()
+        return escrita
+
+    def reenviar(self, escrita):
+        return self.enviar(escrita.chave, escrita.funcao, *escrita.args, dados=escrita.dados,
+                           autor=escrita.autor, ao_gravar=escrita.ao_gravar)
+
+    def descartar(self, chave):
+        with self._cond:
+            self._falhas.pop(chave, None)
+
+    def em_aberto(self, prefixo):
+        """Escritas pendentes ou em andamento cujas chaves começam com `prefixo` (tupla)"""
+        n = len(prefixo)
+        with self._cond:
+            # Pendente substitui a em andamento: é o valor que vai prevalecer
+            abertas = {**self._gravando, **self._pendentes}
+            return [e for c, e in abertas.items() if c[:n] == prefixo]
+
+    def falhas(self, prefixo, autor=None):
+        n = len(prefixo)
+        with self._cond:
+            return [e for c, e in self._falhas.items() if c[:n] == prefixo and (autor is None or e.autor == autor)]
+
+    def _proxima(self):
+        for chave in self._pendentes:
+            if chave not in self._gravando:
+                return self._pendentes.pop(chave)
+        return None
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                escrita = self._proxima()
+                while escrita is None:
+                    self._cond.wait()
+                    escrita = self._proxima()
+                escrita.status = "gravando"
+                self._gravando[escrita.chave] = escrita
+            self._gravar(escrita)
+            with self._cond:
+                del self._gravando[escrita.chave]
+                if escrita.status == "falhou" and escrita.chave not in self._pendentes:
+                    self._falhas[escrita.chave] = escrita
+                    while len(self._falhas) > FALHAS_MAX:
+                        self._falhas.popitem(last=False)
+                self._cond.notify_all()
+
+    def _gravar(self, escrita):
+        while True:
+            escrita.tentativas += 1
+            try:
+                escrita.funcao(*escrita.args)
+                break
+            except Exception as e:
+                escrita.erro = str(e)
+                if escrita.tentativas >= self.tentativas:
+                    escrita.status = "falhou"
+                    return
+                time.sleep(self.espera_base * 2 ** (escrita.tentativas - 1))
+        escrita.status = "ok"
+        if escrita.ao_gravar:
+            try:
+                escrita.ao_gravar()
+            except Exception:
+                pass  # A gravação já foi feita; o cache expira pelo TTL
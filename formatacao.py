@@ -0,0 +1,35 @@
+"""Formatação no padrão brasileiro usada pelas telas e pelas respostas do analista."""
+import re
+import unicodedata
+
+MESES_PT = {
+    1: "Janeiro", 2: "Fevereiro", 3: "Março", 4: "Abril", 
+    5: "Maio", 6: "Junho", 7: "Julho", 8: "Agosto", 
+    9: "Setembro", 10: "Outubro", 11: "Novembro", 12: "Dezembro"
+}
+DIAS_SEMANA_PT = ["Segunda", "Terça", "Quarta", "Quinta", "Sexta", "Sábado", "Domingo"]
+
+
+def normalizar_texto(texto):
+    """Minúsculas, sem acentos nem pontuação e com espaços simples (perguntas, cabeçalhos de planilha)"""
+    texto = unicodedata.normalize("NFKD", texto.lower())
+    texto = "".join(c for c in texto if not unicodedata.combining(c))
+    return " ".join(re.sub(r"[^\w\s]", " ", texto).split())
+
+
+def format_moeda(valor):
+    return f"R$ {valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+
+
+def format_moeda_serie(valores):
+    """format_moeda para uma série inteira de uma vez (rótulos de gráfico, colunas de tabela)"""
+    # Importados aqui: MESES_PT/format_moeda também são usados pelo núcleo, que não carrega o pandas
+    import numpy as np
+    import pandas as pd
+
+    valores = pd.Series(valores, dtype=float)
+    if valores.empty: return pd.Series([], index=valores.index, dtype=object)
+    partes = pd.Series(np.char.mod("%.2f", np.abs(valores.to_numpy())), index=valores.index).str.split(".", n=1, expand=True)
+    inteiro = partes[0].str.replace(r"\B(?=(\d{3})+(?!\d))", ".", regex=True)
+    sinal = pd.Series(np.where(valores.to_numpy() < 0, "-", ""), index=valores.index)
+    return "R$ " + sinal + inteiro + "," + partes[1]
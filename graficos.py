@@ -0,0 +1,103 @@
+"""Figuras Plotly do painel, memorizadas pelos dados e reusadas na Visão Consolidada.
+
+Só as páginas com gráficos importam este módulo, então o Plotly fica fora da partida do app.
+"""
+import calendar
+import copy
+import hashlib
+from datetime import date
+
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+
+from formatacao import format_moeda_serie
+from nucleo import CacheLeituras
+
+GRAFICOS_TTL_SEGUNDOS = 3600
+GRAFICOS_MAX_ENTRADAS = 256
+
+@st.cache_resource
+def init_cache_graficos():
+    # Especificações prontas das figuras (dicts), chaveadas pelo tipo e por um resumo dos dados; compartilhadas entre sessões
+    cfg = st.secrets.get("cache", {})
+    return CacheLeituras(
+        ttl=cfg.get("graficos_ttl_segundos", GRAFICOS_TTL_SEGUNDOS),
+        max_entradas=cfg.get("graficos_max_entradas", GRAFICOS_MAX_ENTRADAS),
+        rotulo="grafico"
+    )
+
+cache_graficos = init_cache_graficos()
+
+def grafico_memorizado(tipo, params, construir):
+    """Especificação (dict) da figura para os mesmos dados, pronta para o st.plotly_chart; `construir`
+    só roda quando algo mudou. Num acerto não se monta go.Figure (a validação do Plotly custa mais que
+    construir do zero) e cada chamada recebe uma cópia: quem a alterar não muda o gráfico das outras sessões"""
+    spec = cache_graficos.obter(None, tipo, params, lambda: construir().to_dict())
+    return copy.deepcopy(spec)
+
+def fig_gauge_vendas(total_vendido, meta_val, altura=220, titulo="Total de Vendas"):
+    def construir():
+        max_gauge_value = meta_val if meta_val > 0 else 100
+        fig = go.Figure(go.Indicator(
+            mode = "gauge+number", value = total_vendido,
+            title = {'text': titulo, 'font': {'size': 14, 'color': '#0091EA'}},
+            number = {'prefix': "R$ ", 'font': {'size': 30, 'color': '#0091EA'}}, 
+            gauge = {
+                'axis': {'range': [0, max_gauge_value], 'tickwidth': 0}, 
+                'bar': {'color': "#0091EA"}, 
+                'bgcolor': "white", 
+                'borderwidth': 0, 
+                'steps': [{'range': [0, max_gauge_value], 'color': '#f0f2f6'}]
+            }
+        ))
+        fig.update_layout(height=altura, margin=dict(l=20, r=20, t=60, b=10), separators=".,")
+        return fig
+    params = {"total": float(total_vendido), "meta": float(meta_val), "altura": altura, "titulo": titulo}
+    return grafico_memorizado("gauge_vendas", params, construir)
+
+def fig_gauge_percentual(percentual, altura=220):
+    def construir():
+        cor_meta = "#D32F2F" if percentual < 50 else "#FBC02D" if percentual < 100 else "#388E3C"
+        fig = go.Figure(go.Indicator(
+            mode = "gauge+number", value = percentual,
+            title = {'text': "% Meta Alcançada", 'font': {'size': 14, 'color': "#388E3C"}},
+            number = {'suffix': "%", 'font': {'color': cor_meta, 'size': 30}},
+            gauge = {'axis': {'range': [0, 100], 'tickwidth': 0}, 'bar': {'color': cor_meta}, 'bgcolor': "white", 'borderwidth': 0, 'steps': [{'range': [0, 100], 'color': '#f0f2f6'}]}
+        ))
+        fig.update_layout(height=altura, margin=dict(l=20, r=20, t=60, b=10), separators=".,")
+        return fig
+    return grafico_memorizado("gauge_percentual", {"percentual": float(percentual), "altura": altura}, construir)
+
+def fig_acumulado(df_vendas, ano, mes, meta_val, hoje):
+    """Barras do realizado acumulado no mês (até hoje) contra a linha da meta"""
+    fim = min(date(ano, mes, calendar.monthrange(ano, mes)[1]), hoje)
+    dias = pd.date_range(start=date(ano, mes, 1), end=fim, freq='D')
+    # Série diária do mês inteiro (dias sem venda = 0), sem merge e sem passar por linha a linha
+    diario = df_vendas.groupby('data_venda')['valor_venda'].sum().reindex(dias, fill_value=0).astype(float)
+
+    def construir():
+        acumulado = diario.cumsum()
+        dia_str = diario.index.strftime('%d/%m')
+        fig_combo = go.Figure()
+        fig_combo.add_trace(go.Bar(
+            x=dia_str, y=acumulado.to_numpy(), name='Realizado Acumulado',
+            marker_color='#1E88E5', text=format_moeda_serie(acumulado).to_numpy(), texttemplate='%{text}', textposition='outside'
+        ))
+        fig_combo.add_trace(go.Scatter(
+            x=dia_str, y=[meta_val] * len(diario), name='Meta Mensal', 
+            mode='lines', line=dict(color='red', width=2, dash='dash')
+        ))
+        fig_combo.update_layout(
+            title={'text': "Evolução Acumulada vs Meta", 'y':0.9, 'x':0.5, 'xanchor': 'center', 'yanchor': 'top'},
+            legend=dict(orientation="h", yanchor="bottom", y=1.05, xanchor="right", x=1),
+            height=300, margin=dict(l=20, r=20, t=50, b=20),
+            hovermode="x unified", plot_bgcolor="rgba(0,0,0,0)",
+            yaxis=dict(showgrid=False, showticklabels=False), xaxis=dict(showgrid=False), separators=".," 
+        )
+        return fig_combo
+    params = {
+        "dados": hashlib.sha1(pd.util.hash_pandas_object(diario).values.tobytes()).hexdigest(),
+        "meta": float(meta_val)
+    }
+    return grafico_memorizado("acumulado", params, construir)
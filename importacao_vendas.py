@@ -0,0 +1,156 @@
+"""Importação de histórico de vendas a partir de CSV ou Excel.
+
+O arquivo é lido em blocos (CSV via `chunksize`, XLSX via openpyxl em modo somente leitura),
+então arquivos com anos de histórico não são carregados inteiros na memória. Cada bloco é
+validado de forma vetorizada e devolve as linhas prontas para gravar e o relatório de erros.
+
+Sem colunas de vendedor/canal, cada linha é o lançamento avulso do dia (um por data). Com elas,
+cada linha é uma venda individual e a mesma data pode aparecer quantas vezes for preciso; cada
+uma leva uma chave de importação (data, valor, vendedor, canal e quantas linhas iguais vieram
+antes no arquivo), para que reimportar o mesmo arquivo não duplique as vendas.
+"""
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from formatacao import normalizar_texto
+
+TAMANHO_BLOCO = 5000
+COLUNAS_DATA = {"data", "data venda", "data da venda", "dia", "date"}
+COLUNAS_VALOR = {"valor", "valor venda", "valor da venda", "venda", "vendas", "total", "value"}
+COLUNAS_VENDEDOR = {"vendedor", "vendedora", "seller", "salesperson"}
+COLUNAS_CANAL = {"canal", "canal de venda", "channel"}
+
+
+class ErroImportacao(Exception):
+    """Arquivo que não pode ser importado (formato ou colunas não reconhecidos)"""
+
+
+def _localizar_colunas(colunas):
+    """(data, valor, vendedor, canal): vendedor e canal são opcionais (None se ausentes)"""
+    normalizadas = {normalizar_texto(str(c)).replace("_", " "): c for c in colunas}
+    data, valor, vendedor, canal = (
+        next((c for n, c in normalizadas.items() if n in nomes), None)
+        for nomes in (COLUNAS_DATA, COLUNAS_VALOR, COLUNAS_VENDEDOR, COLUNAS_CANAL)
+    )
+    if data is None or valor is None:
+        raise ErroImportacao("O arquivo precisa ter uma coluna de data (ex.: 'data') e uma de valor (ex.: 'valor').")
+    return data, valor, vendedor, canal
+
+
+def _converter_textos(coluna):
+    """Array de objetos com o texto aparado, ou None nas células vazias"""
+    texto = coluna.astype(str).str.strip()
+    preenchido = (coluna.notna() & (texto != "") & (texto.str.lower() != "nan")).to_numpy()
+    return np.where(preenchido, texto.to_numpy(dtype=object), None)
+
+
+def _blocos_csv(arquivo, tamanho_bloco):
+    amostra = arquivo.read(4096)
+    arquivo.seek(0)
+    if isinstance(amostra, bytes): amostra = amostra.decode("utf-8-sig", errors="ignore")
+    primeira_linha = amostra.splitlines()[0] if amostra else ""
+    separador = ";" if primeira_linha.count(";") > primeira_linha.count(",") else ","
+    leitor = pd.read_csv(arquivo, sep=separador, dtype=str, chunksize=tamanho_bloco, encoding="utf-8-sig",
+                         skip_blank_lines=True)
+    for bloco in leitor:
+        yield bloco
+
+
+def _blocos_xlsx(arquivo, tamanho_bloco):
+    from openpyxl import load_workbook
+
+    planilha = load_workbook(arquivo, read_only=True, data_only=True).worksheets[0]
+    linhas = planilha.iter_rows(values_only=True)
+    cabecalho = next(linhas, None)
+    if cabecalho is None: return
+    cabecalho = [str(c) if c is not None else "" for c in cabecalho]
+    lote = []
+    for linha in linhas:
+        if all(v is None for v in linha): continue
+        lote.append(linha)
+        if len(lote) == tamanho_bloco:
+            yield pd.DataFrame(lote, columns=cabecalho)
+            lote = []
+    if lote: yield pd.DataFrame(lote, columns=cabecalho)
+
+
+def ler_em_blocos(arquivo, nome, tamanho_bloco=TAMANHO_BLOCO):
+    """Gera DataFrames com as colunas originais do arquivo, `tamanho_bloco` linhas por vez"""
+    extensao = nome.lower().rsplit(".", 1)[-1]
+    if extensao == "csv": return _blocos_csv(arquivo, tamanho_bloco)
+    if extensao in ("xlsx", "xlsm"): return _blocos_xlsx(arquivo, tamanho_bloco)
+    raise ErroImportacao("Formato não suportado. Envie um arquivo .csv ou .xlsx.")
+
+
+def _converter_datas(coluna):
+    if pd.api.types.is_datetime64_any_dtype(coluna): return coluna.dt.normalize()
+    texto = coluna.astype(str).str.strip().str.slice(0, 10)
+    # ISO primeiro; o que sobrar é tentado no padrão brasileiro
+    datas = pd.to_datetime(texto, format="%Y-%m-%d", errors="coerce")
+    return datas.fillna(pd.to_datetime(texto, format="%d/%m/%Y", errors="coerce"))
+
+
+def _converter_valores(coluna):
+    if pd.api.types.is_numeric_dtype(coluna): return coluna.astype(float)
+    texto = coluna.astype(str).str.replace(r"[R$\s]", "", regex=True)
+    # "1.234,56" -> "1234.56"; "1234.56" fica como está
+    virgula = texto.str.contains(",", regex=False)
+    texto = texto.where(~virgula, texto.str.replace(".", "", regex=False).str.replace(",", ".", regex=False))
+    return pd.to_numeric(texto, errors="coerce")
+
+
+def _chaves_importacao(validas, ocorrencias):
+    """Chave de cada venda individual: hash de data|valor|vendedor|canal|n, com n = linhas iguais
+    antes dela no arquivo. `ocorrencias` conta as linhas já vistas em blocos anteriores (atualizado aqui)"""
+    base = (validas["data_venda"] + "|" + validas["valor_venda"].map("{:.2f}".format) + "|"
+            + validas["vendedor"].fillna("") + "|" + validas["canal"].fillna(""))
+    ordem = base.groupby(base).cumcount() + base.map(ocorrencias).fillna(0).astype(int)
+    for chave, n in base.value_counts().items(): ocorrencias[chave] = ocorrencias.get(chave, 0) + int(n)
+    return [hashlib.sha1(f"{b}|{n}".encode()).hexdigest() for b, n in zip(base, ordem)]
+
+
+def validar_bloco(bloco, hoje, primeira_linha, datas_vistas, ocorrencias=None):
+    """Valida um bloco. `primeira_linha` é o número (no arquivo) da primeira linha do bloco e
+    `datas_vistas` o conjunto de datas já aceitas em blocos anteriores (atualizado aqui).
+    Retorna (linhas válidas [{"data_venda", "valor_venda"}], DataFrame de erros). Em arquivos
+    com vendedor/canal as linhas são vendas individuais e trazem também "vendedor", "canal" e
+    "chave_importacao"; `ocorrencias` ({linha: vezes}) acompanha as repetições entre blocos."""
+    col_data, col_valor, col_vendedor, col_canal = _localizar_colunas(bloco.columns)
+    individuais = col_vendedor is not None or col_canal is not None
+    datas = _converter_datas(bloco[col_data])
+    valores = _converter_valores(bloco[col_valor])
+    linhas = pd.RangeIndex(primeira_linha, primeira_linha + len(bloco))
+
+    data_invalida = datas.isna().to_numpy()
+    valor_invalido = valores.isna().to_numpy()
+    futura = (datas > pd.Timestamp(hoje)).to_numpy()
+    nao_positivo = (valores <= 0).to_numpy()
+    chave = datas.dt.strftime("%Y-%m-%d")
+    # Repetição só conta entre linhas que passaram nas demais regras: a primeira ocorrência válida fica
+    ok = ~(data_invalida | valor_invalido | futura | nao_positivo)
+    chave_ok = chave.where(ok)
+    if individuais: repetida = np.zeros(len(bloco), dtype=bool)  # várias vendas no mesmo dia
+    else: repetida = ok & (chave_ok.duplicated() | chave_ok.isin(datas_vistas)).to_numpy()
+
+    motivo = np.select(
+        [data_invalida, valor_invalido, futura, nao_positivo, repetida],
+        ["Data inválida", "Valor inválido", "Data futura", "Valor deve ser maior que zero", "Data repetida no arquivo"],
+        default=""
+    )
+    com_erro = motivo != ""
+    erros = pd.DataFrame({
+        "linha": linhas[com_erro],
+        "data": bloco[col_data].astype(str).to_numpy()[com_erro],
+        "valor": bloco[col_valor].astype(str).to_numpy()[com_erro],
+        "erro": motivo[com_erro],
+    })
+
+    validas = pd.DataFrame({"data_venda": chave.to_numpy()[~com_erro], "valor_venda": valores.to_numpy()[~com_erro]})
+    if individuais:
+        for campo, coluna in (("vendedor", col_vendedor), ("canal", col_canal)):
+            validas[campo] = _converter_textos(bloco[coluna])[~com_erro] if coluna is not None else None
+        validas["chave_importacao"] = _chaves_importacao(validas, ocorrencias if ocorrencias is not None else {})
+    datas_vistas.update(validas["data_venda"])
+    return validas.to_dict("records"), erros
@@ -0,0 +1,638 @@
+"""Núcleo compartilhado pelas páginas: conexão, rastreamento, caches, regras de negócio e fila de escritas.
+
+É importado uma vez por processo, então os recursos (@st.cache_resource) ficam em variáveis do
+módulo. Também é importado pelas telas de login e de seleção de empresa, então nada aqui importa
+no nível do módulo as bibliotecas pesadas (numpy, pandas, Plotly, Gemini, exportação, projeção):
+as funções que as usam importam na primeira chamada, e cada arquivo em paginas/ importa o que usa.
+"""
+import calendar
+import functools
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import date, timedelta
+
+import streamlit as st
+
+from fila_escritas import FilaEscritas
+from formatacao import MESES_PT
+from rastreamento import Rastreador, iniciar_servidor_prometheus, observador_repositorio
+from repositorio import OBSERVADORES, criar_pool_sessoes
+from sandbox_analista import obter_pool
+
+TELAS_APP = ["Dashboard", "Extrato", "Tendências", "Metas", "Equipe", "Configurações"]
+
+# --- RASTREAMENTO (SPANS POR RERUN E POR CHAMADA AO BACKEND) ---
+# [rastreamento] ativo = true, arquivo = "rastreamento.jsonl", porta_prometheus = 9464,
+# endereco_prometheus = "127.0.0.1" (padrão; o /metrics não tem autenticação), admins = ["email"] (veem todas as empresas no painel; admins de empresa veem só a própria)
+@st.cache_resource
+def init_rastreador():
+    cfg = st.secrets.get("rastreamento", {})
+    rastreador = Rastreador(
+        ativo=cfg.get("ativo", False), arquivo=cfg.get("arquivo"),
+        max_mb=cfg.get("arquivo_max_mb", 10), backups=cfg.get("arquivo_backups", 5),
+        amostras=cfg.get("amostras", 1000)
+    )
+    if cfg: OBSERVADORES.append(observador_repositorio(rastreador))
+    if cfg.get("porta_prometheus"):
+        iniciar_servidor_prometheus(rastreador, cfg["porta_prometheus"], cfg.get("endereco_prometheus", "127.0.0.1"))
+    return rastreador
+
+rastreador = init_rastreador()
+
+def medir(funcao):
+    """Span com o nome da função. Num rerun de fragmento (sem rerun aberto) vira a raiz,
+    atribuída à página e empresa atuais da sessão"""
+    @functools.wraps(funcao)
+    def medida(*args, **kwargs):
+        if not rastreador.ativo: return funcao(*args, **kwargs)
+        empresa = st.session_state.get("company") or {}
+        with rastreador.span(funcao.__name__, pagina=st.session_state.get("pagina_atual"), tenant=empresa.get("id")):
+            return funcao(*args, **kwargs)
+    return medida
+
+# --- CONEXÃO COM O BANCO ---
+# [backend] tipo = "supabase" (padrão) ou "sqlite" (caminho = "...") nos secrets
+# [pool] max_sessoes = 500, ocioso_segundos = 1800, renovar_antes_segundos = 300 (clientes por sessão)
+@st.cache_resource
+def init_connection():
+    cfg_backend = dict(st.secrets.get("backend", {}))
+    # Com [rastreamento] configurado, toda chamada ao backend passa pelo proxy observado
+    if st.secrets.get("rastreamento"): cfg_backend["observar"] = True
+    return criar_pool_sessoes(cfg_backend, st.secrets.get("supabase"), dict(st.secrets.get("pool", {})))
+
+pool_sessoes = init_connection()
+
+def chave_sessao():
+    if 'chave_sessao' not in st.session_state: st.session_state.chave_sessao = uuid.uuid4().hex
+    return st.session_state.chave_sessao
+
+class RepositorioDaSessao:
+    """`repo` das telas: cada método é resolvido no repositório autenticado da sessão atual.
+    O método fica ligado a esse repositório, então escritas enfileiradas para os workers
+    continuam usando o token de quem as enviou"""
+    def __getattr__(self, nome):
+        return getattr(pool_sessoes.obter(chave_sessao()), nome)
+
+repo = RepositorioDaSessao()
+
+# --- SANDBOX DO ANALISTA ---
+# Com o Gemini configurado ([google] api_key), os workers do sandbox sobem na partida do processo
+# e importam pandas/pyarrow em paralelo ao app, em vez de atrasar a primeira pergunta
+@st.cache_resource
+def init_sandbox():
+    if st.secrets.get("google", {}).get("api_key"): return obter_pool()
+
+init_sandbox()
+
+# --- CACHE DE LEITURAS (COMPARTILHADO ENTRE SESSÕES) ---
+CACHE_TTL_SEGUNDOS = 300
+CACHE_MAX_ENTRADAS = 1024
+
+class CacheLeituras:
+    """Cache LRU com TTL, chaveado por (empresa, tabela, parâmetros da consulta)"""
+    def __init__(self, ttl=CACHE_TTL_SEGUNDOS, max_entradas=CACHE_MAX_ENTRADAS, rotulo="consulta"):
+        self.ttl = ttl
+        self.max_entradas = max_entradas
+        self.rotulo = rotulo  # nome do span de cada carga (falta no cache)
+        self._dados = OrderedDict()
+        self._geracoes = {}
+        self._lock = threading.Lock()
+
+    _AUSENTE = object()
+
+    def consultar(self, company_id, tabela, params, padrao=None):
+        chave = (company_id, tabela, tuple(sorted(params.items())))
+        with self._lock:
+            item = self._dados.get(chave)
+            if item and time.monotonic() - item[0] < self.ttl:
+                self._dados.move_to_end(chave)
+                return item[1]
+        return padrao
+
+    def guardar(self, company_id, tabela, params, valor, geracao=None):
+        chave = (company_id, tabela, tuple(sorted(params.items())))
+        with self._lock:
+            # Se houve escrita durante a leitura, não guarda um valor possivelmente velho
+            if geracao is not None and self._geracoes.get((company_id, tabela), 0) != geracao: return
+            self._dados[chave] = (time.monotonic(), valor)
+            self._dados.move_to_end(chave)
+            while len(self._dados) > self.max_entradas:
+                self._dados.popitem(last=False)
+
+    def geracao(self, company_id, tabela):
+        with self._lock:
+            return self._geracoes.get((company_id, tabela), 0)
+
+    def obter(self, company_id, tabela, params, carregar):
+        valor = self.consultar(company_id, tabela, params, self._AUSENTE)
+        if valor is not self._AUSENTE: return valor
+        geracao = self.geracao(company_id, tabela)
+        with rastreador.span(self.rotulo, tabela=tabela, filtro=", ".join(f"{k}={v}" for k, v in sorted(params.items()))):
+            valor = carregar()
+        self.guardar(company_id, tabela, params, valor, geracao)
+        return valor
+
+    def invalidar(self, company_id, tabela, filtro=None):
+        """Remove as entradas cujo escopo inclui o filtro (parâmetro ausente = escopo total)"""
+        filtro = filtro or {}
+        with self._lock:
+            self._geracoes[(company_id, tabela)] = self._geracoes.get((company_id, tabela), 0) + 1
+            alvo = []
+            for chave in self._dados:
+                if chave[0] != company_id or chave[1] != tabela: continue
+                params = dict(chave[2])
+                if all(params.get(k, v) == v for k, v in filtro.items()): alvo.append(chave)
+            for chave in alvo: del self._dados[chave]
+
+@st.cache_resource
+def init_cache_leituras():
+    cfg = st.secrets.get("cache", {})
+    return CacheLeituras(
+        ttl=cfg.get("ttl_segundos", CACHE_TTL_SEGUNDOS),
+        max_entradas=cfg.get("max_entradas", CACHE_MAX_ENTRADAS)
+    )
+
+cache_leituras = init_cache_leituras()
+
+# --- FUNÇÕES DE NEGÓCIO ---
+
+def init_session():
+    if 'user' not in st.session_state: st.session_state.user = None
+    if 'company' not in st.session_state: st.session_state.company = None
+    if 'chat_history' not in st.session_state: st.session_state.chat_history = []
+    if 'acesso' not in st.session_state: st.session_state.acesso = None
+    if 'tarefa_analise' not in st.session_state: st.session_state.tarefa_analise = None
+    # Sessão encerrada pelo pool (ociosa ou token não renovado): o cliente dela não está mais autenticado
+    if st.session_state.user is not None and not pool_sessoes.ativa(chave_sessao()):
+        limpar_sessao()
+        avisar("Sua sessão expirou. Entre novamente.", "⏳")
+
+def cancelar_analise():
+    tarefa = st.session_state.get('tarefa_analise')
+    if tarefa is not None:
+        tarefa.cancelar.set()
+        if tarefa.future: tarefa.future.cancel()
+    st.session_state.tarefa_analise = None
+
+def login_user(email, password):
+    try:
+        st.session_state.user = repo.entrar(email, password)
+    except Exception as e:
+        st.error(f"Erro no login: Verifique suas credenciais.")
+        return
+    avisar("Login realizado com sucesso!")
+    st.rerun()
+
+def limpar_sessao():
+    st.session_state.user = None
+    cancelar_analise()
+    st.session_state.company = None
+    st.session_state.acesso = None
+    st.session_state.chat_history = []
+
+def logout():
+    # Só o logout faz sign out; o pool, ao retirar uma sessão ociosa, apenas descarta o cliente
+    if pool_sessoes.ativa(chave_sessao()): repo.sair()
+    pool_sessoes.remover(chave_sessao())
+    limpar_sessao()
+    st.rerun()
+
+def get_user_companies(user_id):
+    return repo.listar_empresas_usuario(user_id)
+
+def create_company(user_id, company_name):
+    try:
+        new_company_id = repo.criar_empresa(company_name)
+        # CRIA COM PERMISSÕES PADRÃO COMPLETAS PARA O ADMIN
+        repo.adicionar_membro(new_company_id, user_id, "admin", TELAS_APP)
+        marcar_membros_alterados(new_company_id)
+    except Exception as e:
+        st.error(f"Erro ao criar empresa: {e}")
+        return
+    avisar(f"Empresa {company_name} criada!")
+    st.rerun()
+
+def update_company_name(company_id, new_name):
+    # Otimista: a sessão já usa o nome novo enquanto a fila grava
+    fila_escritas.enviar((company_id, "empresa", "nome"), repo.renomear_empresa, company_id, new_name,
+                         dados={"nome": new_name}, autor=st.session_state.user.id)
+    st.session_state.company['name'] = new_name
+    avisar("Nome atualizado!")
+    st.rerun()
+
+# --- CORREÇÃO CRÍTICA AQUI: TRATAMENTO DE JSON/LISTA DO BANCO ---
+def get_user_details(company_id, user_id):
+    """Retorna o Role e a Lista de Permissões com tratamento de tipos"""
+    try:
+        membro = repo.get_membro(company_id, user_id)
+        if membro:
+            role = membro['role'].strip().lower() # Garante que 'Admin ' vire 'admin'
+            return role, parse_permissoes(membro['permissions'])
+        return 'viewer', ["Dashboard"]
+    except:
+        return 'viewer', ["Dashboard"]
+
+def parse_permissoes(raw_perms):
+    # Verificação de tipo para evitar o erro do json.loads em lista
+    if isinstance(raw_perms, list):
+        return raw_perms
+    elif isinstance(raw_perms, str) and raw_perms:
+        return json.loads(raw_perms)
+    return ["Dashboard"] # Fallback
+
+# --- CONTEXTO DE ACESSO (CARREGADO UMA VEZ POR SESSÃO) ---
+ACESSO_TTL_SEGUNDOS = 600
+
+@st.cache_resource
+def init_versoes_membros():
+    # company_id -> contador de alterações de membros, compartilhado entre sessões
+    return {}
+
+versoes_membros = init_versoes_membros()
+
+def marcar_membros_alterados(company_id):
+    versoes_membros[company_id] = versoes_membros.get(company_id, 0) + 1
+
+def get_contexto_acesso(company_id, user_id):
+    """Role e permissões do usuário na empresa, recarregados só quando os membros mudam ou o TTL expira"""
+    ttl = st.secrets.get("acesso", {}).get("ttl_segundos", ACESSO_TTL_SEGUNDOS)
+    versao = versoes_membros.get(company_id, 0)
+    ctx = st.session_state.acesso
+    if (ctx is None or ctx['company_id'] != company_id or ctx['user_id'] != user_id
+            or ctx['versao'] != versao or time.monotonic() - ctx['carregado_em'] > ttl):
+        role, perms = get_user_details(company_id, user_id)
+        ctx = {
+            'company_id': company_id, 'user_id': user_id,
+            'role': role, 'perms': perms,
+            'versao': versao, 'carregado_em': time.monotonic()
+        }
+        st.session_state.acesso = ctx
+    return ctx
+
+def get_membros_pagina(company_id, pagina, por_pagina, busca=None):
+    """Membros, roles e permissões em uma única chamada. Retorna (membros, total)"""
+    linhas = repo.listar_membros(company_id, por_pagina, (pagina - 1) * por_pagina, busca)
+    membros = []
+    for m in linhas:
+        membros.append({
+            "user_id": m['user_id'], "email": m['email'],
+            "role": m['role'].strip().lower(), "perms": parse_permissoes(m['permissions'])
+        })
+    total = linhas[0]['total'] if linhas else 0
+    return membros, total
+
+def aplicar_alteracoes_equipe(company_id, alteracoes, remover):
+    """Aplica as edições de role/permissões (update por membro) e as remoções (um delete)"""
+    repo.atualizar_membros(company_id, [{"user_id": uid, "role": role, "permissions": perms} for uid, role, perms in alteracoes])
+    repo.remover_membros(company_id, remover)
+    if alteracoes or remover:
+        marcar_membros_alterados(company_id)
+
+def get_config_dias(company_id):
+    def carregar():
+        dias = repo.get_config_dias(company_id)
+        if dias is not None: return json.loads(dias) if isinstance(dias, str) else dias
+        return [0, 1, 2, 3, 4]
+    return cache_leituras.obter(company_id, "config_dias_uteis", {}, carregar)
+
+def salvar_config_dias(company_id, lista_dias):
+    repo.salvar_config_dias(company_id, lista_dias)
+    cache_leituras.invalidar(company_id, "config_dias_uteis")
+    cache_leituras.invalidar(company_id, "calendario_uteis")
+
+def get_feriados(company_id):
+    def carregar():
+        return repo.listar_feriados(company_id)
+    return cache_leituras.obter(company_id, "feriados", {}, carregar)
+
+def salvar_feriados_lote(company_id, upserts, ids_del):
+    # Exclusões antes do upsert, para liberar datas que foram movidas para outras linhas
+    repo.excluir_feriados(company_id, ids_del)
+    repo.salvar_feriados(company_id, upserts)
+    cache_leituras.invalidar(company_id, "feriados")
+    cache_leituras.invalidar(company_id, "calendario_uteis")
+
+@medir
+def get_calendario(company_id):
+    """Calendário de dias úteis da empresa, montado uma vez e descartado quando a configuração
+    de dias de trabalho ou os feriados mudam"""
+    def carregar():
+        from calendario_uteis import CalendarioUteis
+        return CalendarioUteis(get_config_dias(company_id), [f['data'] for f in get_feriados(company_id)])
+    return cache_leituras.obter(company_id, "calendario_uteis", {}, carregar)
+
+def get_meta_mes(company_id, ano, mes):
+    def carregar():
+        meta = repo.get_meta(company_id, ano, mes)
+        return meta['meta_mensal'] if meta else 0
+    return cache_leituras.obter(company_id, "metas", {"ano": ano, "mes": mes}, carregar)
+
+def get_metas(company_id):
+    def carregar():
+        return repo.listar_metas(company_id)
+    return cache_leituras.obter(company_id, "metas", {}, carregar)
+
+def get_vendas_mes(company_id, ano, mes):
+    def carregar():
+        ultimo_dia = calendar.monthrange(ano, mes)[1]
+        return repo.listar_vendas(company_id, f"{ano}-{mes:02d}-01", f"{ano}-{mes:02d}-{ultimo_dia}")
+    return cache_leituras.obter(company_id, "vendas_diarias", {"ano": ano, "mes": mes}, carregar)
+
+def get_resumo_mes(company_id, ano, mes):
+    """Total, quantidade, mínimo e máximo diário do mês, lidos de uma única linha de rollup"""
+    def carregar():
+        inicio = date(ano, mes, 1)
+        linhas = repo.listar_rollups(company_id, 'M', inicio, inicio)
+        return linhas[0] if linhas else {"total": 0, "qtd": 0, "minimo": None, "maximo": None}
+    return cache_leituras.obter(company_id, "vendas_rollup", {"nivel": "M", "ano": ano, "mes": mes}, carregar)
+
+def _anos_dos_rollups(linhas):
+    return sorted({int(str(l['periodo'])[:4]) for l in linhas} | {date.today().year})
+
+def get_anos_disponiveis(company_id):
+    """Anos com vendas registradas (pelos rollups anuais), sempre incluindo o ano corrente"""
+    def carregar():
+        return _anos_dos_rollups(repo.listar_rollups(company_id, 'A', date(1900, 1, 1), date(9999, 12, 31)))
+    return cache_leituras.obter(company_id, "vendas_rollup", {"nivel": "A"}, carregar)
+
+@medir
+def get_serie_mensal(company_id, anos):
+    """Realizado, meta e % de atingimento por (ano, mês), a partir dos rollups mensais já agregados no banco"""
+    import numpy as np
+    import pandas as pd
+    def carregar():
+        return repo.listar_rollups(company_id, 'M', date(min(anos), 1, 1), date(max(anos), 12, 1))
+    rollups = cache_leituras.obter(company_id, "vendas_rollup", {"nivel": "M", "anos": (min(anos), max(anos))}, carregar)
+
+    grade = pd.MultiIndex.from_product([sorted(anos), range(1, 13)], names=['ano', 'mes']).to_frame(index=False)
+    df_real = pd.DataFrame(rollups, columns=['periodo', 'total'])
+    periodo = pd.to_datetime(df_real['periodo'])
+    df_real = pd.DataFrame({'ano': periodo.dt.year, 'mes': periodo.dt.month, 'realizado': df_real['total'].astype(float)})
+    df_meta = pd.DataFrame(get_metas(company_id), columns=['ano', 'mes', 'meta_mensal']).rename(columns={'meta_mensal': 'meta'})
+
+    df = grade.merge(df_real, on=['ano', 'mes'], how='left').merge(df_meta, on=['ano', 'mes'], how='left')
+    df[['realizado', 'meta']] = df[['realizado', 'meta']].astype(float).fillna(0)
+    df['atingimento'] = np.where(df['meta'] > 0, df['realizado'] / df['meta'].where(df['meta'] > 0) * 100, np.nan)
+    uteis = get_calendario(company_id).dias_uteis_meses(df['ano'].to_numpy(), df['mes'].to_numpy())
+    df['dias_uteis'] = uteis['total']
+    df['dias_uteis_decorridos'] = uteis['decorridos']
+    df['media_dia_util'] = df['realizado'] / df['dias_uteis_decorridos'].where(df['dias_uteis_decorridos'] > 0)
+    df['mes_nome'] = df['mes'].map(MESES_PT)
+    return df
+
+EXTRATO_POR_PAGINA = 100
+
+def get_vendas_pagina(company_id, inicio, fim, antes_de=None):
+    """Uma página do extrato (+1 linha, para saber se existe a próxima)"""
+    def carregar():
+        return repo.listar_vendas_pagina(company_id, inicio, fim, EXTRATO_POR_PAGINA + 1, antes_de)
+    params = {"inicio": str(inicio), "fim": str(fim), "antes_de": antes_de, "limite": EXTRATO_POR_PAGINA + 1}
+    return cache_leituras.obter(company_id, "vendas_diarias", params, carregar)
+
+def get_resumo_periodo(company_id, inicio, fim):
+    def carregar():
+        return repo.resumo_vendas(company_id, inicio, fim)
+    return cache_leituras.obter(company_id, "vendas_diarias", {"inicio": str(inicio), "fim": str(fim), "resumo": True}, carregar)
+
+def get_venda_dia(company_id, data_venda):
+    """Total do dia com o lançamento avulso (ver Repositorio.buscar_venda), ou None"""
+    def carregar():
+        return repo.buscar_venda(company_id, data_venda)
+    # ano/mes na chave: uma escrita no mês (invalidar_vendas) descarta a entrada
+    params = {"ano": data_venda.year, "mes": data_venda.month, "dia": str(data_venda)}
+    return cache_leituras.obter(company_id, "vendas_diarias", params, carregar)
+
+def get_resumo_vendedores(company_id, ano, mes):
+    """Total e quantidade de vendas por vendedor e canal no mês (somados no banco)"""
+    def carregar():
+        ultimo_dia = calendar.monthrange(ano, mes)[1]
+        return repo.resumo_vendedores(company_id, date(ano, mes, 1), date(ano, mes, ultimo_dia))
+    return cache_leituras.obter(company_id, "vendas_vendedor", {"ano": ano, "mes": mes, "resumo": True}, carregar)
+
+def get_vendas_vendedor_mes(company_id, ano, mes):
+    """Totais diários por vendedor e canal no mês (uma linha por dia/vendedor/canal, não por venda)"""
+    def carregar():
+        ultimo_dia = calendar.monthrange(ano, mes)[1]
+        return repo.listar_vendas_vendedor(company_id, date(ano, mes, 1), date(ano, mes, ultimo_dia))
+    return cache_leituras.obter(company_id, "vendas_vendedor", {"ano": ano, "mes": mes}, carregar)
+
+def dia_venda(data_venda):
+    """data_venda (date, datetime/Timestamp ou texto ISO) como date"""
+    return date.fromisoformat(str(data_venda)[:10])
+
+def invalidar_vendas(company_id, data_venda):
+    dt = dia_venda(data_venda)
+    # Os totais do dia e os rollups do mês/ano são recalculados no banco a cada escrita em vendas
+    for tabela in ("vendas_diarias", "vendas_vendedor", "vendas_rollup"):
+        cache_leituras.invalidar(company_id, tabela, {"ano": dt.year, "mes": dt.month})
+
+# --- FILA DE ESCRITAS (GRAVAÇÃO EM SEGUNDO PLANO) ---
+ESCRITAS_ATUALIZAR_SEGUNDOS = 2
+
+@st.cache_resource
+def init_fila_escritas():
+    cfg = st.secrets.get("escritas", {})
+    return FilaEscritas(workers=cfg.get("workers", 2), tentativas=cfg.get("tentativas", 3))
+
+fila_escritas = init_fila_escritas()
+
+def enviar_venda(company_id, data_venda, valor):
+    """Grava o lançamento avulso do dia (ou, com valor=None, exclui todas as vendas do dia) em
+    segundo plano. Envios para o mesmo dia ainda não gravados se fundem; ao gravar, só o mês
+    afetado sai do cache"""
+    dia = str(dia_venda(data_venda))
+    if valor is None: funcao, args = repo.excluir_vendas_dia, (company_id, dia)
+    else: funcao, args = repo.salvar_venda, (company_id, dia, float(valor))
+    fila_escritas.enviar(
+        (company_id, "venda", dia), funcao, *args,
+        dados={"data_venda": dia, "valor_venda": valor}, autor=st.session_state.user.id,
+        ao_gravar=lambda: invalidar_vendas(company_id, dia)
+    )
+
+def registrar_venda(company_id, data_venda, valor, vendedor=None, canal=None):
+    """Registra uma venda individual em segundo plano. Cada envio é uma transação nova (não se
+    funde com outros) e não entra na visão otimista: aparece quando o total do dia for regravado"""
+    dia = str(dia_venda(data_venda))
+    linha = {"data_venda": dia, "valor_venda": float(valor), "vendedor": vendedor or None, "canal": canal or None}
+    fila_escritas.enviar(
+        (company_id, "transacao", uuid.uuid4().hex), repo.registrar_vendas, company_id, [linha],
+        dados=linha, autor=st.session_state.user.id, ao_gravar=lambda: invalidar_vendas(company_id, dia)
+    )
+
+def vendas_pendentes(company_id, ano, mes):
+    """{data: valor (None = exclusão)} das escritas do mês ainda não confirmadas"""
+    prefixo_mes = f"{ano}-{mes:02d}"
+    return {
+        e.dados['data_venda']: e.dados['valor_venda']
+        for e in fila_escritas.em_aberto((company_id, "venda"))
+        if e.dados['data_venda'].startswith(prefixo_mes)
+    }
+
+def aplicar_pendentes(vendas, pendentes):
+    """Lista de vendas como ficará depois das escritas pendentes (visão otimista)"""
+    if not pendentes: return vendas
+    por_dia = {str(v['data_venda'])[:10]: v for v in vendas}
+    for dia, valor in pendentes.items():
+        if valor is None: por_dia.pop(dia, None)
+        # Dia com vendas individuais: o avulso é só parte do total, que vem do banco após a gravação
+        elif por_dia.get(dia, {}).get('qtd', 1) > 1: continue
+        else: por_dia[dia] = {**por_dia.get(dia, {"id": None}), "data_venda": dia, "valor_venda": valor}
+    return [por_dia[d] for d in sorted(por_dia)]
+
+def avisar(mensagem, icone="✅"):
+    # Mostrado como toast no próximo rerun (sobrevive ao st.rerun)
+    st.session_state.avisos = st.session_state.get('avisos', []) + [(mensagem, icone)]
+
+def mostrar_avisos():
+    for mensagem, icone in st.session_state.pop('avisos', []):
+        st.toast(mensagem, icon=icone)
+
+@st.fragment(run_every=ESCRITAS_ATUALIZAR_SEGUNDOS)
+def indicador_escritas(company_id):
+    abertas = fila_escritas.em_aberto((company_id,))
+    if abertas:
+        st.caption(f"⏳ {len(abertas)} gravação(ões) pendente(s)...")
+    for e in fila_escritas.falhas((company_id,), autor=st.session_state.user.id):
+        if e.chave[1] in ("venda", "transacao"): descricao = f"venda de {dia_venda(e.dados['data_venda']):%d/%m/%Y}"
+        else: descricao = "alteração do nome da empresa"
+        st.error(f"❌ Não foi possível gravar a {descricao}: {e.erro}")
+        c1, c2 = st.columns(2)
+        if c1.button("🔁 Tentar", key=f"reenviar_{e.chave}"):
+            fila_escritas.reenviar(e)
+            st.rerun()  # Volta a mostrar o valor otimista nos painéis
+        if c2.button("✖ Descartar", key=f"descartar_{e.chave}"):
+            fila_escritas.descartar(e.chave)
+            st.rerun()
+
+@medir
+def get_carteira_mes(company_ids, ano, mes):
+    """Vendas diárias (rollups D) e meta do mês de várias empresas. O que já está no cache
+    (inclusive o que o painel de cada empresa leu) não é relido; o resto vem numa única
+    consulta por tabela. Retorna ({company_id: [rollups do dia]}, {company_id: meta})"""
+    params_dia, params_meta = {"nivel": "D", "ano": ano, "mes": mes}, {"ano": ano, "mes": mes}
+    diarios = {cid: cache_leituras.consultar(cid, "vendas_rollup", params_dia) for cid in company_ids}
+    metas = {cid: cache_leituras.consultar(cid, "metas", params_meta) for cid in company_ids}
+
+    faltando = [cid for cid, v in diarios.items() if v is None]
+    if faltando:
+        geracoes = {cid: cache_leituras.geracao(cid, "vendas_rollup") for cid in faltando}
+        ultimo_dia = calendar.monthrange(ano, mes)[1]
+        lidos = {cid: [] for cid in faltando}
+        for linha in repo.listar_rollups_empresas(faltando, 'D', date(ano, mes, 1), date(ano, mes, ultimo_dia)):
+            lidos[linha['company_id']].append(linha)
+        for cid, linhas in lidos.items():
+            cache_leituras.guardar(cid, "vendas_rollup", params_dia, linhas, geracoes[cid])
+        diarios.update(lidos)
+
+    faltando = [cid for cid, v in metas.items() if v is None]
+    if faltando:
+        geracoes = {cid: cache_leituras.geracao(cid, "metas") for cid in faltando}
+        lidas = {cid: 0 for cid in faltando}
+        lidas.update({m['company_id']: m['meta_mensal'] for m in repo.listar_metas_empresas(faltando, ano, mes)})
+        for cid, meta in lidas.items():
+            # Mesmo formato de get_meta_mes, para o painel da empresa aproveitar a entrada
+            cache_leituras.guardar(cid, "metas", params_meta, meta, geracoes[cid])
+        metas.update(lidas)
+    return diarios, metas
+
+def get_anos_carteira(company_ids):
+    """União de get_anos_disponiveis das empresas, com as mesmas entradas de cache; as que faltam
+    vêm numa única consulta aos rollups anuais"""
+    anos = {cid: cache_leituras.consultar(cid, "vendas_rollup", {"nivel": "A"}) for cid in company_ids}
+    faltando = [cid for cid, v in anos.items() if v is None]
+    if faltando:
+        geracoes = {cid: cache_leituras.geracao(cid, "vendas_rollup") for cid in faltando}
+        lidos = {cid: [] for cid in faltando}
+        for linha in repo.listar_rollups_empresas(faltando, 'A', date(1900, 1, 1), date(9999, 12, 31)):
+            lidos[linha['company_id']].append(linha)
+        for cid, linhas in lidos.items():
+            anos[cid] = _anos_dos_rollups(linhas)
+            cache_leituras.guardar(cid, "vendas_rollup", {"nivel": "A"}, anos[cid], geracoes[cid])
+    return sorted(set().union(*anos.values(), {date.today().year}))
+
+def empresas_com_painel(empresas):
+    """Empresas em que o usuário pode ver o Dashboard"""
+    return [
+        e for e in empresas
+        if (e.get('role') or '').strip().lower() == 'admin' or "Dashboard" in parse_permissoes(e.get('permissions'))
+    ]
+
+# --- INDICADORES DO MÊS (DASHBOARD) ---
+@medir
+def get_kpis_mes(company_id, ano, mes):
+    meta_val = get_meta_mes(company_id, ano, mes)
+    pendentes = vendas_pendentes(company_id, ano, mes)
+    if pendentes:
+        total_vendido = sum(v['valor_venda'] for v in aplicar_pendentes(get_vendas_mes(company_id, ano, mes), pendentes))
+    else:
+        total_vendido = get_resumo_mes(company_id, ano, mes)['total']
+    dias_uteis = get_calendario(company_id).dias_uteis_restantes(ano, mes)
+    falta = max(0, meta_val - total_vendido)
+    return {
+        "meta": meta_val, "total": total_vendido, "falta": falta, "dias_uteis": dias_uteis,
+        "percentual": (total_vendido / meta_val * 100) if meta_val > 0 else 0,
+        "meta_diaria": falta / dias_uteis if dias_uteis > 0 else 0,
+    }
+
+@medir
+def get_df_vendas_mes(company_id, ano, mes):
+    import pandas as pd
+    vendas = aplicar_pendentes(get_vendas_mes(company_id, ano, mes), vendas_pendentes(company_id, ano, mes))
+    df_vendas = pd.DataFrame(vendas)
+    if not df_vendas.empty: df_vendas['data_venda'] = pd.to_datetime(df_vendas['data_venda'])
+    return df_vendas
+
+# --- PROJEÇÃO DO FECHAMENTO (MONTE CARLO) ---
+def _params_projecao(company_id, ano, mes, meta, hoje):
+    # Na tabela dos rollups: uma venda gravada no mês descarta a projeção junto com eles. A geração
+    # do calendário na chave faz feriados/dias de trabalho alterados pedirem uma projeção nova
+    return {"ano": ano, "mes": mes, "projecao": True, "meta": float(meta), "hoje": str(hoje),
+            "calendario": cache_leituras.geracao(company_id, "calendario_uteis")}
+
+def _periodo_projecao(ano, mes, hoje):
+    """Totais diários que a projeção lê: a janela de histórico antes de hoje e o mês inteiro"""
+    from projecao import JANELA_HISTORICO_DIAS
+    inicio = min(date(ano, mes, 1), hoje) - timedelta(days=JANELA_HISTORICO_DIAS)
+    return inicio, date(ano, mes, calendar.monthrange(ano, mes)[1])
+
+@medir
+def get_projecao_mes(company_id, ano, mes):
+    """Fechamento projetado do mês (ver projecao.projetar_mes). None para meses encerrados ou sem histórico"""
+    hoje = date.today()
+    if (ano, mes) < (hoje.year, hoje.month): return None
+    meta = get_meta_mes(company_id, ano, mes)
+    def carregar():
+        from projecao import projetar_mes
+        linhas = repo.listar_rollups(company_id, 'D', *_periodo_projecao(ano, mes, hoje))
+        return projetar_mes(get_calendario(company_id), [l['periodo'] for l in linhas],
+                            [float(l['total']) for l in linhas], ano, mes, float(meta), hoje)
+    return cache_leituras.obter(company_id, "vendas_rollup", _params_projecao(company_id, ano, mes, meta, hoje), carregar)
+
+@medir
+def get_projecoes_carteira(company_ids, ano, mes, metas):
+    """Projeções do mês de várias empresas ({company_id: projeção ou None}). As que o cache não
+    tem saem de uma única consulta de totais diários e de uma simulação em lote"""
+    hoje = date.today()
+    if (ano, mes) < (hoje.year, hoje.month): return {cid: None for cid in company_ids}
+    params = {cid: _params_projecao(cid, ano, mes, metas.get(cid) or 0, hoje) for cid in company_ids}
+    ausente = object()
+    projecoes = {cid: cache_leituras.consultar(cid, "vendas_rollup", params[cid], ausente) for cid in company_ids}
+
+    faltando = [cid for cid, p in projecoes.items() if p is ausente]
+    if faltando:
+        geracoes = {cid: cache_leituras.geracao(cid, "vendas_rollup") for cid in faltando}
+        historico = {cid: ([], []) for cid in faltando}
+        for linha in repo.listar_rollups_empresas(faltando, 'D', *_periodo_projecao(ano, mes, hoje)):
+            datas, valores = historico[linha['company_id']]
+            datas.append(linha['periodo'])
+            valores.append(float(linha['total']))
+        entradas = {cid: (get_calendario(cid), datas, valores, params[cid]["meta"]) for cid, (datas, valores) in historico.items()}
+        from projecao import projetar_empresas
+        calculadas = projetar_empresas(entradas, ano, mes, hoje)
+        for cid, projecao in calculadas.items():
+            cache_leituras.guardar(cid, "vendas_rollup", params[cid], projecao, geracoes[cid])
+        projecoes.update(calculadas)
+    return projecoes
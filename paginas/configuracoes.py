@@ -0,0 +1,53 @@
+"""Configurações: dias de trabalho e feriados da empresa (somente administradores)."""
+import pandas as pd
+import streamlit as st
+
+from nucleo import get_config_dias, get_feriados, medir, salvar_config_dias, salvar_feriados_lote
+from paginas.edicao_feriados import diff_feriados
+
+@medir
+def render_config(company_id, user_role):
+    if user_role not in ['admin']:
+        st.warning("Você não tem permissão (Administrador).")
+        return
+
+    st.title("⚙️ Configurações")
+    st.subheader("Dias de Trabalho")
+    dias_atuais = get_config_dias(company_id)
+    nomes = ["Seg", "Ter", "Qua", "Qui", "Sex", "Sáb", "Dom"]
+    novos_dias = []
+    cols = st.columns(7)
+    for i, nome in enumerate(nomes):
+        if cols[i].checkbox(nome, value=(i in dias_atuais)): novos_dias.append(i) 
+    if st.button("Salvar Dias"):
+        salvar_config_dias(company_id, novos_dias)
+        st.success("Salvo!")
+        st.rerun()
+
+    st.divider()
+    st.subheader("Feriados")
+    c1, c2 = st.columns([1,2])
+    with c1:
+        with st.form("add_fer"):
+            dt = st.date_input("Data")
+            desc = st.text_input("Nome")
+            if st.form_submit_button("Adicionar"):
+                salvar_feriados_lote(company_id, [{"data": str(dt), "descricao": desc}], [])
+                st.rerun()
+    with c2:
+        feriados = get_feriados(company_id)
+        if feriados:
+            df = pd.DataFrame(feriados)
+            df['data'] = pd.to_datetime(df['data']).dt.date
+            edited = st.data_editor(df[['id', 'data', 'descricao']], hide_index=True, key="fer_edit", disabled=["id"], num_rows="dynamic")
+            if st.button("Salvar Tabela"):
+                erros, upserts, ids_del = diff_feriados(df, edited)
+                if erros:
+                    for erro in erros: st.error(erro)
+                elif not upserts and not ids_del:
+                    st.info("Nenhuma alteração para salvar.")
+                else:
+                    salvar_feriados_lote(company_id, upserts, ids_del)
+                    st.rerun()
+
+render_config(st.session_state.company['id'], st.session_state.acesso['role'])
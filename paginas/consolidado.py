@@ -0,0 +1,95 @@
+"""Visão Consolidada: vendas e metas do mês de todas as empresas do usuário."""
+from datetime import date
+
+import pandas as pd
+import streamlit as st
+
+from formatacao import MESES_PT, format_moeda
+from graficos import fig_acumulado, fig_gauge_percentual, fig_gauge_vendas
+from nucleo import get_anos_carteira, get_carteira_mes, get_projecoes_carteira, medir
+from tela_exportacao import render_exportacao
+
+@medir
+def render_carteira(empresas):
+    st.title("🏬 Visão Consolidada")
+    st.write("Vendas e metas do mês de todas as suas empresas.")
+
+    hoje = date.today()
+    nomes = {e['id']: e['name'] for e in empresas}
+    c1, c2, _ = st.columns([1, 1, 2])
+    with c1:
+        anos = get_anos_carteira(list(nomes))
+        ano = st.selectbox("Ano", anos, index=anos.index(hoje.year), key="cart_a")
+    with c2:
+        lista_meses = list(MESES_PT.values())
+        mes = lista_meses.index(st.selectbox("Mês", lista_meses, index=hoje.month - 1, key="cart_m")) + 1
+
+    diarios, metas = get_carteira_mes(list(nomes), ano, mes)
+
+    df_diario = pd.DataFrame(
+        [(cid, l['periodo'], l['total']) for cid, linhas in diarios.items() for l in linhas],
+        columns=['company_id', 'data_venda', 'valor_venda']
+    )
+    df_diario['data_venda'] = pd.to_datetime(df_diario['data_venda'])
+    df_diario['valor_venda'] = df_diario['valor_venda'].astype(float)
+
+    resumo = pd.DataFrame({'company_id': list(nomes)})
+    resumo['Empresa'] = resumo['company_id'].map(nomes)
+    resumo['realizado'] = resumo['company_id'].map(df_diario.groupby('company_id')['valor_venda'].sum()).fillna(0)
+    resumo['meta'] = resumo['company_id'].map(metas).astype(float).fillna(0)
+    resumo['atingimento'] = resumo['realizado'] / resumo['meta'].where(resumo['meta'] > 0) * 100
+    resumo['falta'] = (resumo['meta'] - resumo['realizado']).clip(lower=0)
+    resumo = resumo.sort_values(['atingimento', 'realizado'], ascending=False, na_position='last').reset_index(drop=True)
+    resumo.insert(0, 'Posição', resumo.index + 1)
+
+    # Mês em andamento: fechamento projetado (mediana) e chance de bater a meta, em lote
+    projecoes = get_projecoes_carteira(list(nomes), ano, mes, metas)
+    resumo['projecao'] = resumo['company_id'].map(lambda c: projecoes[c]['banda'][50] if projecoes[c] else None)
+    resumo['chance'] = resumo['company_id'].map(
+        lambda c: projecoes[c]['probabilidade'] * 100 if projecoes[c] and projecoes[c]['probabilidade'] is not None else None
+    )
+    colunas = ['Posição', 'Empresa', 'realizado', 'meta', 'atingimento', 'falta']
+    if resumo['projecao'].notna().any(): colunas += ['projecao', 'chance']
+
+    total_vendido, meta_total = resumo['realizado'].sum(), resumo['meta'].sum()
+    percentual = (total_vendido / meta_total * 100) if meta_total > 0 else 0
+
+    st.markdown("---")
+    col_g1, col_g2 = st.columns(2)
+    with col_g1:
+        st.plotly_chart(fig_gauge_vendas(total_vendido, meta_total, titulo="Total Consolidado"), use_container_width=True)
+    with col_g2:
+        st.plotly_chart(fig_gauge_percentual(percentual), use_container_width=True)
+    st.caption(f"{len(resumo)} empresas · Faltando p/ a meta: {format_moeda(max(0, meta_total - total_vendido))}")
+
+    st.markdown("### 🏆 Ranking de Atingimento")
+    st.dataframe(
+        resumo[colunas],
+        column_config={
+            'realizado': st.column_config.NumberColumn("Realizado", format="R$ %.2f"),
+            'meta': st.column_config.NumberColumn("Meta", format="R$ %.2f"),
+            'atingimento': st.column_config.ProgressColumn("% Meta", min_value=0, max_value=100, format="%.1f%%"),
+            'falta': st.column_config.NumberColumn("Faltando", format="R$ %.2f"),
+            'projecao': st.column_config.NumberColumn("Fechamento Projetado", format="R$ %.2f"),
+            'chance': st.column_config.ProgressColumn("Chance da Meta", min_value=0, max_value=100, format="%.0f%%"),
+        },
+        hide_index=True, use_container_width=True
+    )
+
+    st.markdown("### 📈 Evolução no Mês")
+    opcoes = ["Todas as empresas"] + resumo['Empresa'].tolist()
+    escolha = st.selectbox("Empresa", opcoes, key="cart_emp")
+    if escolha == opcoes[0]:
+        df_evolucao, meta_evolucao = df_diario.groupby('data_venda', as_index=False)['valor_venda'].sum(), meta_total
+    else:
+        linha = resumo[resumo['Empresa'] == escolha].iloc[0]
+        df_evolucao, meta_evolucao = df_diario[df_diario['company_id'] == linha['company_id']], linha['meta']
+    if df_evolucao.empty:
+        st.info("Sem dados neste mês.")
+    else:
+        st.plotly_chart(fig_acumulado(df_evolucao, ano, mes, meta_evolucao, hoje), use_container_width=True)
+
+    st.markdown("### ⬇️ Exportação")
+    render_exportacao(empresas, "cart_exp")
+
+render_carteira(st.session_state.empresas_painel)
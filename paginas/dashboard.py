@@ -0,0 +1,298 @@
+"""Dashboard: indicadores do mês, registro de vendas, evolução e Analista Virtual."""
+from datetime import date
+
+import pandas as pd
+import streamlit as st
+
+from analista import acompanhar_analise, entregar_resposta, responder_pergunta, resposta_rapida
+from formatacao import MESES_PT, format_moeda
+from graficos import fig_acumulado, fig_gauge_percentual, fig_gauge_vendas
+from importacao_vendas import ErroImportacao, ler_em_blocos, validar_bloco
+from nucleo import (
+    avisar, cancelar_analise, enviar_venda, get_anos_disponiveis, get_df_vendas_mes, get_kpis_mes, get_meta_mes,
+    get_projecao_mes, get_resumo_vendedores, get_vendas_vendedor_mes, invalidar_vendas, medir, registrar_venda, repo
+)
+
+# --- DIÁLOGOS ---
+@st.dialog("🚫 Data Inválida")
+def alerta_data_futura():
+    st.error("Não é permitido registrar vendas com data futura!")
+    st.write("Por favor, verifique a data selecionada e tente novamente.")
+    if st.button("OK, Entendi", use_container_width=True):
+        st.rerun()
+
+@st.dialog("📥 Importar Histórico de Vendas", width="large")
+def importar_vendas_dialog(cid):
+    if st.session_state.get('importacao_resultado') is None:
+        st.write("Envie um arquivo **.csv** ou **.xlsx** com uma coluna de **data** e uma de **valor** (um lançamento por dia).")
+        st.caption("Datas em AAAA-MM-DD ou DD/MM/AAAA. Dias que já têm lançamento avulso são sobrescritos pelo valor do arquivo. "
+                   "Com colunas **vendedor** e/ou **canal**, cada linha é uma venda individual (várias por dia) "
+                   "e é somada às já registradas; reimportar o mesmo arquivo não duplica as vendas.")
+        arquivo = st.file_uploader("Arquivo", type=["csv", "xlsx"], label_visibility="collapsed")
+        if arquivo is None or not st.button("📥 Importar", type="primary", use_container_width=True): return
+        st.session_state.importacao_resultado = importar_arquivo_vendas(cid, arquivo)
+
+    importadas, repetidas, relatorio, falha = st.session_state.importacao_resultado
+    if falha: st.error(falha)
+    if repetidas: st.info(f"{repetidas} vendas já tinham sido importadas antes e foram ignoradas.")
+    if relatorio.empty:
+        if not falha: st.success(f"✅ {importadas} lançamentos importados, sem erros.")
+    else:
+        st.warning(f"{importadas} lançamentos importados; {len(relatorio)} linhas recusadas.")
+        st.dataframe(relatorio, hide_index=True, use_container_width=True, height=250)
+        st.download_button("⬇️ Baixar relatório de erros", relatorio.to_csv(index=False, sep=";").encode("utf-8-sig"),
+                           file_name="erros_importacao.csv", mime="text/csv")
+    if st.button("Concluir", use_container_width=True):
+        st.session_state.importacao_resultado = None
+        st.rerun()
+
+def importar_arquivo_vendas(cid, arquivo):
+    """Lê, valida e grava o arquivo bloco a bloco. Retorna (importadas, repetidas de uma importação
+    anterior, relatório de erros, falha ou None)"""
+    hoje = date.today()
+    progresso = st.progress(0.0, text="Lendo arquivo...")
+    importadas, repetidas, erros, proxima_linha, falha = 0, 0, [], 2, None  # linha 1 = cabeçalho
+    datas_vistas, ocorrencias = set(), {}
+    try:
+        for bloco in ler_em_blocos(arquivo, arquivo.name):
+            validas, erros_bloco = validar_bloco(bloco, hoje, proxima_linha, datas_vistas, ocorrencias)
+            proxima_linha += len(bloco)
+            if validas and "vendedor" in validas[0]:
+                inseridas = repo.registrar_vendas(cid, validas)
+                repetidas += len(validas) - inseridas
+            else:
+                repo.salvar_vendas_lote(cid, validas)
+                inseridas = len(validas)
+            importadas += inseridas
+            erros.append(erros_bloco)
+            lido = min(arquivo.tell() / arquivo.size, 1.0) if arquivo.size else 1.0
+            progresso.progress(lido, text=f"{importadas} lançamentos importados...")
+    except ErroImportacao as e:
+        falha = str(e)
+    except Exception as e:
+        falha = f"Erro ao importar (os blocos anteriores já foram gravados): {e}"
+    finally:
+        # Invalida os meses tocados (no pior caso, tudo que já foi gravado antes de um erro)
+        for mes_venda in sorted({d[:7] for d in datas_vistas}):
+            invalidar_vendas(cid, f"{mes_venda}-01")
+    progresso.empty()
+
+    relatorio = pd.concat(erros, ignore_index=True) if erros else pd.DataFrame(columns=["linha", "data", "valor", "erro"])
+    return importadas, repetidas, relatorio, falha
+
+# --- TELA ---
+@medir
+def render_dashboard(company_id, user_role):
+    st.title(f"📊 Painel - {st.session_state.company['name']}")
+    
+    c_filtro1, c_filtro2, c_vazio = st.columns([1, 1, 2])
+    hoje = date.today()
+    
+    with c_filtro1: 
+        anos = get_anos_disponiveis(company_id)
+        ano = st.selectbox("Ano", anos, index=anos.index(hoje.year), label_visibility="collapsed")
+    with c_filtro2: 
+        lista_meses = list(MESES_PT.values())
+        idx_mes = hoje.month - 1 if hoje.month <= 12 else 0
+        mes_nome = st.selectbox("Mês", lista_meses, index=idx_mes, label_visibility="collapsed")
+        mes = lista_meses.index(mes_nome) + 1
+
+    st.markdown("---")
+
+    c_visual, c_input = st.columns([2, 1]) 
+
+    with c_visual:
+        painel_kpis(company_id, ano, mes)
+
+    with c_input:
+        painel_registro(company_id, user_role)
+
+    st.write("") 
+    st.write("") 
+
+    painel_evolucao(company_id, ano, mes)
+    painel_vendedores(company_id, ano, mes)
+    painel_chat(company_id, ano, mes)
+
+# Cada região do painel é um fragmento: interagir com o formulário ou com o chat reroda só
+# aquela região. Mudar ano/mês ou gravar uma venda reroda a página inteira.
+@st.fragment
+@medir
+def painel_kpis(company_id, ano, mes):
+    kpis = get_kpis_mes(company_id, ano, mes)
+    col_g1, col_g2 = st.columns(2)
+    chart_height = 220 
+    
+    with col_g1:
+        st.plotly_chart(fig_gauge_vendas(kpis['total'], kpis['meta'], chart_height), use_container_width=True)
+        
+        st.markdown(f"""
+            <div style="text-align: center; margin-top: -15px;">
+                <div style="font-size: 24px; font-weight: 900; color: #D32F2F;">{format_moeda(kpis['falta'])}</div>
+                <div style="font-size: 14px; font-weight: bold; color: #FFFFFF; text-transform: uppercase;">Faltando p/ a Meta</div>
+            </div>
+        """, unsafe_allow_html=True)
+
+    with col_g2:
+        st.plotly_chart(fig_gauge_percentual(kpis['percentual'], chart_height), use_container_width=True)
+        
+        st.markdown(f"""
+            <div style="text-align: center; margin-top: -15px;">
+                <div style="display: inline-block; margin-right: 15px; vertical-align: top; border-right: 1px solid #ccc; padding-right: 15px;">
+                    <div style="font-size: 24px; font-weight: 900; color: #0091EA;">{format_moeda(kpis['meta_diaria'])}</div>
+                    <div style="font-size: 12px; font-weight: bold; color: #FFFFFF; text-transform: uppercase;">Meta Diária</div>
+                </div>
+                <div style="display: inline-block; vertical-align: top;">
+                    <div style="font-size: 24px; font-weight: 900; color: #FFFFFF;">{kpis['dias_uteis']}</div>
+                    <div style="font-size: 12px; font-weight: bold; color: #FFFFFF; text-transform: uppercase;">Dias Úteis Restantes</div>
+                </div>
+            </div>
+        """, unsafe_allow_html=True)
+
+    painel_projecao(get_projecao_mes(company_id, ano, mes), kpis)
+
+def painel_projecao(projecao, kpis):
+    """Fechamento projetado por Monte Carlo (dentro do fragmento dos indicadores)"""
+    if projecao is None or not projecao['dias_restantes'].size: return
+    banda = projecao['banda']
+    st.write("")
+    c1, c2, c3 = st.columns(3)
+    c1.metric("Fechamento Projetado", format_moeda(banda[50]),
+              help="Mediana de milhares de simulações que sorteiam cada dia útil restante entre os dias "
+                   "do mesmo dia da semana nos últimos meses.")
+    c2.metric("Faixa Provável (80%)", f"{format_moeda(banda[10])} a {format_moeda(banda[90])}")
+    if projecao['probabilidade'] is not None:
+        c3.metric("Chance de Bater a Meta", f"{projecao['probabilidade'] * 100:.0f}%")
+    if kpis['falta'] > 0:
+        proximo = pd.Timestamp(projecao['dias_restantes'][0])
+        st.caption(f"Meta para {proximo:%d/%m}, ponderada pelo dia da semana: **{format_moeda(projecao['alvo_proximo'])}** "
+                   f"(linear: {format_moeda(kpis['meta_diaria'])}).")
+
+@st.fragment
+@medir
+def painel_registro(company_id, user_role):
+    hoje = date.today()
+    if user_role in ['admin', 'data_entry']:
+        with st.container(border=True):
+            st.markdown("### 📝 Registrar Venda")
+            
+            with st.form("form_venda_rapida", clear_on_submit=True):
+                data_in = st.date_input("Data da Venda", value=hoje)
+                valor_in = st.number_input("Valor Total (R$)", min_value=0.0, step=50.0)
+                c_vend, c_canal = st.columns(2)
+                vendedor_in = c_vend.text_input("Vendedor (opcional)").strip()
+                canal_in = c_canal.text_input("Canal (opcional)").strip()
+                st.caption("Com vendedor ou canal, registra uma venda individual. Sem eles, o valor é o total avulso do dia.")
+                
+                if st.form_submit_button("💾 Salvar Venda", use_container_width=True):
+                    if data_in > hoje:
+                        alerta_data_futura() 
+                    elif valor_in <= 0:
+                        st.warning("⚠️ O valor deve ser maior que zero.")
+                    else:
+                        if vendedor_in or canal_in: registrar_venda(company_id, data_in, valor_in, vendedor_in, canal_in)
+                        else: enviar_venda(company_id, data_in, valor_in)
+                        avisar("Venda enviada!")
+                        st.rerun()  # Indicadores e gráfico já mostram o valor enviado
+
+            if st.button("📥 Importar histórico (CSV/Excel)", use_container_width=True):
+                st.session_state.importacao_resultado = None
+                importar_vendas_dialog(company_id)
+    else:
+        with st.container(border=True):
+             st.info("Acesso somente de visualização.")
+
+@st.fragment
+@medir
+def painel_evolucao(company_id, ano, mes):
+    df_vendas = get_df_vendas_mes(company_id, ano, mes)
+    if df_vendas.empty:
+        st.info("Sem dados neste mês.")
+        return
+    meta_val = get_meta_mes(company_id, ano, mes)
+    st.plotly_chart(fig_acumulado(df_vendas, ano, mes, meta_val, date.today()), use_container_width=True)
+
+@st.fragment
+@medir
+def painel_vendedores(company_id, ano, mes):
+    """Vendas do mês por vendedor e por canal, somadas dos totais diários mantidos no banco"""
+    resumo = pd.DataFrame(get_resumo_vendedores(company_id, ano, mes), columns=['vendedor', 'canal', 'total', 'qtd'])
+    if not ((resumo['vendedor'] != '') | (resumo['canal'] != '')).any(): return
+    resumo['total'] = resumo['total'].astype(float)
+    resumo['qtd'] = resumo['qtd'].astype(int)
+    total_mes = resumo['total'].sum()
+
+    st.markdown("---")
+    st.subheader("🧑‍💼 Vendedores e Canais")
+    colunas = st.columns(2)
+    for coluna, campo, titulo in ((colunas[0], 'vendedor', "Vendedor"), (colunas[1], 'canal', "Canal")):
+        tabela = resumo.groupby(resumo[campo].replace('', '(não informado)'))[['total', 'qtd']].sum()
+        tabela = tabela.sort_values('total', ascending=False).reset_index()
+        tabela['participacao'] = tabela['total'] / total_mes * 100 if total_mes else 0.0
+        coluna.dataframe(
+            tabela, hide_index=True, use_container_width=True,
+            column_config={
+                campo: titulo, "qtd": "Vendas",
+                "total": st.column_config.NumberColumn("Total", format="R$ %.2f"),
+                "participacao": st.column_config.ProgressColumn("% do mês", format="%.1f%%", min_value=0, max_value=100),
+            }
+        )
+
+def get_df_analista(company_id, ano, mes, df_vendas):
+    """Com vendas por vendedor/canal no mês, o Analista recebe os totais diários por (vendedor,
+    canal) em vez dos totais do dia: ainda agregados no banco, mas permitindo quebrar por vendedor"""
+    detalhe = pd.DataFrame(get_vendas_vendedor_mes(company_id, ano, mes))
+    if detalhe.empty or not ((detalhe['vendedor'] != '') | (detalhe['canal'] != '')).any(): return df_vendas
+    detalhe = detalhe.rename(columns={'total': 'valor_venda'})
+    detalhe['data_venda'] = pd.to_datetime(detalhe['data_venda'])
+    detalhe['valor_venda'] = detalhe['valor_venda'].astype(float)
+    return detalhe[['data_venda', 'vendedor', 'canal', 'valor_venda', 'qtd']]
+
+@st.fragment
+@medir
+def painel_chat(company_id, ano, mes):
+    df_vendas = get_df_vendas_mes(company_id, ano, mes)
+    if df_vendas.empty: return
+    df_vendas = get_df_analista(company_id, ano, mes, df_vendas)
+
+    # Análise concluída: a resposta passa a ser exibida pelo histórico
+    tarefa = st.session_state.tarefa_analise
+    if tarefa is not None and tarefa.concluida:
+        entregar_resposta(tarefa)
+        st.session_state.tarefa_analise = None
+
+    st.markdown("---")
+    st.subheader("🤖 Analista Virtual")
+    st.caption("Converse com seus dados. O chat mantém o histórico.")
+
+    if st.button("🗑️ Limpar Conversa", key="clear_chat"):
+        cancelar_analise()
+        st.session_state.chat_history = []
+        st.rerun(scope="fragment")
+
+    for message in st.session_state.chat_history:
+        with st.chat_message(message["role"]):
+            st.markdown(message["content"])
+
+    if prompt := st.chat_input("Ex: 'Qual foi o melhor dia?'"):
+        st.session_state.chat_history.append({"role": "user", "content": prompt})
+        with st.chat_message("user"): st.markdown(prompt)
+
+        nome_empresa_atual = st.session_state.company['name']
+        kpis = get_kpis_mes(company_id, ano, mes)
+        resposta_ia = resposta_rapida(company_id, df_vendas, prompt, nome_empresa_atual,
+                                      {"meta": kpis['meta'], "dias_uteis": kpis['dias_uteis']})
+        if resposta_ia is not None:
+            cancelar_analise()
+        elif "google" in st.secrets:
+            resposta_ia = responder_pergunta(company_id, df_vendas, prompt, nome_empresa_atual, st.session_state.chat_history)
+        else:
+            with st.chat_message("assistant"): st.error("Configure a chave Google nos Secrets.")
+        if resposta_ia is not None:
+            with st.chat_message("assistant"): st.markdown(resposta_ia)
+            st.session_state.chat_history.append({"role": "assistant", "content": resposta_ia})
+
+    if st.session_state.tarefa_analise is not None:
+        acompanhar_analise()
+
+render_dashboard(st.session_state.company['id'], st.session_state.acesso['role'])
@@ -0,0 +1,36 @@
+"""Diferença entre a tabela de feriados editada na tela de Configurações e a que foi carregada."""
+import pandas as pd
+
+
+def diff_feriados(df_orig, editado):
+    """Compara a tabela editada com a carregada. Retorna (erros, linhas p/ upsert, ids p/ excluir)"""
+    ed = editado.copy()
+    ed['data'] = pd.to_datetime(ed['data'], errors='coerce')
+    ed['descricao'] = ed['descricao'].fillna('').astype(str).str.strip()
+
+    erros = []
+    if ed['data'].isna().any(): erros.append("Há feriados sem data.")
+    if ed['descricao'].eq('').any(): erros.append("Há feriados sem nome.")
+    repetidas = ed.loc[ed['data'].duplicated() & ed['data'].notna(), 'data'].drop_duplicates().sort_values()
+    if not repetidas.empty:
+        erros.append("Datas duplicadas: " + ", ".join(repetidas.dt.strftime('%d/%m/%Y')))
+    if erros: return erros, [], []
+
+    orig = df_orig[['id', 'data', 'descricao']].copy()
+    orig['data'] = pd.to_datetime(orig['data'])
+    orig['descricao'] = orig['descricao'].fillna('').astype(str).str.strip()
+
+    novos = ed[ed['id'].isna()]
+    comum = ed[ed['id'].notna()].merge(orig, on='id', how='inner', suffixes=('', '_orig'))
+    data_mudou = comum['data'] != comum['data_orig']
+    desc_mudou = comum['descricao'] != comum['descricao_orig']
+
+    # Upsert é por (company_id, data): mudar a data de um feriado = excluir o antigo + inserir o novo
+    mantidos = comum.loc[~data_mudou, 'id']
+    ids_del = orig.loc[~orig['id'].isin(mantidos), 'id'].tolist()
+    alterados = pd.concat([novos[['data', 'descricao']], comum.loc[data_mudou | desc_mudou, ['data', 'descricao']]])
+    upserts = [
+        {"data": d, "descricao": desc}
+        for d, desc in zip(alterados['data'].dt.strftime('%Y-%m-%d'), alterados['descricao'])
+    ]
+    return [], upserts, ids_del
@@ -0,0 +1,26 @@
+"""Seleção e criação de empresas."""
+import streamlit as st
+
+from nucleo import create_company, get_contexto_acesso
+
+def render_company_selector(user_id, companies):
+    st.title("🏢 Empresas")
+    if not companies:
+        st.warning("Nenhuma empresa.")
+        with st.form("new_c"):
+            name = st.text_input("Nome da Empresa")
+            if st.form_submit_button("Criar"): create_company(user_id, name)
+    else:
+        opts = {c['name']: c['id'] for c in companies}
+        sel = st.selectbox("Escolha:", list(opts.keys()))
+        if st.button("Acessar Painel"):
+            st.session_state.company = {'id': opts[sel], 'name': sel}
+            get_contexto_acesso(opts[sel], user_id)
+            st.rerun()
+        st.divider()
+        with st.expander("Nova Empresa"):
+            with st.form("add_c"):
+                n = st.text_input("Nome"); 
+                if st.form_submit_button("Criar"): create_company(user_id, n)
+
+render_company_selector(st.session_state.user.id, st.session_state.empresas_usuario)
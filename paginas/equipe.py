@@ -0,0 +1,99 @@
+"""Equipe: convite de membros e edição de funções e acessos."""
+import math
+
+import streamlit as st
+
+from nucleo import (
+    TELAS_APP, aplicar_alteracoes_equipe, avisar, get_membros_pagina, marcar_membros_alterados, medir, repo
+)
+
+EQUIPE_POR_PAGINA = 25
+
+@medir
+def render_team(company_id, user_role):
+    st.title("👥 Gestão de Equipe")
+    
+    if user_role == 'admin':
+        with st.expander("➕ Adicionar Novo Membro", expanded=True):
+            c1, c2 = st.columns([3, 1])
+            with c1:
+                email_invite = st.text_input("E-mail do usuário")
+            with c2:
+                st.write(""); st.write("") 
+                if st.button("Adicionar"):
+                    user_uuid = repo.buscar_usuario_por_email(email_invite)
+                    if user_uuid:
+                        try:
+                            # Cria com permissão padrão (Dashboard)
+                            perm_padrao = ["Dashboard"]
+                            repo.adicionar_membro(company_id, user_uuid, "viewer", perm_padrao)
+                            marcar_membros_alterados(company_id)
+                            avisar(f"Usuário {email_invite} adicionado!")
+                            st.rerun()
+                        except: st.error("Erro: Usuário já existe ou falha no sistema.")
+                    else: st.error("E-mail não encontrado.")
+
+    st.divider()
+    st.subheader("Membros e Permissões")
+
+    c_busca, c_pag = st.columns([3, 1])
+    with c_busca:
+        busca = st.text_input("Buscar por e-mail", key="eq_busca")
+    pagina = st.session_state.get("eq_pagina", 1)
+    membros, total = get_membros_pagina(company_id, pagina, EQUIPE_POR_PAGINA, busca)
+    if not membros and pagina > 1:
+        st.session_state.eq_pagina = 1
+        st.rerun()
+    with c_pag:
+        n_paginas = max(1, math.ceil(total / EQUIPE_POR_PAGINA))
+        st.number_input(f"Página (de {n_paginas})", min_value=1, max_value=n_paginas, key="eq_pagina")
+
+    telas_disponiveis = TELAS_APP
+    roles = ['admin', 'data_entry', 'viewer']
+    pode_editar = user_role == 'admin'
+    meu_id = st.session_state.user.id
+
+    # Edições ficam num form: nada é gravado (nem gera rerun) até o admin aplicar
+    area = st.form("form_equipe") if pode_editar else st.container()
+    with area:
+        alteracoes, remover = [], []
+        for m in membros:
+            uid = m['user_id']
+            with st.container(border=True):
+                c_email, c_role, c_perms, c_action = st.columns([1.5, 1, 2, 0.5])
+                editavel = pode_editar and uid != meu_id
+
+                with c_email:
+                    st.write(f"📧 **{m['email']}**")
+
+                with c_role:
+                    if editavel:
+                        idx = roles.index(m['role']) if m['role'] in roles else roles.index('viewer')
+                        nr = st.selectbox("Função", roles, index=idx, key=f"r_{uid}", label_visibility="collapsed")
+                    else:
+                        st.info(m['role'].upper())
+
+                with c_perms:
+                    # Permissões fora das telas atuais (legadas) não aparecem no seletor, mas são mantidas
+                    atuais = [p for p in m['perms'] if p in telas_disponiveis]
+                    outras = [p for p in m['perms'] if p not in telas_disponiveis]
+                    if editavel:
+                        novas_perms = st.multiselect("Acessos", telas_disponiveis, default=atuais, key=f"p_{uid}", label_visibility="collapsed")
+                    else:
+                        st.caption(", ".join(m['perms']))
+
+                with c_action:
+                    if editavel and st.checkbox("🗑️", key=f"d_{uid}", help="Remover membro"):
+                        remover.append(uid)
+                    elif editavel and (nr != m['role'] or novas_perms != atuais):
+                        alteracoes.append((uid, nr, novas_perms + outras))
+
+        if pode_editar and st.form_submit_button("💾 Aplicar Alterações"):
+            try:
+                aplicar_alteracoes_equipe(company_id, alteracoes, remover)
+                st.toast("Equipe atualizada!")
+                st.rerun()
+            except Exception as e:
+                st.error(f"Erro ao atualizar equipe: {e}")
+
+render_team(st.session_state.company['id'], st.session_state.acesso['role'])
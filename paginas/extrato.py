@@ -0,0 +1,168 @@
+"""Extrato: lançamentos de qualquer período, paginados, com destaque e edição."""
+import calendar
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from formatacao import MESES_PT, format_moeda
+from nucleo import (
+    EXTRATO_POR_PAGINA, aplicar_pendentes, avisar, enviar_venda, fila_escritas, get_anos_disponiveis,
+    get_resumo_periodo, get_venda_dia, get_vendas_pagina, medir
+)
+from tela_exportacao import render_exportacao
+
+TRIMESTRES = {"1º Trimestre": 1, "2º Trimestre": 4, "3º Trimestre": 7, "4º Trimestre": 10}
+ESTILO_MAIOR = 'background-color: #d4edda; color: #155724; font-weight: bold'
+ESTILO_MENOR = 'background-color: #f8d7da; color: #721c24; font-weight: bold'
+
+# --- DIÁLOGOS ---
+@st.dialog("⚠️ Gerenciar Lançamento")
+def gerenciar_venda_dialog(data_venda, valor_total, qtd, avulso, cid):
+    st.markdown("""
+        <div class="warning-box">
+            <b>ATENÇÃO:</b> Você está prestes a alterar ou excluir um registro histórico.<br>
+            Isso afetará os indicadores e gráficos imediatamente.
+        </div>
+    """, unsafe_allow_html=True)
+    
+    st.write(f"**Data do Lançamento:** {pd.to_datetime(data_venda).strftime('%d/%m/%Y')}")
+    individuais = qtd - (avulso is not None)
+    if individuais:
+        # O valor editado aqui é só o avulso; as vendas individuais continuam somando no total
+        st.caption(f"Total do dia: {format_moeda(valor_total)}, dos quais {format_moeda(valor_total - (avulso or 0))} "
+                   f"em {individuais} venda(s) individual(is). O valor abaixo é o lançamento avulso do dia.")
+    
+    # Campo para editar o valor
+    novo_valor = st.number_input("Novo Valor da Venda (R$)", value=float(avulso or 0), step=50.0)
+    
+    col_a, col_b = st.columns(2)
+    
+    with col_a:
+        if st.button("💾 Atualizar Valor", use_container_width=True):
+            if novo_valor > 0:
+                enviar_venda(cid, data_venda, novo_valor)
+                avisar("Atualização enviada!")
+                st.rerun()
+            else:
+                st.warning("O valor deve ser positivo.")
+    
+    with col_b:
+        if st.button("🗑️ Excluir Dia", type="primary", use_container_width=True):
+            enviar_venda(cid, data_venda, None)
+            avisar("Exclusão enviada!")
+            st.rerun()
+
+# --- TELA ---
+def selecionar_periodo_extrato(cid):
+    """Filtros do extrato. Retorna (inicio, fim, rótulo do período)"""
+    hoje = date.today()
+    tipo = st.radio("Período", ["Mês", "Trimestre", "Ano", "Personalizado"], horizontal=True, key="ext_tipo")
+    anos = get_anos_disponiveis(cid)
+    c1, c2, _ = st.columns([1, 1, 2])
+    if tipo == "Personalizado":
+        with c1:
+            intervalo = st.date_input("De / Até", value=(date(hoje.year, hoje.month, 1), hoje), format="DD/MM/YYYY", key="ext_int")
+        inicio, fim = (intervalo[0], intervalo[-1]) if intervalo else (hoje, hoje)
+        return inicio, fim, f"{inicio:%d/%m/%Y} a {fim:%d/%m/%Y}"
+
+    with c1: ano = st.selectbox("Ano", anos, index=anos.index(hoje.year), key="ext_a")
+    if tipo == "Ano":
+        return date(ano, 1, 1), date(ano, 12, 31), str(ano)
+    if tipo == "Trimestre":
+        with c2: tri = st.selectbox("Trimestre", list(TRIMESTRES), index=(hoje.month - 1) // 3, key="ext_t")
+        mes_ini = TRIMESTRES[tri]
+        return date(ano, mes_ini, 1), date(ano, mes_ini + 2, calendar.monthrange(ano, mes_ini + 2)[1]), f"{tri} de {ano}"
+    with c2: 
+        mn = st.selectbox("Mês", list(MESES_PT.values()), index=hoje.month-1, key="ext_m")
+        mes = list(MESES_PT.values()).index(mn)+1
+    return date(ano, mes, 1), date(ano, mes, calendar.monthrange(ano, mes)[1]), f"{mn}/{ano}"
+
+def estilos_extrato(df, maximo, minimo):
+    """Destaque do maior e do menor lançamento do período, calculado para a tabela inteira de uma vez"""
+    valores = df['valor_venda'].to_numpy()
+    por_linha = np.where(valores == maximo, ESTILO_MAIOR, np.where(valores == minimo, ESTILO_MENOR, ''))
+    return pd.DataFrame(np.repeat(por_linha[:, None], df.shape[1], axis=1), index=df.index, columns=df.columns)
+
+@medir
+def render_extrato(cid):
+    st.title("📜 Extrato de Vendas")
+    st.write("Acompanhe o detalhamento diário.")
+
+    inicio, fim, rotulo = selecionar_periodo_extrato(cid)
+    render_exportacao([st.session_state.company], "ext_exp", inicio, fim)
+    resumo = get_resumo_periodo(cid, inicio, fim)
+    
+    if resumo['qtd']:
+        m1, m2, m3, m4 = st.columns(4)
+        m1.metric("Total", format_moeda(resumo['total']))
+        m2.metric("Lançamentos", resumo['qtd'])
+        m3.metric("Maior", format_moeda(resumo['maximo']))
+        m4.metric("Menor", format_moeda(resumo['minimo']))
+
+        # Paginação por chave: guarda a data do último item de cada página já visitada
+        chave = (cid, str(inicio), str(fim))
+        if st.session_state.get('extrato_chave') != chave:
+            st.session_state.extrato_chave = chave
+            st.session_state.extrato_cursores = [None]
+        cursores = st.session_state.extrato_cursores
+
+        linhas = get_vendas_pagina(cid, inicio, fim, cursores[-1])
+        tem_proxima = len(linhas) > EXTRATO_POR_PAGINA
+        linhas = linhas[:EXTRATO_POR_PAGINA]
+        # Edições/exclusões ainda na fila já aparecem nas linhas da página; dias novos, só depois de gravados
+        dias_pagina = {str(l['data_venda'])[:10] for l in linhas}
+        pendentes = {e.dados['data_venda']: e.dados['valor_venda'] for e in fila_escritas.em_aberto((cid, "venda"))
+                     if e.dados['data_venda'] in dias_pagina}
+        if pendentes: linhas = aplicar_pendentes(linhas, pendentes)[::-1]  # Página vai do mais recente
+        if not linhas:
+            st.info("Nenhum lançamento nesta página.")
+            return
+        df = pd.DataFrame(linhas)
+        df['data_venda'] = pd.to_datetime(df['data_venda']).dt.date
+
+        st.markdown("### 🗓️ Lançamentos")
+        colunas = ['data_venda', 'valor_venda'] + (['qtd'] if 'qtd' in df and (df['qtd'] > 1).any() else [])
+        st.dataframe(
+            df[colunas].style
+                .apply(estilos_extrato, axis=None, maximo=resumo['maximo'], minimo=resumo['minimo'])
+                .format({"valor_venda": "R$ {:.2f}", "data_venda": "{:%d/%m/%Y}"}),
+            use_container_width=True,
+            hide_index=True,
+            height=400,
+            column_config={"qtd": "Vendas no dia"}
+        )
+
+        pagina = len(cursores)
+        primeiro = (pagina - 1) * EXTRATO_POR_PAGINA + 1
+        c_ant, c_info, c_prox = st.columns([1, 2, 1])
+        with c_ant:
+            if pagina > 1 and st.button("◀ Mais recentes", key="ext_ant"):
+                cursores.pop()
+                st.rerun()
+        with c_info:
+            st.caption(f"Página {pagina} · dias {primeiro}–{primeiro + len(df) - 1} de {resumo['dias']}")
+        with c_prox:
+            if tem_proxima and st.button("Mais antigos ▶", key="ext_prox"):
+                cursores.append(str(df['data_venda'].iloc[-1]))
+                st.rerun()
+
+        st.divider()
+        st.subheader("🛠️ Gerenciar Lançamentos")
+        st.caption("Informe a data do lançamento para Editar ou Excluir.")
+        
+        data_sel = st.date_input("Data do lançamento:", value=df['data_venda'].iloc[0], min_value=inicio, max_value=fim,
+                                 format="DD/MM/YYYY", key="ext_data_sel")
+        venda = get_venda_dia(cid, data_sel)
+        if venda is None:
+            st.info(f"Nenhum lançamento em {data_sel:%d/%m/%Y}.")
+        else:
+            st.write(f"Lançamento de {data_sel:%d/%m/%Y}: **{format_moeda(venda['valor_venda'])}**")
+            if st.button("✏️ Editar / Excluir Selecionado"):
+                gerenciar_venda_dialog(venda['data_venda'], venda['valor_venda'], venda['qtd'], venda['avulso'], cid)
+
+    else:
+        st.info(f"Sem lançamentos em {rotulo}.")
+
+render_extrato(st.session_state.company['id'])
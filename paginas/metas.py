@@ -0,0 +1,34 @@
+"""Metas: cadastro da meta mensal (somente administradores)."""
+import pandas as pd
+import streamlit as st
+
+from formatacao import MESES_PT
+from nucleo import cache_leituras, get_metas, medir, repo
+
+@medir
+def render_metas(company_id, user_role):
+    if user_role not in ['admin']:
+        st.warning("Você não tem permissão (Administrador).")
+        return
+
+    st.title("🎯 Definir Metas")
+    metas_data = get_metas(company_id)
+
+    c1, c2 = st.columns([1, 2])
+    with c1:
+        with st.form("form_meta"):
+            ano = st.number_input("Ano", 2024, 2030, 2025)
+            mes_nome = st.selectbox("Mês", list(MESES_PT.values()))
+            mes = list(MESES_PT.values()).index(mes_nome) + 1
+            valor = st.number_input("Meta (R$)", min_value=0.0)
+            if st.form_submit_button("Salvar"):
+                repo.salvar_meta(company_id, ano, mes, valor)
+                cache_leituras.invalidar(company_id, "metas", {"ano": ano, "mes": mes})
+                st.rerun()
+    with c2:
+        if metas_data:
+            df = pd.DataFrame(metas_data)
+            df['mes_nome'] = df['mes'].map(MESES_PT)
+            st.dataframe(df[['ano', 'mes_nome', 'meta_mensal']].style.format({"meta_mensal": "R$ {:,.2f}"}), use_container_width=True, hide_index=True)
+
+render_metas(st.session_state.company['id'], st.session_state.acesso['role'])
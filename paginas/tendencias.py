@@ -0,0 +1,51 @@
+"""Tendências: comparativo mês a mês entre anos."""
+import plotly.express as px
+import streamlit as st
+
+from formatacao import MESES_PT
+from nucleo import get_anos_disponiveis, get_serie_mensal, medir
+
+@medir
+def render_tendencias(company_id):
+    st.title("📈 Tendências")
+    st.write("Compare os meses entre anos: realizado, meta, atingimento e média por dia útil.")
+
+    anos = get_anos_disponiveis(company_id)
+    c1, c2 = st.columns([2, 2])
+    with c1:
+        anos_sel = st.multiselect("Anos", anos, default=anos[-3:], key="tend_anos")
+    with c2:
+        indicador = st.radio("Indicador", ["Realizado", "Meta", "% Atingimento", "Média por Dia Útil"], horizontal=True, key="tend_ind")
+    if not anos_sel:
+        st.info("Selecione ao menos um ano.")
+        return
+
+    df = get_serie_mensal(company_id, anos_sel)
+    df = df[df['ano'].isin(anos_sel)]
+    coluna = {"Realizado": "realizado", "Meta": "meta", "% Atingimento": "atingimento", "Média por Dia Útil": "media_dia_util"}[indicador]
+
+    fig = px.line(
+        df, x='mes_nome', y=coluna, color=df['ano'].astype(str), markers=True,
+        category_orders={'mes_nome': list(MESES_PT.values())},
+        labels={'mes_nome': '', coluna: indicador, 'color': 'Ano'}
+    )
+    if coluna == 'atingimento':
+        fig.add_hline(y=100, line_dash="dash", line_color="red")
+    fig.update_layout(height=380, margin=dict(l=20, r=20, t=30, b=20), hovermode="x unified", separators=".,", legend_title_text="Ano")
+    st.plotly_chart(fig, use_container_width=True)
+
+    st.markdown("### 📅 Mês a Mês")
+    tabela = df.pivot(index='mes', columns='ano', values=coluna)
+    tabela.index = tabela.index.map(MESES_PT)
+    formato = "{:.1f}%" if coluna == 'atingimento' else "R$ {:,.2f}"
+    if coluna == 'realizado' and len(anos_sel) > 1:
+        # Variação ano contra ano entre os dois últimos anos selecionados
+        a0, a1 = sorted(anos_sel)[-2:]
+        tabela[f"Var. {a1}/{a0}"] = (tabela[a1] / tabela[a0].where(tabela[a0] > 0) - 1) * 100
+    tabela.columns = tabela.columns.map(str)
+    st.dataframe(
+        tabela.style.format({c: ("{:+.1f}%" if c.startswith("Var.") else formato) for c in tabela.columns}, na_rep="-"),
+        use_container_width=True
+    )
+
+render_tendencias(st.session_state.company['id'])
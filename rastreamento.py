@@ -0,0 +1,257 @@
+"""Rastreamento leve do caminho quente: spans por rerun e por chamada ao backend.
+
+Cada rerun (ou fragmento, ou análise em segundo plano) abre um span raiz por thread; os spans
+internos (render_*, consultas, gráficos, Gemini) e as chamadas ao backend entram nele com
+duração, nível e atributos (tabela, filtro, linhas). Ao fechar a raiz, o rerun vai para uma
+linha JSON num arquivo rotativo e as durações alimentam amostras limitadas por (página,
+empresa), de onde saem p50/p95/p99 para o painel e para o texto no formato do Prometheus.
+
+Desligado, `span`/`rerun` devolvem um contexto nulo compartilhado e `registrar` retorna na
+primeira linha: o custo é uma checagem de atributo por chamada.
+"""
+import json
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from logging.handlers import RotatingFileHandler
+
+AMOSTRAS_MAX = 1000
+SPANS_POR_RERUN_MAX = 500
+ARQUIVO_MAX_MB = 10
+ARQUIVO_BACKUPS = 5
+PERCENTIS = (50, 95, 99)
+FORA_DE_RERUN = "(segundo plano)"
+
+
+class _ContextoNulo:
+    def __enter__(self): return None
+    def __exit__(self, *exc): return False
+
+_NULO = _ContextoNulo()
+
+
+class _Span:
+    def __init__(self, rastreador, nome, pagina, tenant, atributos):
+        self.rastreador = rastreador
+        self.nome = nome
+        self.pagina = pagina
+        self.tenant = tenant
+        self.atributos = atributos
+
+    def __enter__(self):
+        self.rastreador._abrir(self)
+        return self
+
+    def __exit__(self, tipo, erro, tb):
+        if tipo is not None: self.atributos.setdefault("erro", tipo.__name__)
+        self.rastreador._fechar(self)
+        return False
+
+
+class Rastreador:
+    def __init__(self, ativo=False, arquivo=None, max_mb=ARQUIVO_MAX_MB, backups=ARQUIVO_BACKUPS,
+                 amostras=AMOSTRAS_MAX):
+        self.ativo = ativo
+        self.amostras = amostras
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._reruns = defaultdict(lambda: deque(maxlen=self.amostras))   # (pagina, tenant) -> [(ms, chamadas)]
+        self._spans = defaultdict(lambda: deque(maxlen=self.amostras))    # (pagina, tenant, nome) -> [ms]
+        self._totais = defaultdict(lambda: [0, 0.0])                      # (pagina, tenant, nome) -> [qtd, soma_s]
+        self._log = None
+        if arquivo:
+            self._log = logging.getLogger(f"rastreamento.{id(self)}")
+            self._log.propagate = False
+            self._log.setLevel(logging.INFO)
+            saida = RotatingFileHandler(arquivo, maxBytes=int(max_mb * 1024 * 1024), backupCount=backups, encoding="utf-8")
+            saida.setFormatter(logging.Formatter("%(message)s"))
+            self._log.addHandler(saida)
+
+    # --- COLETA ---
+    def rerun(self, pagina=None, tenant=None):
+        """Span raiz de um rerun completo do script"""
+        if not self.ativo: return _NULO
+        return _Span(self, "rerun", pagina, tenant, {})
+
+    def span(self, nome, pagina=None, tenant=None, **atributos):
+        """Span interno; fora de um rerun (fragmento, thread de fundo) vira a própria raiz"""
+        if not self.ativo: return _NULO
+        return _Span(self, nome, pagina, tenant, atributos)
+
+    def definir(self, pagina=None, tenant=None):
+        """Completa a raiz aberta quando a página só é conhecida no meio do rerun"""
+        if not self.ativo: return
+        pilha = getattr(self._local, "pilha", None)
+        if not pilha: return
+        raiz = pilha[0]
+        if pagina is not None: raiz.pagina = pagina
+        if tenant is not None: raiz.tenant = tenant
+
+    def anotar(self, **atributos):
+        """Acrescenta atributos ao span mais interno aberto nesta thread"""
+        if not self.ativo: return
+        pilha = getattr(self._local, "pilha", None)
+        if pilha: pilha[-1].atributos.update(atributos)
+
+    def registrar(self, nome, duracao, backend=False, **atributos):
+        """Span já medido por fora (ex.: observador do repositório). Só os de `backend` contam
+        como chamadas ao backend do rerun"""
+        if not self.ativo: return
+        pilha = getattr(self._local, "pilha", None)
+        fim = time.perf_counter()
+        if pilha:
+            raiz = pilha[0]
+            if backend: raiz.chamadas += 1
+            self._anexar(raiz, nome, fim - duracao, duracao, len(pilha), atributos)
+        else:
+            self._consolidar(FORA_DE_RERUN, atributos.get("tenant"), nome, duracao, int(backend), [])
+
+    def _abrir(self, span):
+        pilha = getattr(self._local, "pilha", None)
+        if pilha is None: pilha = self._local.pilha = []
+        if not pilha:
+            span.registros = []
+            span.chamadas = 0
+        pilha.append(span)
+        span.inicio = time.perf_counter()
+
+    def _fechar(self, span):
+        duracao = time.perf_counter() - span.inicio
+        pilha = self._local.pilha
+        pilha.pop()
+        if pilha:
+            self._anexar(pilha[0], span.nome, span.inicio, duracao, len(pilha), span.atributos)
+            return
+        pagina = span.pagina or (span.nome if span.nome != "rerun" else "(sem página)")
+        self._consolidar(pagina, span.tenant, span.nome, duracao, span.chamadas, span.registros, span.atributos)
+
+    def _anexar(self, raiz, nome, inicio, duracao, nivel, atributos):
+        if len(raiz.registros) >= SPANS_POR_RERUN_MAX: return
+        raiz.registros.append({"nome": nome, "inicio_ms": round((inicio - raiz.inicio) * 1000, 2),
+                               "ms": round(duracao * 1000, 2), "nivel": nivel, **atributos})
+
+    def _consolidar(self, pagina, tenant, nome, duracao, chamadas, registros, atributos=None):
+        tenant = str(tenant) if tenant is not None else ""
+        with self._lock:
+            if nome == "rerun":
+                self._reruns[(pagina, tenant)].append((duracao * 1000, chamadas))
+            for chave, ms in [((pagina, tenant, nome), duracao * 1000)] + [
+                ((pagina, tenant, r["nome"]), r["ms"]) for r in registros
+            ]:
+                self._spans[chave].append(ms)
+                total = self._totais[chave]
+                total[0] += 1
+                total[1] += ms / 1000
+        if self._log:
+            self._log.info(json.dumps({
+                "ts": round(time.time(), 3), "pagina": pagina, "tenant": tenant, "raiz": nome,
+                "ms": round(duracao * 1000, 2), "chamadas_backend": chamadas, **(atributos or {}),
+                "spans": registros,
+            }, ensure_ascii=False, default=str))
+
+    # --- CONSULTA ---
+    def resumo_reruns(self, tenant=None):
+        """p50/p95/p99 do rerun e chamadas ao backend por (página, empresa)"""
+        with self._lock:
+            itens = [(c, list(v)) for c, v in self._reruns.items() if tenant is None or c[1] == str(tenant)]
+        linhas = []
+        for (pagina, ten), amostras in sorted(itens):
+            chamadas = [a[1] for a in amostras]
+            p = _percentis([a[0] for a in amostras])
+            linhas.append({"pagina": pagina, "tenant": ten, "reruns": len(amostras),
+                           "p50_ms": round(p[0], 1), "p95_ms": round(p[1], 1), "p99_ms": round(p[2], 1),
+                           "chamadas_media": round(sum(chamadas) / len(chamadas), 1), "chamadas_max": max(chamadas)})
+        return linhas
+
+    def resumo_spans(self, tenant=None, pagina=None):
+        """p50/p95/p99 de cada span por (página, empresa), do mais caro (p95) para o mais barato"""
+        with self._lock:
+            itens = [(c, list(v)) for c, v in self._spans.items()
+                     if (tenant is None or c[1] == str(tenant)) and (pagina is None or c[0] == pagina)]
+        linhas = []
+        for (pag, ten, nome), ms in itens:
+            p = _percentis(ms)
+            linhas.append({"pagina": pag, "tenant": ten, "span": nome, "amostras": len(ms),
+                           "p50_ms": round(p[0], 1), "p95_ms": round(p[1], 1), "p99_ms": round(p[2], 1)})
+        return sorted(linhas, key=lambda l: -l["p95_ms"])
+
+    def limpar(self):
+        with self._lock:
+            self._reruns.clear()
+            self._spans.clear()
+            self._totais.clear()
+
+    def texto_prometheus(self):
+        """Métricas no formato de exposição de texto do Prometheus (summary por span)"""
+        with self._lock:
+            itens = [(c, list(v), tuple(self._totais[c])) for c, v in self._spans.items()]
+        linhas = [
+            "# HELP metas_span_segundos Duração dos spans por página e empresa",
+            "# TYPE metas_span_segundos summary",
+        ]
+        for (pagina, tenant, nome), ms, (qtd, soma) in sorted(itens, key=lambda i: i[0]):
+            rotulos = f'pagina="{_escapar(pagina)}",tenant="{_escapar(tenant)}",span="{_escapar(nome)}"'
+            for q, valor in zip(PERCENTIS, _percentis(ms)):
+                linhas.append(f'metas_span_segundos{{{rotulos},quantile="{q / 100}"}} {valor / 1000:.6f}')
+            linhas.append(f"metas_span_segundos_sum{{{rotulos}}} {soma:.6f}")
+            linhas.append(f"metas_span_segundos_count{{{rotulos}}} {qtd}")
+        return "\n".join(linhas) + "\n"
+
+
+def _percentis(valores):
+    # numpy só quando alguém consulta o resumo: a coleta roda em toda tela, inclusive no login
+    import numpy as np
+    return np.percentile(np.asarray(valores, dtype=float), PERCENTIS)
+
+
+def _escapar(valor):
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def iniciar_servidor_prometheus(rastreador, porta, endereco="127.0.0.1"):
+    """Serve GET /metrics numa thread daemon (o Streamlit não expõe rotas próprias). Sem
+    autenticação e com ids de empresa nos rótulos: por padrão só escuta localmente"""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Metricas(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            corpo = rastreador.texto_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(corpo)))
+            self.end_headers()
+            self.wfile.write(corpo)
+
+        def log_message(self, *args): pass
+
+    servidor = ThreadingHTTPServer((endereco, int(porta)), Metricas)
+    threading.Thread(target=servidor.serve_forever, name="rastreamento-prometheus", daemon=True).start()
+    return servidor
+
+
+# Métodos cujos argumentos não identificam a empresa ou carregam credenciais: não vão para o log
+METODOS_SEM_ARGUMENTOS = {"entrar", "cadastrar", "sair", "buscar_usuario_por_email", "listar_empresas_usuario",
+                          "criar_empresa"}
+
+
+def _descrever(valor):
+    if isinstance(valor, (list, tuple, set, dict)): return f"<{len(valor)} itens>"
+    return str(valor)
+
+
+def observador_repositorio(rastreador):
+    """Observador para repositorio.OBSERVADORES: um span por chamada ao backend"""
+    def observar(metodo, args, duracao, resultado, erro):
+        if not rastreador.ativo: return
+        atributos = {"metodo": metodo}
+        if args and metodo not in METODOS_SEM_ARGUMENTOS:
+            if not isinstance(args[0], (list, tuple, set)): atributos["tenant"] = args[0]
+            atributos["filtro"] = ", ".join(_descrever(a) for a in args)[:200]
+        if isinstance(resultado, (list, tuple)): atributos["linhas"] = len(resultado)
+        if erro is not None: atributos["erro"] = type(erro).__name__
+        rastreador.registrar(f"backend.{metodo}", duracao, backend=True, **atributos)
+    return observar
@@ -0,0 +1,1000 @@
+"""Camada de acesso a dados do app de metas.
+
+Todas as telas falam com o banco através de um `Repositorio`. Existem dois backends
+com a mesma interface:
+
+- RepositorioSupabase: produção (PostgREST + Auth do Supabase)
+- RepositorioSQLite: banco embarcado, para rodar o app offline, reproduzir tenants
+  de produção localmente e medir custo de consultas sem um projeto Supabase
+
+Leituras retornam listas de dicts no mesmo formato do `.data` do supabase-py.
+"""
+import hashlib
+import json
+import logging
+import secrets
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from types import SimpleNamespace
+
+
+class Repositorio:
+    """Interface comum aos backends"""
+
+    # --- AUTH ---
+    def entrar(self, email, senha):
+        """Autentica e retorna o usuário (objeto com .id e .email)"""
+        raise NotImplementedError
+
+    def cadastrar(self, email, senha):
+        raise NotImplementedError
+
+    def sair(self):
+        raise NotImplementedError
+
+    # Usados pelo PoolSessoes (fora do proxy observado): backends sem sessão por usuário não fazem nada
+    def _expira_em(self):
+        """Epoch em que o token da sessão autenticada expira (None: sem sessão)"""
+        return None
+
+    def _renovar_sessao(self):
+        pass
+
+    def _encerrar(self):
+        pass
+
+    # --- EMPRESAS E MEMBROS ---
+    def listar_empresas_usuario(self, user_id):
+        """[{"id", "name", "role", "permissions"}] das empresas em que o usuário é membro"""
+        raise NotImplementedError
+
+    def criar_empresa(self, nome):
+        """Cria a empresa e retorna o id"""
+        raise NotImplementedError
+
+    def renomear_empresa(self, company_id, nome):
+        raise NotImplementedError
+
+    def get_membro(self, company_id, user_id):
+        """{"role", "permissions"} do usuário na empresa, ou None"""
+        raise NotImplementedError
+
+    def adicionar_membro(self, company_id, user_id, role, permissions):
+        raise NotImplementedError
+
+    def listar_membros(self, company_id, limite, offset, busca=None):
+        """Página de membros: [{"user_id", "email", "role", "permissions", "total"}]"""
+        raise NotImplementedError
+
+    def atualizar_membros(self, company_id, membros):
+        """Atualiza role/permissions de [{"user_id", "role", "permissions"}] que já são membros
+        (quem foi removido nesse meio tempo continua fora)"""
+        raise NotImplementedError
+
+    def remover_membros(self, company_id, user_ids):
+        raise NotImplementedError
+
+    def buscar_usuario_por_email(self, email):
+        """user_id do e-mail, ou None"""
+        raise NotImplementedError
+
+    # --- CONFIGURAÇÃO E FERIADOS ---
+    def get_config_dias(self, company_id):
+        """dias_trabalho gravado (JSON), ou None se a empresa não configurou"""
+        raise NotImplementedError
+
+    def salvar_config_dias(self, company_id, dias):
+        raise NotImplementedError
+
+    def listar_feriados(self, company_id):
+        raise NotImplementedError
+
+    def salvar_feriados(self, company_id, linhas):
+        """Upsert em lote de [{"data", "descricao"}] em (company_id, data)"""
+        raise NotImplementedError
+
+    def excluir_feriados(self, company_id, ids):
+        raise NotImplementedError
+
+    # --- METAS ---
+    def get_meta(self, company_id, ano, mes):
+        raise NotImplementedError
+
+    def listar_metas(self, company_id):
+        raise NotImplementedError
+
+    def salvar_meta(self, company_id, ano, mes, valor):
+        raise NotImplementedError
+
+    def listar_metas_empresas(self, company_ids, ano, mes):
+        """[{"company_id", "meta_mensal"}] do mês para várias empresas numa única consulta"""
+        raise NotImplementedError
+
+    # --- VENDAS ---
+    # As vendas são transações (tabela `vendas`, com vendedor e canal opcionais); vendas_diarias
+    # e vendas_diarias_vendedor são os totais por dia mantidos por trigger a partir delas. O
+    # "lançamento avulso" é a transação sem vendedor/canal que guarda o valor único do dia.
+    def listar_vendas(self, company_id, inicio=None, fim=None):
+        """Totais diários entre as datas (inclusive, 'YYYY-MM-DD'), em ordem de data"""
+        raise NotImplementedError
+
+    def listar_vendas_pagina(self, company_id, inicio, fim, limite, antes_de=None):
+        """Até `limite` totais diários do período em ordem decrescente de data, só os anteriores a
+        `antes_de` (paginação por chave: passe a data do último item da página anterior)"""
+        raise NotImplementedError
+
+    def resumo_vendas(self, company_id, inicio, fim):
+        """{"total", "qtd", "dias", "minimo", "maximo"} dos totais diários do período, agregados no banco.
+        `qtd` é o número de vendas e `dias` o de linhas (dias com venda), que é o que o Extrato pagina"""
+        raise NotImplementedError
+
+    def buscar_venda(self, company_id, data_venda):
+        """Total do dia ({"id", "data_venda", "valor_venda", "qtd", "avulso"}), ou None.
+        `avulso` é o valor do lançamento avulso do dia (None se não houver)"""
+        raise NotImplementedError
+
+    def salvar_venda(self, company_id, data_venda, valor):
+        """Upsert do lançamento avulso do dia"""
+        raise NotImplementedError
+
+    def salvar_vendas_lote(self, company_id, linhas):
+        """Upsert em lote de lançamentos avulsos [{"data_venda", "valor_venda"}]"""
+        raise NotImplementedError
+
+    def registrar_vendas(self, company_id, linhas):
+        """Insere transações [{"data_venda", "valor_venda", "vendedor", "canal", "chave_importacao"}]
+        (vendedor/canal/chave opcionais). Linhas com uma chave_importacao já gravada na empresa são
+        ignoradas (reimportação do mesmo arquivo). Retorna quantas foram inseridas"""
+        raise NotImplementedError
+
+    def excluir_vendas_dia(self, company_id, data_venda):
+        """Exclui todas as transações do dia (inclusive o lançamento avulso)"""
+        raise NotImplementedError
+
+    def listar_transacoes(self, company_id, inicio=None, fim=None):
+        """Transações [{"id", "data_venda", "valor_venda", "vendedor", "canal", "dia_avulso", "chave_importacao"}]
+        em ordem de data"""
+        raise NotImplementedError
+
+    def listar_vendas_vendedor(self, company_id, inicio, fim):
+        """Totais diários por vendedor e canal [{"data_venda", "vendedor", "canal", "total", "qtd"}]
+        (vendedor/canal '' quando não informados), em ordem de data"""
+        raise NotImplementedError
+
+    def resumo_vendedores(self, company_id, inicio, fim):
+        """[{"vendedor", "canal", "total", "qtd"}] do período, do maior para o menor total"""
+        raise NotImplementedError
+
+    # --- ROLLUPS (D = dia, M = mês, A = ano; periodo = primeiro dia) ---
+    def listar_rollups(self, company_id, nivel, inicio, fim):
+        """[{"periodo", "total", "qtd", "minimo", "maximo"}] com periodo entre as datas, em ordem"""
+        raise NotImplementedError
+
+    def listar_rollups_empresas(self, company_ids, nivel, inicio, fim):
+        """Como listar_rollups, para várias empresas numa única consulta (linhas com "company_id")"""
+        raise NotImplementedError
+
+    def reconstruir_rollups(self, company_id=None):
+        """Recalcula todos os rollups a partir de vendas_diarias (backfill)"""
+        raise NotImplementedError
+
+
+# --- BACKEND SUPABASE ---
+class RepositorioSupabase(Repositorio):
+    LIMITE_PAGINA = 1000  # max-rows padrão do PostgREST
+
+    def __init__(self, client):
+        self.client = client
+
+    def _paginar(self, montar_consulta):
+        linhas, inicio = [], 0
+        while True:
+            lote = montar_consulta().range(inicio, inicio + self.LIMITE_PAGINA - 1).execute().data or []
+            linhas.extend(lote)
+            if len(lote) < self.LIMITE_PAGINA: return linhas
+            inicio += self.LIMITE_PAGINA
+
+    def entrar(self, email, senha):
+        return self.client.auth.sign_in_with_password({"email": email, "password": senha}).user
+
+    def cadastrar(self, email, senha):
+        return self.client.auth.sign_up({"email": email, "password": senha}).user
+
+    def sair(self):
+        self.client.auth.sign_out()
+
+    def _expira_em(self):
+        sessao = self.client.auth.get_session()
+        return sessao.expires_at if sessao else None
+
+    def _renovar_sessao(self):
+        self.client.auth.refresh_session()
+
+    def _encerrar(self):
+        # Sair do pool não é logout: sign_out (escopo global) revogaria os tokens das outras abas e
+        # aparelhos do usuário. Só fecha as conexões keep-alive do PostgREST (se alguma consulta já rodou)
+        postgrest = getattr(self.client, "_postgrest", None)
+        sessao_http = getattr(postgrest, "session", None)
+        if sessao_http is not None: sessao_http.close()
+
+    def listar_empresas_usuario(self, user_id):
+        resp = self.client.table("company_users").select("company_id, role, permissions, companies(name)").eq("user_id", user_id).execute()
+        return [
+            {"id": item['company_id'], "name": item['companies']['name'], "role": item['role'], "permissions": item['permissions']}
+            for item in resp.data or []
+        ]
+
+    def criar_empresa(self, nome):
+        return self.client.table("companies").insert({"name": nome}).execute().data[0]['id']
+
+    def renomear_empresa(self, company_id, nome):
+        self.client.table("companies").update({"name": nome}).eq("id", company_id).execute()
+
+    def get_membro(self, company_id, user_id):
+        resp = self.client.table("company_users").select("role, permissions").eq("company_id", company_id).eq("user_id", user_id).limit(1).execute()
+        return resp.data[0] if resp.data else None
+
+    def adicionar_membro(self, company_id, user_id, role, permissions):
+        self.client.table("company_users").insert({
+            "company_id": company_id,
+            "user_id": user_id,
+            "role": role,
+            "permissions": json.dumps(permissions)
+        }).execute()
+
+    def listar_membros(self, company_id, limite, offset, busca=None):
+        return self.client.rpc("get_team_members_page", {
+            "cid": company_id, "lim": limite, "offs": offset, "busca": busca or None
+        }).execute().data or []
+
+    def atualizar_membros(self, company_id, membros):
+        if not membros: return
+        # Um RPC para o lote inteiro: uma ida ao banco e, se falhar, ninguém fica alterado pela metade
+        self.client.rpc("atualizar_membros_empresa", {"cid": company_id, "membros": [
+            {"user_id": m['user_id'], "role": m['role'], "permissions": json.dumps(m['permissions'])} for m in membros
+        ]}).execute()
+
+    def remover_membros(self, company_id, user_ids):
+        if not user_ids: return
+        self.client.table("company_users").delete().eq("company_id", company_id).in_("user_id", list(user_ids)).execute()
+
+    def buscar_usuario_por_email(self, email):
+        resp = self.client.rpc("get_user_id_by_email", {"user_email": email}).execute()
+        return resp.data[0] if resp.data and resp.data[0] else None
+
+    def get_config_dias(self, company_id):
+        resp = self.client.table("config_dias_uteis").select("dias_trabalho").eq("company_id", company_id).execute()
+        return resp.data[0]['dias_trabalho'] if resp.data else None
+
+    def salvar_config_dias(self, company_id, dias):
+        payload = {"company_id": company_id, "dias_trabalho": json.dumps(dias)}
+        self.client.table("config_dias_uteis").upsert(payload, on_conflict="company_id").execute()
+
+    def listar_feriados(self, company_id):
+        return self.client.table("feriados").select("*").eq("company_id", company_id).order("data").execute().data
+
+    def salvar_feriados(self, company_id, linhas):
+        if not linhas: return
+        payload = [{"company_id": company_id, **linha} for linha in linhas]
+        self.client.table("feriados").upsert(payload, on_conflict="company_id, data").execute()
+
+    def excluir_feriados(self, company_id, ids):
+        if not ids: return
+        self.client.table("feriados").delete().eq("company_id", company_id).in_("id", list(ids)).execute()
+
+    def get_meta(self, company_id, ano, mes):
+        resp = self.client.table("metas").select("*").eq("company_id", company_id).eq("ano", ano).eq("mes", mes).execute()
+        return resp.data[0] if resp.data else None
+
+    def listar_metas(self, company_id):
+        return self.client.table("metas").select("*").eq("company_id", company_id).order("ano").order("mes").execute().data
+
+    def salvar_meta(self, company_id, ano, mes, valor):
+        self.client.table("metas").upsert({"company_id": company_id, "ano": ano, "mes": mes, "meta_mensal": valor}, on_conflict="company_id, ano, mes").execute()
+
+    def listar_metas_empresas(self, company_ids, ano, mes):
+        if not company_ids: return []
+        return self._paginar(lambda: self.client.table("metas").select("company_id, meta_mensal")
+                             .in_("company_id", list(company_ids)).eq("ano", ano).eq("mes", mes).order("company_id"))
+
+    def listar_vendas(self, company_id, inicio=None, fim=None):
+        def consulta():
+            q = self.client.table("vendas_diarias").select("*").eq("company_id", company_id)
+            if inicio: q = q.gte("data_venda", inicio)
+            if fim: q = q.lte("data_venda", fim)
+            return q.order("data_venda")
+        return self._paginar(consulta)
+
+    def listar_vendas_pagina(self, company_id, inicio, fim, limite, antes_de=None):
+        q = (self.client.table("vendas_diarias").select("id, data_venda, valor_venda, qtd").eq("company_id", company_id)
+             .gte("data_venda", str(inicio)).lte("data_venda", str(fim)))
+        if antes_de: q = q.lt("data_venda", str(antes_de))
+        return q.order("data_venda", desc=True).limit(limite).execute().data or []
+
+    def resumo_vendas(self, company_id, inicio, fim):
+        resp = self.client.rpc("resumo_vendas_periodo", {"cid": company_id, "inicio": str(inicio), "fim": str(fim)}).execute()
+        return resp.data[0] if resp.data else {"total": 0, "qtd": 0, "dias": 0, "minimo": None, "maximo": None}
+
+    def buscar_venda(self, company_id, data_venda):
+        resp = (self.client.table("vendas_diarias").select("id, data_venda, valor_venda, qtd")
+                .eq("company_id", company_id).eq("data_venda", str(data_venda)).limit(1).execute())
+        if not resp.data: return None
+        avulso = (self.client.table("vendas").select("valor_venda")
+                  .eq("company_id", company_id).eq("dia_avulso", str(data_venda)).limit(1).execute())
+        return {**resp.data[0], "avulso": avulso.data[0]['valor_venda'] if avulso.data else None}
+
+    def salvar_venda(self, company_id, data_venda, valor):
+        payload = {"company_id": company_id, "data_venda": str(data_venda), "valor_venda": valor, "dia_avulso": str(data_venda)}
+        self.client.table("vendas").upsert(payload, on_conflict="company_id, dia_avulso").execute()
+
+    def salvar_vendas_lote(self, company_id, linhas):
+        for i in range(0, len(linhas), self.LIMITE_PAGINA):
+            payload = [{"company_id": company_id, "data_venda": str(l['data_venda']), "valor_venda": l['valor_venda'],
+                        "dia_avulso": str(l['data_venda'])} for l in linhas[i:i + self.LIMITE_PAGINA]]
+            self.client.table("vendas").upsert(payload, on_conflict="company_id, dia_avulso").execute()
+
+    def registrar_vendas(self, company_id, linhas):
+        # Um insert por lote: o trigger soma cada dia do lote uma única vez nos agregados. Chaves de
+        # importação repetidas ficam de fora (on conflict do nothing) e não voltam na resposta
+        inseridas = 0
+        for i in range(0, len(linhas), self.LIMITE_PAGINA):
+            payload = [{"company_id": company_id, "data_venda": str(l['data_venda']), "valor_venda": l['valor_venda'],
+                        "vendedor": l.get('vendedor'), "canal": l.get('canal'), "chave_importacao": l.get('chave_importacao')}
+                       for l in linhas[i:i + self.LIMITE_PAGINA]]
+            resp = (self.client.table("vendas")
+                    .upsert(payload, on_conflict="company_id, chave_importacao", ignore_duplicates=True).execute())
+            inseridas += len(resp.data or [])
+        return inseridas
+
+    def excluir_vendas_dia(self, company_id, data_venda):
+        self.client.table("vendas").delete().eq("company_id", company_id).eq("data_venda", str(data_venda)).execute()
+
+    def listar_transacoes(self, company_id, inicio=None, fim=None):
+        def consulta():
+            q = (self.client.table("vendas").select("id, data_venda, valor_venda, vendedor, canal, dia_avulso, chave_importacao")
+                 .eq("company_id", company_id))
+            if inicio: q = q.gte("data_venda", str(inicio))
+            if fim: q = q.lte("data_venda", str(fim))
+            return q.order("data_venda").order("id")
+        return self._paginar(consulta)
+
+    def listar_vendas_vendedor(self, company_id, inicio, fim):
+        return self._paginar(lambda: self.client.table("vendas_diarias_vendedor").select("data_venda, vendedor, canal, total, qtd")
+                             .eq("company_id", company_id).gte("data_venda", str(inicio)).lte("data_venda", str(fim))
+                             .order("data_venda").order("vendedor").order("canal"))
+
+    def resumo_vendedores(self, company_id, inicio, fim):
+        return self.client.rpc("vendas_por_vendedor", {"cid": company_id, "inicio": str(inicio), "fim": str(fim)}).execute().data or []
+
+    def listar_rollups(self, company_id, nivel, inicio, fim):
+        return self._paginar(lambda: self.client.table("vendas_rollup").select("periodo, total, qtd, minimo, maximo")
+                             .eq("company_id", company_id).eq("nivel", nivel)
+                             .gte("periodo", str(inicio)).lte("periodo", str(fim)).order("periodo"))
+
+    def listar_rollups_empresas(self, company_ids, nivel, inicio, fim):
+        if not company_ids: return []
+        return self._paginar(lambda: self.client.table("vendas_rollup").select("company_id, periodo, total, qtd, minimo, maximo")
+                             .in_("company_id", list(company_ids)).eq("nivel", nivel)
+                             .gte("periodo", str(inicio)).lte("periodo", str(fim)).order("company_id").order("periodo"))
+
+    def reconstruir_rollups(self, company_id=None):
+        self.client.rpc("reconstruir_rollup_vendas", {"cid": company_id}).execute()
+
+
+# --- BACKEND SQLITE (EMBARCADO) ---
+ESQUEMA_SQLITE = """
+create table if not exists usuarios (
+    id text primary key,
+    email text not null unique,
+    senha_hash text not null
+);
+create table if not exists companies (
+    id text primary key,
+    name text not null,
+    created_at text not null default current_timestamp
+);
+create table if not exists company_users (
+    company_id text not null references companies(id) on delete cascade,
+    user_id text not null references usuarios(id) on delete cascade,
+    role text not null default 'viewer',
+    permissions text,
+    unique (company_id, user_id)
+);
+create table if not exists config_dias_uteis (
+    company_id text primary key references companies(id) on delete cascade,
+    dias_trabalho text not null
+);
+create table if not exists feriados (
+    id integer primary key autoincrement,
+    company_id text not null references companies(id) on delete cascade,
+    data text not null,
+    descricao text,
+    unique (company_id, data)
+);
+create table if not exists metas (
+    id integer primary key autoincrement,
+    company_id text not null references companies(id) on delete cascade,
+    ano integer not null,
+    mes integer not null,
+    meta_mensal real not null default 0,
+    unique (company_id, ano, mes)
+);
+create table if not exists vendas_diarias (
+    id integer primary key autoincrement,
+    company_id text not null references companies(id) on delete cascade,
+    data_venda text not null,
+    valor_venda real not null,
+    qtd integer not null default 1,
+    created_at text not null default current_timestamp,
+    unique (company_id, data_venda)
+);
+create table if not exists vendas (
+    id integer primary key autoincrement,
+    company_id text not null references companies(id) on delete cascade,
+    data_venda text not null,
+    valor_venda real not null,
+    vendedor text,
+    canal text,
+    dia_avulso text check (dia_avulso is null or dia_avulso = data_venda),
+    chave_importacao text,
+    created_at text not null default current_timestamp,
+    unique (company_id, dia_avulso)
+);
+create index if not exists vendas_company_data_idx on vendas (company_id, data_venda);
+create table if not exists vendas_diarias_vendedor (
+    company_id text not null references companies(id) on delete cascade,
+    data_venda text not null,
+    vendedor text not null default '',
+    canal text not null default '',
+    total real not null default 0,
+    qtd integer not null default 0,
+    primary key (company_id, data_venda, vendedor, canal)
+);
+create table if not exists vendas_rollup (
+    company_id text not null references companies(id) on delete cascade,
+    nivel text not null check (nivel in ('D', 'M', 'A')),
+    periodo text not null,
+    total real not null default 0,
+    qtd integer not null default 0,
+    minimo real,
+    maximo real,
+    primary key (company_id, nivel, periodo)
+);
+"""
+
+# Mesmo algoritmo do trigger do Supabase: recalcula o dia, o mês (a partir dos dias) e o ano (a partir dos meses)
+def _sql_atualizar_rollup(cid, dia):
+    mes_ini, mes_fim = f"date({dia}, 'start of month')", f"date({dia}, 'start of month', '+1 month', '-1 day')"
+    ano_ini, ano_fim = f"date({dia}, 'start of year')", f"date({dia}, 'start of year', '+1 year', '-1 day')"
+    return f"""
+        delete from vendas_rollup where company_id = {cid} and nivel = 'D' and periodo = {dia};
+        insert into vendas_rollup (company_id, nivel, periodo, total, qtd, minimo, maximo)
+            select {cid}, 'D', {dia}, sum(valor_venda), sum(qtd), sum(valor_venda), sum(valor_venda)
+            from vendas_diarias where company_id = {cid} and data_venda = {dia} group by company_id;
+        delete from vendas_rollup where company_id = {cid} and nivel = 'M' and periodo = {mes_ini};
+        insert into vendas_rollup (company_id, nivel, periodo, total, qtd, minimo, maximo)
+            select {cid}, 'M', {mes_ini}, sum(total), sum(qtd), min(total), max(total)
+            from vendas_rollup where company_id = {cid} and nivel = 'D' and periodo between {mes_ini} and {mes_fim}
+            group by company_id;
+        delete from vendas_rollup where company_id = {cid} and nivel = 'A' and periodo = {ano_ini};
+        insert into vendas_rollup (company_id, nivel, periodo, total, qtd, minimo, maximo)
+            select {cid}, 'A', {ano_ini}, sum(total), sum(qtd), min(minimo), max(maximo)
+            from vendas_rollup where company_id = {cid} and nivel = 'M' and periodo between {ano_ini} and {ano_fim}
+            group by company_id;
+    """
+
+TRIGGERS_SQLITE = f"""
+create trigger if not exists vendas_rollup_ins after insert on vendas_diarias begin
+    {_sql_atualizar_rollup("new.company_id", "new.data_venda")}
+end;
+create trigger if not exists vendas_rollup_upd after update on vendas_diarias begin
+    {_sql_atualizar_rollup("old.company_id", "old.data_venda")}
+    {_sql_atualizar_rollup("new.company_id", "new.data_venda")}
+end;
+create trigger if not exists vendas_rollup_del after delete on vendas_diarias begin
+    {_sql_atualizar_rollup("old.company_id", "old.data_venda")}
+end;
+"""
+
+# Mesmo algoritmo do trigger do Supabase (agregados por diferença), linha a linha: sem tabelas de transição no SQLite
+def _sql_somar_venda(linha):
+    return f"""
+        insert into vendas_diarias (company_id, data_venda, valor_venda, qtd)
+            values ({linha}.company_id, {linha}.data_venda, {linha}.valor_venda, 1)
+            on conflict (company_id, data_venda) do update set valor_venda = valor_venda + excluded.valor_venda, qtd = qtd + 1;
+        insert into vendas_diarias_vendedor (company_id, data_venda, vendedor, canal, total, qtd)
+            values ({linha}.company_id, {linha}.data_venda, coalesce({linha}.vendedor, ''), coalesce({linha}.canal, ''), {linha}.valor_venda, 1)
+            on conflict (company_id, data_venda, vendedor, canal) do update set total = total + excluded.total, qtd = qtd + 1;
+    """
+
+def _sql_retirar_venda(linha):
+    return f"""
+        update vendas_diarias set valor_venda = valor_venda - {linha}.valor_venda, qtd = qtd - 1
+            where company_id = {linha}.company_id and data_venda = {linha}.data_venda;
+        update vendas_diarias_vendedor set total = total - {linha}.valor_venda, qtd = qtd - 1
+            where company_id = {linha}.company_id and data_venda = {linha}.data_venda
+              and vendedor = coalesce({linha}.vendedor, '') and canal = coalesce({linha}.canal, '');
+    """
+
+# Separado da retirada: num UPDATE, o dia só sai depois de somar o valor novo (mantém o id do Extrato)
+def _sql_limpar_dia(linha):
+    return f"""
+        delete from vendas_diarias where company_id = {linha}.company_id and data_venda = {linha}.data_venda and qtd <= 0;
+        delete from vendas_diarias_vendedor where company_id = {linha}.company_id and data_venda = {linha}.data_venda and qtd <= 0;
+    """
+
+TRIGGERS_VENDAS_SQLITE = f"""
+create trigger if not exists vendas_agregados_ins after insert on vendas begin
+    {_sql_somar_venda("new")}
+end;
+create trigger if not exists vendas_agregados_upd after update on vendas begin
+    {_sql_retirar_venda("old")}
+    {_sql_somar_venda("new")}
+    {_sql_limpar_dia("old")}
+end;
+create trigger if not exists vendas_agregados_del after delete on vendas begin
+    {_sql_retirar_venda("old")}
+    {_sql_limpar_dia("old")}
+end;
+"""
+
+# Bancos de antes das transações: cada dia vira o lançamento avulso (antes de criar os triggers de vendas)
+MIGRAR_VENDAS_SQLITE = """
+    insert into vendas (company_id, data_venda, valor_venda, dia_avulso)
+        select company_id, data_venda, valor_venda, data_venda from vendas_diarias;
+    insert into vendas_diarias_vendedor (company_id, data_venda, vendedor, canal, total, qtd)
+        select company_id, data_venda, '', '', valor_venda, 1 from vendas_diarias;
+"""
+
+RECONSTRUIR_ROLLUPS_SQLITE = """
+    delete from vendas_rollup where :cid is null or company_id = :cid;
+    insert into vendas_rollup (company_id, nivel, periodo, total, qtd, minimo, maximo)
+        select company_id, 'D', data_venda, sum(valor_venda), sum(qtd), sum(valor_venda), sum(valor_venda)
+        from vendas_diarias where :cid is null or company_id = :cid
+        group by company_id, data_venda;
+    insert into vendas_rollup (company_id, nivel, periodo, total, qtd, minimo, maximo)
+        select company_id, 'M', date(periodo, 'start of month'), sum(total), sum(qtd), min(total), max(total)
+        from vendas_rollup where nivel = 'D' and (:cid is null or company_id = :cid)
+        group by company_id, date(periodo, 'start of month');
+    insert into vendas_rollup (company_id, nivel, periodo, total, qtd, minimo, maximo)
+        select company_id, 'A', date(periodo, 'start of year'), sum(total), sum(qtd), min(minimo), max(maximo)
+        from vendas_rollup where nivel = 'M' and (:cid is null or company_id = :cid)
+        group by company_id, date(periodo, 'start of year');
+"""
+
+def _hash_senha(senha, sal):
+    return hashlib.pbkdf2_hmac("sha256", senha.encode(), bytes.fromhex(sal), 100_000).hex()
+
+
+class RepositorioSQLite(Repositorio):
+    def __init__(self, caminho=":memory:"):
+        self.caminho = caminho
+        # Uma conexão por processo, serializada pelo lock (sessões do Streamlit rodam em threads)
+        self._conn = sqlite3.connect(caminho, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.RLock()
+        with self._lock, self._conn:
+            self._conn.execute("pragma foreign_keys = on")
+            self._conn.execute("pragma journal_mode = wal")
+            self._conn.executescript(ESQUEMA_SQLITE)
+            colunas = {c['name'] for c in self._conn.execute("pragma table_info(vendas_diarias)")}
+            if "qtd" not in colunas: self._conn.execute("alter table vendas_diarias add column qtd integer not null default 1")
+            colunas = {c['name'] for c in self._conn.execute("pragma table_info(vendas)")}
+            if "chave_importacao" not in colunas: self._conn.execute("alter table vendas add column chave_importacao text")
+            self._conn.execute("create unique index if not exists vendas_chave_importacao_key on vendas (company_id, chave_importacao)")
+            if not self._conn.execute("select 1 from vendas limit 1").fetchone():
+                self._conn.executescript(MIGRAR_VENDAS_SQLITE)
+            # Triggers de rollup de antes das transações contavam dias (count(*)) em vez de somar qtd
+            antigo = self._conn.execute("select sql from sqlite_master where type = 'trigger' and name = 'vendas_rollup_ins'").fetchone()
+            rollups_antigos = antigo is not None and "count(*)" in antigo['sql']
+            if rollups_antigos:
+                for nome in ("vendas_rollup_ins", "vendas_rollup_upd", "vendas_rollup_del"):
+                    self._conn.execute(f"drop trigger {nome}")
+            self._conn.executescript(TRIGGERS_SQLITE)
+            self._conn.executescript(TRIGGERS_VENDAS_SQLITE)
+        self._usuario_atual = None
+        # Bancos criados antes dos rollups (ou com a contagem antiga): faz o backfill uma vez
+        if rollups_antigos or (not self._ler("select 1 from vendas_rollup limit 1") and self._ler("select 1 from vendas_diarias limit 1")):
+            self.reconstruir_rollups()
+
+    def _ler(self, sql, params=()):
+        with self._lock:
+            return [dict(r) for r in self._conn.execute(sql, params).fetchall()]
+
+    def _escrever(self, sql, params=()):
+        with self._lock, self._conn:
+            return self._conn.execute(sql, params)
+
+    def _escrever_lote(self, sql, lista_params):
+        with self._lock, self._conn:
+            return self._conn.executemany(sql, lista_params)
+
+    def entrar(self, email, senha):
+        linhas = self._ler("select id, email, senha_hash from usuarios where email = ?", (email,))
+        if not linhas: raise ValueError("Credenciais inválidas")
+        sal, esperado = linhas[0]['senha_hash'].split("$")
+        if not secrets.compare_digest(_hash_senha(senha, sal), esperado):
+            raise ValueError("Credenciais inválidas")
+        self._usuario_atual = SimpleNamespace(id=linhas[0]['id'], email=linhas[0]['email'])
+        return self._usuario_atual
+
+    def cadastrar(self, email, senha, user_id=None):
+        sal = secrets.token_hex(16)
+        user_id = user_id or str(uuid.uuid4())
+        self._escrever("insert into usuarios (id, email, senha_hash) values (?, ?, ?)", (user_id, email, f"{sal}${_hash_senha(senha, sal)}"))
+        return SimpleNamespace(id=user_id, email=email)
+
+    def sair(self):
+        self._usuario_atual = None
+
+    def listar_empresas_usuario(self, user_id):
+        return self._ler("""
+            select c.id, c.name, cu.role, cu.permissions from company_users cu join companies c on c.id = cu.company_id
+            where cu.user_id = ? order by c.name
+        """, (user_id,))
+
+    def criar_empresa(self, nome, company_id=None):
+        company_id = company_id or str(uuid.uuid4())
+        self._escrever("insert into companies (id, name) values (?, ?)", (company_id, nome))
+        return company_id
+
+    def renomear_empresa(self, company_id, nome):
+        self._escrever("update companies set name = ? where id = ?", (nome, company_id))
+
+    def get_membro(self, company_id, user_id):
+        linhas = self._ler("select role, permissions from company_users where company_id = ? and user_id = ?", (company_id, user_id))
+        return linhas[0] if linhas else None
+
+    def adicionar_membro(self, company_id, user_id, role, permissions):
+        self._escrever("insert into company_users (company_id, user_id, role, permissions) values (?, ?, ?, ?)",
+                       (company_id, user_id, role, json.dumps(permissions)))
+
+    def listar_membros(self, company_id, limite, offset, busca=None):
+        return self._ler("""
+            select cu.user_id, u.email, cu.role, cu.permissions, count(*) over () as total
+            from company_users cu join usuarios u on u.id = cu.user_id
+            where cu.company_id = ?
+              and (? is null or u.email like '%' || replace(replace(replace(?, '\\', '\\\\'), '%', '\\%'), '_', '\\_') || '%' escape '\\')
+            order by u.email limit ? offset ?
+        """, (company_id, busca or None, busca or None, limite, offset))
+
+    def atualizar_membros(self, company_id, membros):
+        self._escrever_lote(
+            "update company_users set role = ?, permissions = ? where company_id = ? and user_id = ?",
+            [(m['role'], json.dumps(m['permissions']), company_id, m['user_id']) for m in membros]
+        )
+
+    def remover_membros(self, company_id, user_ids):
+        self._escrever_lote("delete from company_users where company_id = ? and user_id = ?", [(company_id, u) for u in user_ids])
+
+    def buscar_usuario_por_email(self, email):
+        linhas = self._ler("select id from usuarios where email = ?", (email,))
+        return linhas[0]['id'] if linhas else None
+
+    def get_config_dias(self, company_id):
+        linhas = self._ler("select dias_trabalho from config_dias_uteis where company_id = ?", (company_id,))
+        return linhas[0]['dias_trabalho'] if linhas else None
+
+    def salvar_config_dias(self, company_id, dias):
+        self._escrever("""
+            insert into config_dias_uteis (company_id, dias_trabalho) values (?, ?)
+            on conflict (company_id) do update set dias_trabalho = excluded.dias_trabalho
+        """, (company_id, json.dumps(dias)))
+
+    def listar_feriados(self, company_id):
+        return self._ler("select * from feriados where company_id = ? order by data", (company_id,))
+
+    def salvar_feriados(self, company_id, linhas):
+        self._escrever_lote("""
+            insert into feriados (company_id, data, descricao) values (?, ?, ?)
+            on conflict (company_id, data) do update set descricao = excluded.descricao
+        """, [(company_id, str(l['data']), l['descricao']) for l in linhas])
+
+    def excluir_feriados(self, company_id, ids):
+        self._escrever_lote("delete from feriados where company_id = ? and id = ?", [(company_id, i) for i in ids])
+
+    def get_meta(self, company_id, ano, mes):
+        linhas = self._ler("select * from metas where company_id = ? and ano = ? and mes = ?", (company_id, ano, mes))
+        return linhas[0] if linhas else None
+
+    def listar_metas(self, company_id):
+        return self._ler("select * from metas where company_id = ? order by ano, mes", (company_id,))
+
+    def salvar_meta(self, company_id, ano, mes, valor):
+        self._escrever("""
+            insert into metas (company_id, ano, mes, meta_mensal) values (?, ?, ?, ?)
+            on conflict (company_id, ano, mes) do update set meta_mensal = excluded.meta_mensal
+        """, (company_id, ano, mes, valor))
+
+    def listar_metas_empresas(self, company_ids, ano, mes):
+        if not company_ids: return []
+        marcadores = ", ".join("?" * len(company_ids))
+        return self._ler(f"""
+            select company_id, meta_mensal from metas
+            where company_id in ({marcadores}) and ano = ? and mes = ? order by company_id
+        """, (*company_ids, ano, mes))
+
+    def listar_vendas(self, company_id, inicio=None, fim=None):
+        return self._ler("""
+            select * from vendas_diarias
+            where company_id = ? and (? is null or data_venda >= ?) and (? is null or data_venda <= ?)
+            order by data_venda
+        """, (company_id, inicio, inicio, fim, fim))
+
+    def listar_vendas_pagina(self, company_id, inicio, fim, limite, antes_de=None):
+        return self._ler("""
+            select id, data_venda, valor_venda, qtd from vendas_diarias
+            where company_id = ? and data_venda between ? and ? and (? is null or data_venda < ?)
+            order by data_venda desc limit ?
+        """, (company_id, str(inicio), str(fim), antes_de and str(antes_de), antes_de and str(antes_de), limite))
+
+    def resumo_vendas(self, company_id, inicio, fim):
+        return self._ler("""
+            select coalesce(sum(valor_venda), 0) as total, coalesce(sum(qtd), 0) as qtd, count(*) as dias, min(valor_venda) as minimo, max(valor_venda) as maximo
+            from vendas_diarias where company_id = ? and data_venda between ? and ?
+        """, (company_id, str(inicio), str(fim)))[0]
+
+    def buscar_venda(self, company_id, data_venda):
+        linhas = self._ler("""
+            select d.id, d.data_venda, d.valor_venda, d.qtd, v.valor_venda as avulso
+            from vendas_diarias d left join vendas v on v.company_id = d.company_id and v.dia_avulso = d.data_venda
+            where d.company_id = ? and d.data_venda = ?
+        """, (company_id, str(data_venda)))
+        return linhas[0] if linhas else None
+
+    def salvar_venda(self, company_id, data_venda, valor):
+        self.salvar_vendas_lote(company_id, [{"data_venda": data_venda, "valor_venda": valor}])
+
+    def salvar_vendas_lote(self, company_id, linhas):
+        self._escrever_lote("""
+            insert into vendas (company_id, data_venda, valor_venda, dia_avulso) values (?, ?, ?, ?)
+            on conflict (company_id, dia_avulso) do update set valor_venda = excluded.valor_venda
+        """, [(company_id, str(l['data_venda']), l['valor_venda'], str(l['data_venda'])) for l in linhas])
+
+    def registrar_vendas(self, company_id, linhas):
+        cursor = self._escrever_lote("""
+            insert into vendas (company_id, data_venda, valor_venda, vendedor, canal, chave_importacao) values (?, ?, ?, ?, ?, ?)
+            on conflict (company_id, chave_importacao) do nothing
+        """, [(company_id, str(l['data_venda']), l['valor_venda'], l.get('vendedor'), l.get('canal'), l.get('chave_importacao'))
+              for l in linhas])
+        return cursor.rowcount if linhas else 0
+
+    def excluir_vendas_dia(self, company_id, data_venda):
+        self._escrever("delete from vendas where company_id = ? and data_venda = ?", (company_id, str(data_venda)))
+
+    def listar_transacoes(self, company_id, inicio=None, fim=None):
+        return self._ler("""
+            select id, data_venda, valor_venda, vendedor, canal, dia_avulso, chave_importacao from vendas
+            where company_id = ? and (? is null or data_venda >= ?) and (? is null or data_venda <= ?)
+            order by data_venda, id
+        """, (company_id, inicio and str(inicio), inicio and str(inicio), fim and str(fim), fim and str(fim)))
+
+    def listar_vendas_vendedor(self, company_id, inicio, fim):
+        return self._ler("""
+            select data_venda, vendedor, canal, total, qtd from vendas_diarias_vendedor
+            where company_id = ? and data_venda between ? and ? order by data_venda, vendedor, canal
+        """, (company_id, str(inicio), str(fim)))
+
+    def resumo_vendedores(self, company_id, inicio, fim):
+        return self._ler("""
+            select vendedor, canal, sum(total) as total, sum(qtd) as qtd from vendas_diarias_vendedor
+            where company_id = ? and data_venda between ? and ? group by vendedor, canal order by sum(total) desc
+        """, (company_id, str(inicio), str(fim)))
+
+    def listar_rollups(self, company_id, nivel, inicio, fim):
+        return self._ler("""
+            select periodo, total, qtd, minimo, maximo from vendas_rollup
+            where company_id = ? and nivel = ? and periodo between ? and ? order by periodo
+        """, (company_id, nivel, str(inicio), str(fim)))
+
+    def listar_rollups_empresas(self, company_ids, nivel, inicio, fim):
+        if not company_ids: return []
+        marcadores = ", ".join("?" * len(company_ids))
+        return self._ler(f"""
+            select company_id, periodo, total, qtd, minimo, maximo from vendas_rollup
+            where company_id in ({marcadores}) and nivel = ? and periodo between ? and ?
+            order by company_id, periodo
+        """, (*company_ids, nivel, str(inicio), str(fim)))
+
+    def reconstruir_rollups(self, company_id=None):
+        with self._lock, self._conn:
+            for comando in RECONSTRUIR_ROLLUPS_SQLITE.split(";"):
+                if comando.strip(): self._conn.execute(comando, {"cid": company_id})
+
+
+# --- OBSERVAÇÃO DE CHAMADAS (BENCHMARKS/PROFILING) ---
+# Callables (metodo, args, duracao_s, resultado, erro) notificados a cada chamada ao backend
+OBSERVADORES = []
+
+class RepositorioObservado:
+    """Proxy que notifica OBSERVADORES a cada método público chamado (um round trip lógico)"""
+    def __init__(self, base):
+        self._base = base
+
+    def __getattr__(self, nome):
+        attr = getattr(self._base, nome)
+        if nome.startswith("_") or not callable(attr): return attr
+
+        def chamada(*args, **kwargs):
+            inicio = time.perf_counter()
+            resultado, erro = None, None
+            try:
+                resultado = attr(*args, **kwargs)
+                return resultado
+            except Exception as e:
+                erro = e
+                raise
+            finally:
+                duracao = time.perf_counter() - inicio
+                for obs in list(OBSERVADORES): obs(nome, args, duracao, resultado, erro)
+        return chamada
+
+
+# --- POOL DE REPOSITÓRIOS POR SESSÃO ---
+POOL_MAX_SESSOES = 500
+POOL_OCIOSO_SEGUNDOS = 1800
+POOL_RENOVAR_ANTES_SEGUNDOS = 300
+POOL_INTERVALO_SEGUNDOS = 30
+
+
+class _EntradaPool:
+    def __init__(self, repo):
+        self.repo = repo
+        self.usado_em = time.monotonic()
+        self.valida = True
+
+
+class PoolSessoes:
+    """Um repositório (cliente Supabase) por sessão do app, para que o login de um usuário não
+    troque o token das consultas dos outros. O cliente de cada sessão é reaproveitado entre os
+    reruns, então as consultas seguem na mesma conexão HTTP (keep-alive/HTTP2) sem novo handshake.
+
+    O pool é limitado a `max_sessoes` (sai a usada há mais tempo) e uma thread de manutenção
+    encerra as sessões ociosas e renova os tokens perto de expirar, fora do caminho das telas.
+    Sessões descartadas (ou cuja renovação falhou) ficam inválidas: `ativa` devolve False e o app
+    pede login de novo."""
+    def __init__(self, fabrica, max_sessoes=POOL_MAX_SESSOES, ocioso_segundos=POOL_OCIOSO_SEGUNDOS,
+                 renovar_antes_segundos=POOL_RENOVAR_ANTES_SEGUNDOS, intervalo_segundos=POOL_INTERVALO_SEGUNDOS):
+        self.fabrica = fabrica
+        self.max_sessoes = max_sessoes
+        self.ocioso_segundos = ocioso_segundos
+        self.renovar_antes_segundos = renovar_antes_segundos
+        self.intervalo_segundos = intervalo_segundos
+        self._entradas = OrderedDict()  # chave da sessão -> _EntradaPool, da menos para a mais usada
+        self._a_encerrar = []           # repositórios retirados do pool, fechados pela manutenção
+        self._lock = threading.Lock()
+        self._acordar = threading.Event()
+        threading.Thread(target=self._manutencao, name="pool-sessoes", daemon=True).start()
+
+    def obter(self, chave):
+        """Repositório da sessão; cria um (ainda anônimo) na primeira chamada"""
+        with self._lock:
+            entrada = self._entradas.get(chave)
+            if entrada is None:
+                entrada = self._entradas[chave] = _EntradaPool(self.fabrica())
+                while len(self._entradas) > self.max_sessoes:
+                    _, velha = self._entradas.popitem(last=False)
+                    self._a_encerrar.append(velha.repo)
+            self._entradas.move_to_end(chave)
+            entrada.usado_em = time.monotonic()
+            return entrada.repo
+
+    def ativa(self, chave):
+        """A sessão continua no pool com um token válido?"""
+        with self._lock:
+            entrada = self._entradas.get(chave)
+            return entrada is not None and entrada.valida
+
+    def remover(self, chave):
+        """Tira a sessão do pool (logout, depois do sair); o fechamento das conexões fica em segundo plano"""
+        with self._lock:
+            entrada = self._entradas.pop(chave, None)
+            if entrada is not None: self._a_encerrar.append(entrada.repo)
+        self._acordar.set()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entradas)
+
+    def _manutencao(self):
+        while True:
+            self._acordar.wait(self.intervalo_segundos)
+            self._acordar.clear()
+            agora = time.monotonic()
+            with self._lock:
+                ociosas = [c for c, e in self._entradas.items() if agora - e.usado_em > self.ocioso_segundos]
+                for chave in ociosas: self._a_encerrar.append(self._entradas.pop(chave).repo)
+                encerrar, self._a_encerrar = self._a_encerrar, []
+                ativas = [e for e in self._entradas.values() if e.valida]
+            for repo in encerrar:
+                try:
+                    _base(repo)._encerrar()
+                except Exception:
+                    logging.getLogger("metas").warning("Falha ao encerrar sessão do backend", exc_info=True)
+            for entrada in ativas:
+                base = _base(entrada.repo)
+                try:
+                    expira_em = base._expira_em()
+                    if expira_em is not None and expira_em - time.time() < self.renovar_antes_segundos:
+                        base._renovar_sessao()
+                except Exception:
+                    logging.getLogger("metas").warning("Falha ao renovar token da sessão", exc_info=True)
+                    entrada.valida = False
+
+
+class PoolCompartilhado:
+    """Mesma interface do PoolSessoes para backends sem autenticação por usuário nas consultas
+    (SQLite): todas as sessões usam uma instância só"""
+    def __init__(self, repo):
+        self.repo = repo
+
+    def obter(self, chave):
+        return self.repo
+
+    def ativa(self, chave):
+        return True
+
+    def remover(self, chave):
+        pass
+
+    def __len__(self):
+        return 1
+
+
+def _base(repo):
+    return repo._base if isinstance(repo, RepositorioObservado) else repo
+
+
+# --- FÁBRICA E REPLAY ---
+def _cliente_supabase(cfg_supabase, **opcoes):
+    from supabase import ClientOptions, create_client
+    return create_client(cfg_supabase["url"], cfg_supabase["key"], options=ClientOptions(**opcoes) if opcoes else None)
+
+
+def criar_repositorio(cfg_backend, cfg_supabase=None):
+    """Monta o backend a partir da seção [backend] dos secrets (padrão: supabase)"""
+    tipo = cfg_backend.get("tipo", "supabase")
+    if tipo == "sqlite":
+        repo = RepositorioSQLite(cfg_backend.get("caminho", "metas_local.db"))
+    elif tipo == "supabase":
+        repo = RepositorioSupabase(_cliente_supabase(cfg_supabase))
+    else:
+        raise ValueError(f"Backend desconhecido: {tipo}")
+    return RepositorioObservado(repo) if cfg_backend.get("observar") else repo
+
+
+def criar_pool_sessoes(cfg_backend, cfg_supabase=None, cfg_pool=None):
+    """Pool de repositórios por sessão do app ([pool] nos secrets: max_sessoes, ocioso_segundos,
+    renovar_antes_segundos, intervalo_segundos). SQLite usa uma instância compartilhada"""
+    tipo = cfg_backend.get("tipo", "supabase")
+    if tipo != "supabase": return PoolCompartilhado(criar_repositorio(cfg_backend, cfg_supabase))
+
+    def fabrica():
+        # Sem timer de renovação por cliente (o pool renova) e com o token só na memória do cliente
+        repo = RepositorioSupabase(_cliente_supabase(cfg_supabase, auto_refresh_token=False, persist_session=False))
+        return RepositorioObservado(repo) if cfg_backend.get("observar") else repo
+    return PoolSessoes(fabrica, **(cfg_pool or {}))
+
+
+def copiar_empresa(origem, destino, company_id, nome, membros=()):
+    """Copia os dados de uma empresa entre backends (ex.: Supabase -> SQLite para replay local).
+    `membros` é uma lista de (user_id, email, role, permissions) a recriar no destino."""
+    destino.criar_empresa(nome, company_id=company_id)
+    for user_id, email, role, permissions in membros:
+        if destino.buscar_usuario_por_email(email) is None:
+            destino.cadastrar(email, secrets.token_urlsafe(12), user_id=user_id)
+        destino.adicionar_membro(company_id, user_id, role, permissions)
+
+    dias = origem.get_config_dias(company_id)
+    if dias is not None:
+        destino.salvar_config_dias(company_id, json.loads(dias) if isinstance(dias, str) else dias)
+    destino.salvar_feriados(company_id, origem.listar_feriados(company_id))
+    for m in origem.listar_metas(company_id):
+        destino.salvar_meta(company_id, m['ano'], m['mes'], m['meta_mensal'])
+    vendas = origem.listar_transacoes(company_id)
+    destino.salvar_vendas_lote(company_id, [v for v in vendas if v['dia_avulso']])
+    destino.registrar_vendas(company_id, [v for v in vendas if not v['dia_avulso']])
+    return len(vendas)
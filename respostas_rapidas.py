@@ -0,0 +1,123 @@
+"""Respostas locais para as perguntas mais comuns do Analista Virtual.
+
+Um casador de intenções (palavras-chave em português) responde a partir de agregados
+vetorizados das vendas do mês, sem chamar o Gemini nem executar código gerado.
+Perguntas que não casam com nenhuma intenção retornam None e seguem para a IA.
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+from formatacao import DIAS_SEMANA_PT, format_moeda, normalizar_texto
+
+
+def calcular_agregados(df_vendas):
+    """Agregados do mês calculados uma vez por conteúdo do DataFrame"""
+    datas = pd.to_datetime(df_vendas['data_venda'])
+    diario = df_vendas['valor_venda'].astype(float).groupby(datas.dt.normalize()).sum().sort_index()
+    por_semana = diario.groupby(diario.index.dayofweek).agg(['sum', 'mean', 'count']).reindex(range(7))
+    return {
+        "total": float(diario.sum()),
+        # `qtd` = vendas somadas em cada linha (totais diários ou por vendedor); linhas otimistas contam 1
+        "qtd_lancamentos": int(df_vendas['qtd'].fillna(1).sum()) if 'qtd' in df_vendas else int(len(df_vendas)),
+        "qtd_dias": int(len(diario)),
+        "media_diaria": float(diario.mean()) if len(diario) else 0.0,
+        "melhor_dia": (diario.idxmax(), float(diario.max())) if len(diario) else None,
+        "pior_dia": (diario.idxmin(), float(diario.min())) if len(diario) else None,
+        "semana_total": por_semana['sum'].to_numpy(dtype=float),
+        "semana_media": por_semana['mean'].to_numpy(dtype=float),
+        "semana_dias": por_semana['count'].fillna(0).to_numpy(dtype=int),
+    }
+
+
+# --- RESPOSTAS POR INTENÇÃO ---
+def _dia(ts):
+    return f"{ts.strftime('%d/%m/%Y')} ({DIAS_SEMANA_PT[ts.dayofweek]})"
+
+
+def _melhor_dia(ag, ctx):
+    if not ag["melhor_dia"]: return None
+    dia, valor = ag["melhor_dia"]
+    return f"O melhor dia foi **{_dia(dia)}**, com **{format_moeda(valor)}** em vendas."
+
+
+def _pior_dia(ag, ctx):
+    if not ag["pior_dia"]: return None
+    dia, valor = ag["pior_dia"]
+    return f"O pior dia foi **{_dia(dia)}**, com **{format_moeda(valor)}** em vendas."
+
+
+def _ranking_semana(ag, ordem):
+    medias = ag["semana_media"]
+    validos = np.flatnonzero(~np.isnan(medias))
+    if not len(validos): return None
+    idx = validos[np.argmax(medias[validos])] if ordem == "melhor" else validos[np.argmin(medias[validos])]
+    return (f"O {ordem} dia da semana é **{DIAS_SEMANA_PT[idx]}**, com média de "
+            f"**{format_moeda(medias[idx])}** por dia ({ag['semana_dias'][idx]} dias no período).")
+
+
+def _total_por_semana(ag, ctx):
+    linhas = [
+        f"- **{DIAS_SEMANA_PT[i]}**: {format_moeda(ag['semana_total'][i])} (média {format_moeda(ag['semana_media'][i])})"
+        for i in range(7) if ag["semana_dias"][i] > 0
+    ]
+    if not linhas: return None
+    return "Vendas por dia da semana:\n\n" + "\n".join(linhas)
+
+
+def _media(ag, ctx):
+    if not ag["qtd_dias"]: return None
+    ticket = ag["total"] / ag["qtd_lancamentos"] if ag["qtd_lancamentos"] else 0
+    return (f"A média diária de vendas é **{format_moeda(ag['media_diaria'])}** em {ag['qtd_dias']} dias com venda "
+            f"(ticket médio por lançamento: {format_moeda(ticket)}).")
+
+
+def _total(ag, ctx):
+    return f"O total vendido no período é **{format_moeda(ag['total'])}** em {ag['qtd_dias']} dias com venda."
+
+
+def _falta_meta(ag, ctx):
+    meta = ctx.get("meta", 0)
+    if meta <= 0: return "Não há meta cadastrada para este mês."
+    falta = max(0.0, meta - ag["total"])
+    if falta == 0:
+        return f"A meta de **{format_moeda(meta)}** já foi batida! Realizado: **{format_moeda(ag['total'])}**."
+    return (f"Faltam **{format_moeda(falta)}** para a meta de {format_moeda(meta)} "
+            f"({ag['total'] / meta * 100:.1f}% alcançado).")
+
+
+def _ritmo_meta(ag, ctx):
+    meta, dias_uteis = ctx.get("meta", 0), ctx.get("dias_uteis", 0)
+    if meta <= 0: return "Não há meta cadastrada para este mês."
+    falta = max(0.0, meta - ag["total"])
+    if falta == 0: return _falta_meta(ag, ctx)
+    if dias_uteis <= 0:
+        return f"Não restam dias úteis no mês e faltam **{format_moeda(falta)}** para a meta."
+    return (f"Para bater a meta é preciso vender **{format_moeda(falta / dias_uteis)} por dia** "
+            f"nos {dias_uteis} dias úteis restantes (faltam {format_moeda(falta)}).")
+
+
+# Ordem importa: intenções mais específicas primeiro
+INTENCOES = [
+    (re.compile(r"\b(melhor|maior)\b.*\bdia da semana\b|\bdia da semana\b.*\b(vende|vendeu|vendemos) mais\b"), lambda ag, ctx: _ranking_semana(ag, "melhor")),
+    (re.compile(r"\b(pior|menor)\b.*\bdia da semana\b|\bdia da semana\b.*\b(vende|vendeu|vendemos) menos\b"), lambda ag, ctx: _ranking_semana(ag, "pior")),
+    (re.compile(r"\b(por|cada)\b.*\bdias? da semana\b|\bdias da semana\b"), _total_por_semana),
+    (re.compile(r"\b(melhor|maior|recorde)\b.*\bdia\b|\bdia\b.*\b(vendeu|vendemos|vendi) mais\b"), _melhor_dia),
+    (re.compile(r"\b(pior|menor)\b.*\bdia\b|\bdia\b.*\b(vendeu|vendemos|vendi) menos\b"), _pior_dia),
+    (re.compile(r"\b(preciso|precisamos|devo|tenho que|temos que)\b.*\b(vender|fazer)\b|\b(por dia|diaria|ritmo)\b.*\bmeta\b|\bmeta\b.*\b(por dia|diaria)\b"), _ritmo_meta),
+    (re.compile(r"\bfalta\b|\bfaltam\b|\batingi|\bbati\b|\bbatemos\b|\bpercentual\b.*\bmeta\b"), _falta_meta),
+    (re.compile(r"\bticket medio\b|\bmedia\b"), _media),
+    (re.compile(r"\btotal\b|\bquanto (vendi|vendemos|vendeu)\b|\bfaturamento\b|\bfaturamos\b"), _total),
+]
+
+
+def responder(pergunta, agregados, contexto, nome_empresa):
+    """Resposta pronta para a pergunta, ou None se nenhuma intenção casar"""
+    texto = normalizar_texto(pergunta)
+    for padrao, responder_intencao in INTENCOES:
+        if padrao.search(texto):
+            resposta = responder_intencao(agregados, contexto)
+            if resposta is None: return None
+            return f"{resposta}\n\n*Você está consultando dados da empresa: {nome_empresa}*"
+    return None
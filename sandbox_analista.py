@@ -0,0 +1,212 @@
+"""Execução isolada do código pandas gerado pelo Analista Virtual.
+
+O código roda num pool de processos pré-aquecidos (pandas/numpy já importados), nunca no
+processo do Streamlit. O DataFrame vai para o worker em memória compartilhada no formato
+Arrow IPC: nada é serializado pelo pipe, o worker só mapeia o buffer. Cada execução tem
+limite de tempo de CPU, de memória (espaço de endereçamento do worker), de tempo total
+(só o worker da tarefa é morto, e o pool sobe outro, se ele travar em código C) e de tamanho
+da resposta. Os workers sobem na partida do app (`nucleo.init_sandbox`), não na primeira pergunta.
+"""
+import atexit
+import builtins
+import multiprocessing as mp
+import os
+import signal
+import threading
+from multiprocessing import shared_memory
+
+try:
+    import resource
+except ImportError:  # Windows: só o limite de tempo total vale
+    resource = None
+
+LIMITE_CPU_SEGUNDOS = 10
+LIMITE_MEMORIA_MB = 2048
+LIMITE_SAIDA_CARACTERES = 20_000
+TEMPO_MAXIMO_SEGUNDOS = 20
+WORKERS = 2
+TAREFAS_POR_WORKER = 100
+# Início do segmento de cada tarefa: pid do worker que a executa (0 = na fila ou já terminada)
+BYTES_PID = 8
+
+MODULOS_PERMITIDOS = {"pandas", "numpy", "math", "datetime", "calendar", "statistics", "re", "decimal"}
+BUILTINS_PERMITIDOS = [
+    "abs", "all", "any", "bool", "dict", "divmod", "enumerate", "filter", "float", "format", "frozenset",
+    "int", "isinstance", "len", "list", "map", "max", "min", "next", "pow", "print", "range", "reversed",
+    "round", "set", "slice", "sorted", "str", "sum", "tuple", "zip",
+    "Exception", "KeyError", "ValueError", "IndexError", "TypeError", "ZeroDivisionError",
+]
+
+
+class ErroSandbox(Exception):
+    """Falha controlada da execução (tempo, memória, saída ou erro no código gerado)"""
+
+
+# --- LADO DO WORKER ---
+class _TempoEsgotado(Exception):
+    pass
+
+
+def _sinal_cpu(signum, frame):
+    raise _TempoEsgotado()
+
+
+def _inicializar_worker(limite_memoria_mb):
+    os.environ.setdefault("OPENBLAS_NUM_THREADS", "1")
+    os.environ.setdefault("OMP_NUM_THREADS", "1")
+    import numpy  # noqa: F401  pré-aquecimento
+    import pandas  # noqa: F401
+    import pyarrow  # noqa: F401
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if resource is not None:
+        limite = limite_memoria_mb * 1024 * 1024
+        _, hard = resource.getrlimit(resource.RLIMIT_AS)
+        resource.setrlimit(resource.RLIMIT_AS, (limite if hard == resource.RLIM_INFINITY else min(limite, hard), hard))
+        signal.signal(signal.SIGXCPU, _sinal_cpu)
+
+
+def _importar_restrito(nome, globals=None, locals=None, fromlist=(), level=0):
+    if level != 0 or nome.split(".")[0] not in MODULOS_PERMITIDOS:
+        raise ImportError(f"Módulo não permitido na análise: {nome}")
+    return __import__(nome, globals, locals, fromlist, level)
+
+
+def _fechar_shm(shm):
+    try:
+        shm.close()
+    except BufferError:
+        pass  # Ainda há colunas apontando para o buffer; o mapeamento some quando o worker for reciclado
+
+
+def _executar_no_worker(codigo, nome_shm, tamanho, limite_cpu, limite_saida):
+    import pyarrow as pa
+
+    # O resource tracker é o mesmo do processo pai, que remove o segmento depois da tarefa
+    shm = shared_memory.SharedMemory(name=nome_shm)
+    shm.buf[:BYTES_PID] = os.getpid().to_bytes(BYTES_PID, "little")
+    try:
+        try:
+            df = pa.ipc.open_stream(pa.py_buffer(shm.buf[BYTES_PID:BYTES_PID + tamanho])).read_all().to_pandas()
+        except MemoryError:
+            return "erro", "Os dados excedem o limite de memória da análise."
+        return _executar_codigo_isolado(codigo, df, limite_cpu, limite_saida)
+    finally:
+        df = None
+        shm.buf[:BYTES_PID] = bytes(BYTES_PID)
+        _fechar_shm(shm)
+
+
+def _executar_codigo_isolado(codigo, df, limite_cpu, limite_saida):
+    import numpy as np
+    import pandas as pd
+
+    seguros = {nome: getattr(builtins, nome) for nome in BUILTINS_PERMITIDOS}
+    seguros["__import__"] = _importar_restrito
+    ambiente = {"__builtins__": seguros, "df": df, "pd": pd, "np": np}
+
+    if resource is not None:
+        uso = resource.getrusage(resource.RUSAGE_SELF)
+        _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+        # RLIMIT_CPU conta o tempo acumulado do processo: o limite é relativo ao já gasto
+        resource.setrlimit(resource.RLIMIT_CPU, (int(uso.ru_utime + uso.ru_stime) + limite_cpu, hard))
+    try:
+        exec(codigo, ambiente)
+    except _TempoEsgotado:
+        return "erro", f"A análise excedeu o limite de {limite_cpu}s de processamento."
+    except MemoryError:
+        return "erro", "A análise excedeu o limite de memória."
+    except Exception as e:
+        return "erro", f"Erro ao executar a análise: {type(e).__name__}: {e}"
+    finally:
+        if resource is not None:
+            _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+            resource.setrlimit(resource.RLIMIT_CPU, (hard, hard))
+
+    if "resultado" not in ambiente:
+        return "vazio", None
+    texto = str(ambiente["resultado"])
+    if len(texto) > limite_saida:
+        texto = texto[:limite_saida] + "\n\n*(resposta truncada)*"
+    return "ok", texto
+
+
+# --- LADO DO APP ---
+_pool = None
+_lock_pool = threading.Lock()
+
+
+def _contexto():
+    metodos = mp.get_all_start_methods()
+    return mp.get_context("forkserver" if "forkserver" in metodos else "spawn")
+
+
+def obter_pool():
+    """Pool criado (e aquecido) uma vez por processo; o próprio Pool repõe os workers que morrem"""
+    global _pool
+    with _lock_pool:
+        if _pool is None:
+            _pool = _contexto().Pool(WORKERS, initializer=_inicializar_worker, initargs=(LIMITE_MEMORIA_MB,),
+                                     maxtasksperchild=TAREFAS_POR_WORKER)
+        return _pool
+
+
+def _matar_worker(shm):
+    """Mata só o worker que está com a tarefa: as análises dos outros workers seguem"""
+    pid = int.from_bytes(shm.buf[:BYTES_PID], "little")
+    if not pid: return  # Ainda na fila: o worker que pegá-la não acha mais o segmento e desiste
+    try:
+        os.kill(pid, getattr(signal, "SIGKILL", signal.SIGTERM))
+    except ProcessLookupError:
+        pass
+
+
+def _serializar_df(df):
+    import pyarrow as pa
+    tabela = pa.Table.from_pandas(df, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, tabela.schema) as escritor:
+        escritor.write_table(tabela)
+    return sink.getvalue()
+
+
+def executar_codigo(codigo, df, limite_cpu=None, limite_saida=None, tempo_maximo=None):
+    """Roda `codigo` num worker isolado com `df`, `pd` e `np` disponíveis.
+    Retorna o texto de `resultado` (ou None se o código não o definiu); falhas viram ErroSandbox."""
+    limite_cpu = limite_cpu or LIMITE_CPU_SEGUNDOS
+    limite_saida = limite_saida or LIMITE_SAIDA_CARACTERES
+    tempo_maximo = tempo_maximo or TEMPO_MAXIMO_SEGUNDOS
+
+    buffer = _serializar_df(df)
+    shm = shared_memory.SharedMemory(create=True, size=BYTES_PID + buffer.size)
+    try:
+        shm.buf[:BYTES_PID] = bytes(BYTES_PID)
+        # O Buffer do pyarrow expõe bytes com sinal ('b'); o segmento é 'B'
+        shm.buf[BYTES_PID:BYTES_PID + buffer.size] = memoryview(buffer).cast("B")
+        pendente = obter_pool().apply_async(
+            _executar_no_worker, (codigo, shm.name, buffer.size, limite_cpu, limite_saida)
+        )
+        try:
+            status, texto = pendente.get(timeout=tempo_maximo)
+        except mp.TimeoutError:
+            # Travado em código C (ou o worker morreu e o Pool já o substituiu)
+            _matar_worker(shm)
+            raise ErroSandbox(f"A análise não terminou em {tempo_maximo}s e foi interrompida.")
+        except Exception as e:
+            raise ErroSandbox(f"O processo de análise falhou: {e}")
+    finally:
+        shm.close()
+        shm.unlink()
+
+    if status == "erro": raise ErroSandbox(texto)
+    return texto
+
+
+def encerrar():
+    global _pool
+    with _lock_pool:
+        if _pool is not None:
+            _pool.terminate()
+            _pool = None
+
+
+atexit.register(encerrar)
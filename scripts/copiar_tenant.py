@@ -0,0 +1,46 @@
+"""Copia uma empresa do Supabase para um banco SQLite local, para replay e profiling offline.
+
+Uso:
+    python scripts/copiar_tenant.py --url https://xxx.supabase.co --key <service_role_key> \
+        --empresa <company_id> --destino metas_local.db --admin-email eu@empresa.com --admin-senha 123456
+
+Depois aponte o app para o arquivo em .streamlit/secrets.toml:
+    [backend]
+    tipo = "sqlite"
+    caminho = "metas_local.db"
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from repositorio import RepositorioSQLite, copiar_empresa, criar_repositorio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", required=True)
+    parser.add_argument("--key", required=True, help="service_role key (leitura sem RLS)")
+    parser.add_argument("--empresa", required=True, help="company_id de origem")
+    parser.add_argument("--nome", default=None, help="nome da empresa no destino")
+    parser.add_argument("--destino", default="metas_local.db")
+    parser.add_argument("--admin-email", default="admin@local")
+    parser.add_argument("--admin-senha", default="admin123")
+    args = parser.parse_args()
+
+    origem = criar_repositorio({"tipo": "supabase"}, {"url": args.url, "key": args.key})
+    destino = RepositorioSQLite(args.destino)
+
+    admin_id = destino.buscar_usuario_por_email(args.admin_email)
+    if admin_id is None:
+        admin_id = destino.cadastrar(args.admin_email, args.admin_senha).id
+
+    perms = ["Dashboard", "Extrato", "Metas", "Equipe", "Configurações"]
+    n_vendas = copiar_empresa(origem, destino, args.empresa, args.nome or args.empresa,
+                              membros=[(admin_id, args.admin_email, "admin", perms)])
+    print(f"Empresa {args.empresa} copiada para {args.destino}: {n_vendas} vendas.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Exporta vendas, metas e feriados de uma ou mais empresas para .xlsx ou .zip de CSVs.
+
+Uso:
+    python scripts/exportar.py --sqlite metas_local.db --empresa <id> [--empresa <id> ...] \
+        --inicio 2022-01-01 --fim 2025-12-31 --saida export.xlsx
+    python scripts/exportar.py --url https://xxx.supabase.co --key <service_role_key> --empresa <id> \
+        --tabelas vendas metas --saida export.zip
+
+O formato sai da extensão de --saida. As linhas vão direto para o arquivo, página a página.
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from exportacao import TABELAS_EXPORTACAO, exportar_csv_zip, exportar_xlsx
+from repositorio import criar_repositorio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sqlite", default=None, help="caminho do banco SQLite")
+    parser.add_argument("--url", default=None)
+    parser.add_argument("--key", default=None, help="service_role key")
+    parser.add_argument("--empresa", action="append", required=True, help="company_id (repita para várias)")
+    parser.add_argument("--inicio", type=date.fromisoformat, default=date(1900, 1, 1))
+    parser.add_argument("--fim", type=date.fromisoformat, default=date.today())
+    parser.add_argument("--tabelas", nargs="*", choices=list(TABELAS_EXPORTACAO), default=list(TABELAS_EXPORTACAO))
+    parser.add_argument("--saida", required=True, help=".xlsx ou .zip")
+    args = parser.parse_args()
+
+    if args.sqlite:
+        repo = criar_repositorio({"tipo": "sqlite", "caminho": args.sqlite})
+    elif args.url and args.key:
+        repo = criar_repositorio({"tipo": "supabase"}, {"url": args.url, "key": args.key})
+    else:
+        parser.error("informe --sqlite ou --url/--key")
+
+    exportar = exportar_xlsx if args.saida.lower().endswith(".xlsx") else exportar_csv_zip
+    empresas = [{"id": cid, "name": cid} for cid in args.empresa]
+    t0 = time.perf_counter()
+    contagem = exportar(args.saida, repo, empresas, args.inicio, args.fim, args.tabelas,
+                        lambda tabela, n: print(f"\r{tabela}: {n} linhas", end="", flush=True))
+    print(f"\rExportado em {time.perf_counter() - t0:.1f}s para {args.saida}: "
+          + ", ".join(f"{t} = {n}" for t, n in contagem.items()))
+
+
+if __name__ == "__main__":
+    main()
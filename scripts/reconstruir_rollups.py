@@ -0,0 +1,38 @@
+"""Reconstrói os rollups de vendas (diário/mensal/anual) a partir de vendas_diarias.
+
+Uso:
+    python scripts/reconstruir_rollups.py --sqlite metas_local.db [--empresa <company_id>]
+    python scripts/reconstruir_rollups.py --url https://xxx.supabase.co --key <service_role_key> [--empresa <company_id>]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from repositorio import criar_repositorio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sqlite", default=None, help="caminho do banco SQLite")
+    parser.add_argument("--url", default=None)
+    parser.add_argument("--key", default=None, help="service_role key")
+    parser.add_argument("--empresa", default=None, help="company_id (padrão: todas)")
+    args = parser.parse_args()
+
+    if args.sqlite:
+        repo = criar_repositorio({"tipo": "sqlite", "caminho": args.sqlite})
+    elif args.url and args.key:
+        repo = criar_repositorio({"tipo": "supabase"}, {"url": args.url, "key": args.key})
+    else:
+        parser.error("informe --sqlite ou --url/--key")
+
+    t0 = time.perf_counter()
+    repo.reconstruir_rollups(args.empresa)
+    print(f"Rollups reconstruídos em {time.perf_counter() - t0:.1f}s ({args.empresa or 'todas as empresas'}).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+-- Membros da empresa com role e permissões em uma única chamada, paginado.
+-- Substitui get_team_members + um SELECT de permissões por membro na tela Equipe.
+
+create unique index if not exists company_users_company_user_key
+    on public.company_users (company_id, user_id);
+
+create or replace function public.get_team_members_page(
+    cid uuid,
+    lim int default 25,
+    offs int default 0,
+    busca text default null
+)
+returns table (user_id uuid, email text, role text, permissions text, total bigint)
+language sql
+stable
+security definer
+set search_path = public
+as $$
+    select cu.user_id,
+           u.email::text,
+           cu.role,
+           cu.permissions::text,
+           count(*) over () as total
+    from public.company_users cu
+    join auth.users u on u.id = cu.user_id
+    where cu.company_id = cid
+      and exists (
+          select 1 from public.company_users eu
+          where eu.company_id = cid and eu.user_id = auth.uid()
+      )
+      and (busca is null or u.email ilike '%' || busca || '%')
+    order by u.email
+    limit lim offset offs;
+$$;
+
+grant execute on function public.get_team_members_page(uuid, int, int, text) to authenticated;
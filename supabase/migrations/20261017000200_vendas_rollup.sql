@@ -0,0 +1,117 @@
+-- Rollups de vendas por empresa: diário (D), mensal (M) e anual (A).
+-- total = soma das vendas; qtd = número de lançamentos; minimo/maximo = menor/maior total diário.
+-- Mantidos incrementalmente por trigger em vendas_diarias: cada escrita recalcula só o dia
+-- afetado, o mês a partir dos rollups diários (<= 31 linhas) e o ano a partir dos mensais (<= 12).
+
+create table if not exists public.vendas_rollup (
+    company_id uuid not null references public.companies(id) on delete cascade,
+    nivel char(1) not null check (nivel in ('D', 'M', 'A')),
+    periodo date not null,
+    total numeric not null default 0,
+    qtd integer not null default 0,
+    minimo numeric,
+    maximo numeric,
+    atualizado_em timestamptz not null default now(),
+    primary key (company_id, nivel, periodo)
+);
+
+alter table public.vendas_rollup enable row level security;
+
+create policy "membros leem rollups da empresa" on public.vendas_rollup
+    for select using (
+        exists (select 1 from public.company_users cu
+                where cu.company_id = vendas_rollup.company_id and cu.user_id = auth.uid())
+    );
+
+create or replace function public.atualizar_rollup_vendas(cid uuid, dia date)
+returns void
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+    mes_ini date := date_trunc('month', dia)::date;
+    ano_ini date := date_trunc('year', dia)::date;
+begin
+    delete from vendas_rollup where company_id = cid and nivel = 'D' and periodo = dia;
+    insert into vendas_rollup (company_id, nivel, periodo, total, qtd, minimo, maximo)
+        select cid, 'D', dia, sum(valor_venda), count(*), sum(valor_venda), sum(valor_venda)
+        from vendas_diarias
+        where company_id = cid and data_venda = dia
+        group by company_id;
+
+    delete from vendas_rollup where company_id = cid and nivel = 'M' and periodo = mes_ini;
+    insert into vendas_rollup (company_id, nivel, periodo, total, qtd, minimo, maximo)
+        select cid, 'M', mes_ini, sum(total), sum(qtd), min(total), max(total)
+        from vendas_rollup
+        where company_id = cid and nivel = 'D'
+          and periodo between mes_ini and (mes_ini + interval '1 month' - interval '1 day')::date
+        group by company_id;
+
+    delete from vendas_rollup where company_id = cid and nivel = 'A' and periodo = ano_ini;
+    insert into vendas_rollup (company_id, nivel, periodo, total, qtd, minimo, maximo)
+        select cid, 'A', ano_ini, sum(total), sum(qtd), min(minimo), max(maximo)
+        from vendas_rollup
+        where company_id = cid and nivel = 'M'
+          and periodo between ano_ini and (ano_ini + interval '1 year' - interval '1 day')::date
+        group by company_id;
+end;
+$$;
+
+create or replace function public.trg_vendas_rollup()
+returns trigger
+language plpgsql
+security definer
+set search_path = public
+as $$
+begin
+    if tg_op in ('UPDATE', 'DELETE') then
+        perform atualizar_rollup_vendas(old.company_id, old.data_venda);
+    end if;
+    -- Num UPDATE que não muda o dia, o recálculo de OLD já enxerga o valor novo (trigger AFTER)
+    if tg_op = 'INSERT'
+       or (tg_op = 'UPDATE' and (new.company_id, new.data_venda) is distinct from (old.company_id, old.data_venda)) then
+        perform atualizar_rollup_vendas(new.company_id, new.data_venda);
+    end if;
+    return null;
+end;
+$$;
+
+drop trigger if exists vendas_rollup_sync on public.vendas_diarias;
+create trigger vendas_rollup_sync
+    after insert or update or delete on public.vendas_diarias
+    for each row execute function public.trg_vendas_rollup();
+
+-- Reconstrução completa (backfill), para uma empresa ou para todas (cid = null)
+create or replace function public.reconstruir_rollup_vendas(cid uuid default null)
+returns void
+language plpgsql
+security definer
+set search_path = public
+as $$
+begin
+    delete from vendas_rollup where cid is null or company_id = cid;
+
+    insert into vendas_rollup (company_id, nivel, periodo, total, qtd, minimo, maximo)
+        select company_id, 'D', data_venda, sum(valor_venda), count(*), sum(valor_venda), sum(valor_venda)
+        from vendas_diarias
+        where cid is null or company_id = cid
+        group by company_id, data_venda;
+
+    insert into vendas_rollup (company_id, nivel, periodo, total, qtd, minimo, maximo)
+        select company_id, 'M', date_trunc('month', periodo)::date, sum(total), sum(qtd), min(total), max(total)
+        from vendas_rollup
+        where nivel = 'D' and (cid is null or company_id = cid)
+        group by company_id, date_trunc('month', periodo);
+
+    insert into vendas_rollup (company_id, nivel, periodo, total, qtd, minimo, maximo)
+        select company_id, 'A', date_trunc('year', periodo)::date, sum(total), sum(qtd), min(minimo), max(maximo)
+        from vendas_rollup
+        where nivel = 'M' and (cid is null or company_id = cid)
+        group by company_id, date_trunc('year', periodo);
+end;
+$$;
+
+grant execute on function public.reconstruir_rollup_vendas(uuid) to service_role;
+
+select public.reconstruir_rollup_vendas(null);
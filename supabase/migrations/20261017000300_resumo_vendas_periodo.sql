@@ -0,0 +1,17 @@
+-- Total, quantidade, menor e maior lançamento de um período qualquer, calculados no banco.
+-- Usado pelo Extrato, que pagina os lançamentos por chave (data_venda) e não carrega o período inteiro.
+-- A unique (company_id, data_venda) usada pelos upserts atende tanto este agregado quanto a paginação.
+
+create or replace function public.resumo_vendas_periodo(cid uuid, inicio date, fim date)
+returns table (total numeric, qtd bigint, minimo numeric, maximo numeric)
+language sql
+stable
+security invoker
+set search_path = public
+as $$
+    select coalesce(sum(valor_venda), 0), count(*), min(valor_venda), max(valor_venda)
+    from public.vendas_diarias
+    where company_id = cid and data_venda between inicio and fim;
+$$;
+
+grant execute on function public.resumo_vendas_periodo(uuid, date, date) to authenticated;
@@ -0,0 +1,156 @@
+-- Vendas individuais (transações), com vendedor e canal opcionais: passam a ser a origem dos dados.
+-- vendas_diarias vira o total do dia mantido por trigger (e, por ela, os rollups D/M/A) e
+-- vendas_diarias_vendedor o total por (dia, vendedor, canal). Dashboard, Extrato e Analista leem
+-- só esses agregados, então o custo das telas não cresce com o número de transações.
+--
+-- O valor único por dia de antes vira o "lançamento avulso" do dia: a transação com dia_avulso
+-- preenchido (sem vendedor/canal), única por empresa e regravada por upsert.
+
+create table if not exists public.vendas (
+    id bigint generated by default as identity primary key,
+    company_id uuid not null references public.companies(id) on delete cascade,
+    data_venda date not null,
+    valor_venda numeric not null,
+    vendedor text,
+    canal text,
+    dia_avulso date check (dia_avulso is null or dia_avulso = data_venda),
+    created_at timestamptz not null default now(),
+    unique (company_id, dia_avulso)
+);
+
+create index if not exists vendas_company_data_idx on public.vendas (company_id, data_venda);
+
+alter table public.vendas enable row level security;
+
+create policy "membros leem vendas da empresa" on public.vendas
+    for select using (
+        exists (select 1 from public.company_users cu
+                where cu.company_id = vendas.company_id and cu.user_id = auth.uid())
+    );
+
+create policy "lançadores gravam vendas da empresa" on public.vendas
+    for all using (
+        exists (select 1 from public.company_users cu
+                where cu.company_id = vendas.company_id and cu.user_id = auth.uid()
+                  and cu.role in ('admin', 'data_entry'))
+    ) with check (
+        exists (select 1 from public.company_users cu
+                where cu.company_id = vendas.company_id and cu.user_id = auth.uid()
+                  and cu.role in ('admin', 'data_entry'))
+    );
+
+alter table public.vendas_diarias add column if not exists qtd integer not null default 1;
+
+create table if not exists public.vendas_diarias_vendedor (
+    company_id uuid not null references public.companies(id) on delete cascade,
+    data_venda date not null,
+    vendedor text not null default '',
+    canal text not null default '',
+    total numeric not null default 0,
+    qtd integer not null default 0,
+    primary key (company_id, data_venda, vendedor, canal)
+);
+
+alter table public.vendas_diarias_vendedor enable row level security;
+
+create policy "membros leem vendas por vendedor da empresa" on public.vendas_diarias_vendedor
+    for select using (
+        exists (select 1 from public.company_users cu
+                where cu.company_id = vendas_diarias_vendedor.company_id and cu.user_id = auth.uid())
+    );
+
+-- Backfill antes dos triggers: cada dia existente vira o lançamento avulso daquele dia
+insert into public.vendas (company_id, data_venda, valor_venda, dia_avulso)
+    select company_id, data_venda, valor_venda, data_venda from public.vendas_diarias
+    on conflict (company_id, dia_avulso) do nothing;
+
+insert into public.vendas_diarias_vendedor (company_id, data_venda, vendedor, canal, total, qtd)
+    select company_id, data_venda, '', '', valor_venda, 1 from public.vendas_diarias
+    on conflict do nothing;
+
+-- Agregados atualizados por diferença, uma vez por comando: uma importação em lote soma cada
+-- (empresa, dia) numa única escrita em vendas_diarias, em vez de uma por transação
+create or replace function public.trg_vendas_agregados()
+returns trigger
+language plpgsql
+security definer
+set search_path = public
+as $$
+begin
+    if tg_op in ('UPDATE', 'DELETE') then
+        update vendas_diarias d set valor_venda = d.valor_venda - a.total, qtd = d.qtd - a.qtd
+            from (select company_id, data_venda, sum(valor_venda) as total, count(*) as qtd
+                  from antigas group by company_id, data_venda) a
+            where d.company_id = a.company_id and d.data_venda = a.data_venda;
+        update vendas_diarias_vendedor d set total = d.total - a.total, qtd = d.qtd - a.qtd
+            from (select company_id, data_venda, coalesce(vendedor, '') as vendedor, coalesce(canal, '') as canal,
+                         sum(valor_venda) as total, count(*) as qtd
+                  from antigas group by 1, 2, 3, 4) a
+            where d.company_id = a.company_id and d.data_venda = a.data_venda
+              and d.vendedor = a.vendedor and d.canal = a.canal;
+    end if;
+
+    if tg_op in ('INSERT', 'UPDATE') then
+        insert into vendas_diarias (company_id, data_venda, valor_venda, qtd)
+            select company_id, data_venda, sum(valor_venda), count(*) from novas group by company_id, data_venda
+            on conflict (company_id, data_venda) do update
+                set valor_venda = vendas_diarias.valor_venda + excluded.valor_venda,
+                    qtd = vendas_diarias.qtd + excluded.qtd;
+        insert into vendas_diarias_vendedor (company_id, data_venda, vendedor, canal, total, qtd)
+            select company_id, data_venda, coalesce(vendedor, ''), coalesce(canal, ''), sum(valor_venda), count(*)
+            from novas group by 1, 2, 3, 4
+            on conflict (company_id, data_venda, vendedor, canal) do update
+                set total = vendas_diarias_vendedor.total + excluded.total,
+                    qtd = vendas_diarias_vendedor.qtd + excluded.qtd;
+    end if;
+
+    -- Dias (ou vendedores no dia) que ficaram sem vendas saem dos agregados
+    if tg_op in ('UPDATE', 'DELETE') then
+        delete from vendas_diarias d
+            using (select distinct company_id, data_venda from antigas) a
+            where d.company_id = a.company_id and d.data_venda = a.data_venda and d.qtd <= 0;
+        delete from vendas_diarias_vendedor d
+            using (select distinct company_id, data_venda from antigas) a
+            where d.company_id = a.company_id and d.data_venda = a.data_venda and d.qtd <= 0;
+    end if;
+    return null;
+end;
+$$;
+
+drop trigger if exists vendas_agregados_ins on public.vendas;
+create trigger vendas_agregados_ins
+    after insert on public.vendas
+    referencing new table as novas
+    for each statement execute function public.trg_vendas_agregados();
+
+drop trigger if exists vendas_agregados_upd on public.vendas;
+create trigger vendas_agregados_upd
+    after update on public.vendas
+    referencing old table as antigas new table as novas
+    for each statement execute function public.trg_vendas_agregados();
+
+drop trigger if exists vendas_agregados_del on public.vendas;
+create trigger vendas_agregados_del
+    after delete on public.vendas
+    referencing old table as antigas
+    for each statement execute function public.trg_vendas_agregados();
+
+-- vendas_diarias agora só muda pelos triggers acima
+revoke insert, update, delete on public.vendas_diarias from anon, authenticated;
+
+-- Total e quantidade de vendas por vendedor e canal num período, somados dos agregados diários
+create or replace function public.vendas_por_vendedor(cid uuid, inicio date, fim date)
+returns table (vendedor text, canal text, total numeric, qtd bigint)
+language sql
+stable
+security invoker
+set search_path = public
+as $$
+    select vendedor, canal, sum(total), sum(qtd)::bigint
+    from public.vendas_diarias_vendedor
+    where company_id = cid and data_venda between inicio and fim
+    group by vendedor, canal
+    order by sum(total) desc;
+$$;
+
+grant execute on function public.vendas_por_vendedor(uuid, date, date) to authenticated;
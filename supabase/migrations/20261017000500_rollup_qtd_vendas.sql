@@ -0,0 +1,80 @@
+-- Com as transações, vendas_diarias tem uma linha por dia com a própria quantidade de vendas (qtd).
+-- Os rollups e o resumo do Extrato passam a somar essa coluna em vez de contar linhas (dias).
+
+create or replace function public.atualizar_rollup_vendas(cid uuid, dia date)
+returns void
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+    mes_ini date := date_trunc('month', dia)::date;
+    ano_ini date := date_trunc('year', dia)::date;
+begin
+    delete from vendas_rollup where company_id = cid and nivel = 'D' and periodo = dia;
+    insert into vendas_rollup (company_id, nivel, periodo, total, qtd, minimo, maximo)
+        select cid, 'D', dia, sum(valor_venda), sum(qtd), sum(valor_venda), sum(valor_venda)
+        from vendas_diarias
+        where company_id = cid and data_venda = dia
+        group by company_id;
+
+    delete from vendas_rollup where company_id = cid and nivel = 'M' and periodo = mes_ini;
+    insert into vendas_rollup (company_id, nivel, periodo, total, qtd, minimo, maximo)
+        select cid, 'M', mes_ini, sum(total), sum(qtd), min(total), max(total)
+        from vendas_rollup
+        where company_id = cid and nivel = 'D'
+          and periodo between mes_ini and (mes_ini + interval '1 month' - interval '1 day')::date
+        group by company_id;
+
+    delete from vendas_rollup where company_id = cid and nivel = 'A' and periodo = ano_ini;
+    insert into vendas_rollup (company_id, nivel, periodo, total, qtd, minimo, maximo)
+        select cid, 'A', ano_ini, sum(total), sum(qtd), min(minimo), max(maximo)
+        from vendas_rollup
+        where company_id = cid and nivel = 'M'
+          and periodo between ano_ini and (ano_ini + interval '1 year' - interval '1 day')::date
+        group by company_id;
+end;
+$$;
+
+create or replace function public.reconstruir_rollup_vendas(cid uuid default null)
+returns void
+language plpgsql
+security definer
+set search_path = public
+as $$
+begin
+    delete from vendas_rollup where cid is null or company_id = cid;
+
+    insert into vendas_rollup (company_id, nivel, periodo, total, qtd, minimo, maximo)
+        select company_id, 'D', data_venda, sum(valor_venda), sum(qtd), sum(valor_venda), sum(valor_venda)
+        from vendas_diarias
+        where cid is null or company_id = cid
+        group by company_id, data_venda;
+
+    insert into vendas_rollup (company_id, nivel, periodo, total, qtd, minimo, maximo)
+        select company_id, 'M', date_trunc('month', periodo)::date, sum(total), sum(qtd), min(total), max(total)
+        from vendas_rollup
+        where nivel = 'D' and (cid is null or company_id = cid)
+        group by company_id, date_trunc('month', periodo);
+
+    insert into vendas_rollup (company_id, nivel, periodo, total, qtd, minimo, maximo)
+        select company_id, 'A', date_trunc('year', periodo)::date, sum(total), sum(qtd), min(minimo), max(maximo)
+        from vendas_rollup
+        where nivel = 'M' and (cid is null or company_id = cid)
+        group by company_id, date_trunc('year', periodo);
+end;
+$$;
+
+create or replace function public.resumo_vendas_periodo(cid uuid, inicio date, fim date)
+returns table (total numeric, qtd bigint, minimo numeric, maximo numeric)
+language sql
+stable
+security invoker
+set search_path = public
+as $$
+    select coalesce(sum(valor_venda), 0), coalesce(sum(qtd), 0)::bigint, min(valor_venda), max(valor_venda)
+    from public.vendas_diarias
+    where company_id = cid and data_venda between inicio and fim;
+$$;
+
+select public.reconstruir_rollup_vendas(null);
@@ -0,0 +1,8 @@
+-- Chave de deduplicação das vendas importadas de planilha (data, valor, vendedor, canal e a
+-- ocorrência da linha no arquivo): reimportar o mesmo arquivo não duplica as transações.
+-- Vendas digitadas na tela ficam com a chave nula, que nunca conflita.
+
+alter table public.vendas add column if not exists chave_importacao text;
+
+alter table public.vendas drop constraint if exists vendas_company_chave_importacao_key;
+alter table public.vendas add constraint vendas_company_chave_importacao_key unique (company_id, chave_importacao);
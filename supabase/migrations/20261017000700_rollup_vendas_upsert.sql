@@ -0,0 +1,57 @@
+-- Duas escritas do mesmo mês em transações separadas (ex.: a fila de escritas gravando dias
+-- diferentes em paralelo) recalculavam o mesmo rollup M/A com delete + insert: sob READ COMMITTED
+-- o segundo insert batia na chave primária. O recálculo de uma empresa agora é serializado por
+-- um advisory lock da transação (quem espera relê os rollups já gravados pela outra) e as linhas
+-- são gravadas por upsert; período que ficou sem vendas sai do rollup.
+
+create or replace function public.atualizar_rollup_vendas(cid uuid, dia date)
+returns void
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+    mes_ini date := date_trunc('month', dia)::date;
+    ano_ini date := date_trunc('year', dia)::date;
+begin
+    perform pg_advisory_xact_lock(hashtextextended('vendas_rollup:' || cid::text, 0));
+
+    insert into vendas_rollup (company_id, nivel, periodo, total, qtd, minimo, maximo)
+        select cid, 'D', dia, sum(valor_venda), sum(qtd), sum(valor_venda), sum(valor_venda)
+        from vendas_diarias
+        where company_id = cid and data_venda = dia
+        group by company_id
+    on conflict (company_id, nivel, periodo) do update
+        set total = excluded.total, qtd = excluded.qtd, minimo = excluded.minimo,
+            maximo = excluded.maximo, atualizado_em = now();
+    if not found then
+        delete from vendas_rollup where company_id = cid and nivel = 'D' and periodo = dia;
+    end if;
+
+    insert into vendas_rollup (company_id, nivel, periodo, total, qtd, minimo, maximo)
+        select cid, 'M', mes_ini, sum(total), sum(qtd), min(total), max(total)
+        from vendas_rollup
+        where company_id = cid and nivel = 'D'
+          and periodo between mes_ini and (mes_ini + interval '1 month' - interval '1 day')::date
+        group by company_id
+    on conflict (company_id, nivel, periodo) do update
+        set total = excluded.total, qtd = excluded.qtd, minimo = excluded.minimo,
+            maximo = excluded.maximo, atualizado_em = now();
+    if not found then
+        delete from vendas_rollup where company_id = cid and nivel = 'M' and periodo = mes_ini;
+    end if;
+
+    insert into vendas_rollup (company_id, nivel, periodo, total, qtd, minimo, maximo)
+        select cid, 'A', ano_ini, sum(total), sum(qtd), min(minimo), max(maximo)
+        from vendas_rollup
+        where company_id = cid and nivel = 'M'
+          and periodo between ano_ini and (ano_ini + interval '1 year' - interval '1 day')::date
+        group by company_id
+    on conflict (company_id, nivel, periodo) do update
+        set total = excluded.total, qtd = excluded.qtd, minimo = excluded.minimo,
+            maximo = excluded.maximo, atualizado_em = now();
+    if not found then
+        delete from vendas_rollup where company_id = cid and nivel = 'A' and periodo = ano_ini;
+    end if;
+end;
+$$;
@@ -0,0 +1,8 @@
+-- As funções de rollup são SECURITY DEFINER e só devem rodar pelo trigger (atualizar) ou pelo
+-- service_role (reconstruir). O EXECUTE padrão de PUBLIC, e o que o Supabase dá a anon e
+-- authenticated, deixava qualquer chamador reconstruir os rollups de todas as empresas ou
+-- recalcular os de outra empresa.
+
+revoke execute on function public.atualizar_rollup_vendas(uuid, date) from public, anon, authenticated;
+revoke execute on function public.reconstruir_rollup_vendas(uuid) from public, anon, authenticated;
+grant execute on function public.reconstruir_rollup_vendas(uuid) to service_role;
@@ -0,0 +1,29 @@
+-- Alterações de role/permissões da tela Equipe num único comando: uma ida ao banco para o lote
+-- e tudo ou nada (antes, um UPDATE do PostgREST por membro). Só atualiza quem ainda é membro:
+-- quem foi removido nesse meio tempo continua fora. Restrito aos administradores da empresa.
+-- `membros` = [{"user_id", "role", "permissions"}]; jsonb_populate_recordset converte cada campo
+-- para o tipo da coluna em company_users.
+
+create or replace function public.atualizar_membros_empresa(cid uuid, membros jsonb)
+returns void
+language plpgsql
+security definer
+set search_path = public
+as $$
+begin
+    if not exists (
+        select 1 from company_users eu
+        where eu.company_id = cid and eu.user_id = auth.uid() and eu.role = 'admin'
+    ) then
+        raise exception 'Apenas administradores da empresa alteram membros' using errcode = '42501';
+    end if;
+
+    update company_users cu
+        set role = m.role, permissions = m.permissions
+        from jsonb_populate_recordset(null::company_users, membros) m
+        where cu.company_id = cid and cu.user_id = m.user_id;
+end;
+$$;
+
+revoke execute on function public.atualizar_membros_empresa(uuid, jsonb) from public, anon;
+grant execute on function public.atualizar_membros_empresa(uuid, jsonb) to authenticated;
@@ -0,0 +1,19 @@
+-- Com várias vendas por dia, qtd (vendas) deixou de ser o número de linhas que o Extrato pagina.
+-- O resumo passa a trazer também dias = linhas de vendas_diarias no período, usado na paginação.
+-- Mudar as colunas do retorno exige recriar a função.
+
+drop function if exists public.resumo_vendas_periodo(uuid, date, date);
+
+create function public.resumo_vendas_periodo(cid uuid, inicio date, fim date)
+returns table (total numeric, qtd bigint, dias bigint, minimo numeric, maximo numeric)
+language sql
+stable
+security invoker
+set search_path = public
+as $$
+    select coalesce(sum(valor_venda), 0), coalesce(sum(qtd), 0)::bigint, count(*), min(valor_venda), max(valor_venda)
+    from public.vendas_diarias
+    where company_id = cid and data_venda between inicio and fim;
+$$;
+
+grant execute on function public.resumo_vendas_periodo(uuid, date, date) to authenticated;
@@ -0,0 +1,31 @@
+-- A busca por e-mail da tela Equipe é um trecho literal: % e _ digitados não funcionam como curingas.
+
+create or replace function public.get_team_members_page(
+    cid uuid,
+    lim int default 25,
+    offs int default 0,
+    busca text default null
+)
+returns table (user_id uuid, email text, role text, permissions text, total bigint)
+language sql
+stable
+security definer
+set search_path = public
+as $$
+    select cu.user_id,
+           u.email::text,
+           cu.role,
+           cu.permissions::text,
+           count(*) over () as total
+    from public.company_users cu
+    join auth.users u on u.id = cu.user_id
+    where cu.company_id = cid
+      and exists (
+          select 1 from public.company_users eu
+          where eu.company_id = cid and eu.user_id = auth.uid()
+      )
+      and (busca is null
+           or u.email ilike '%' || replace(replace(replace(busca, '\', '\\'), '%', '\%'), '_', '\_') || '%' escape '\')
+    order by u.email
+    limit lim offset offs;
+$$;
@@ -0,0 +1,41 @@
+"""Exportação de planilhas (Extrato e Visão Consolidada). Fora do núcleo: só as páginas que
+exportam importam o módulo de exportação."""
+import tempfile
+from datetime import date
+
+import streamlit as st
+
+from exportacao import TABELAS_EXPORTACAO, exportar_csv_zip, exportar_xlsx
+from nucleo import repo
+
+def render_exportacao(empresas, chave, inicio=None, fim=None):
+    """Exporta vendas/metas/feriados das empresas. Sem período informado, pede um intervalo"""
+    with st.expander("⬇️ Exportar planilha"):
+        if inicio is None:
+            hoje = date.today()
+            intervalo = st.date_input("De / Até", value=(date(hoje.year, 1, 1), hoje), format="DD/MM/YYYY", key=f"{chave}_int")
+            if not intervalo: return
+            inicio, fim = intervalo[0], intervalo[-1]
+        else:
+            st.caption(f"Período: {inicio:%d/%m/%Y} a {fim:%d/%m/%Y}")
+        tabelas = st.multiselect("Dados", list(TABELAS_EXPORTACAO), default=["vendas"], format_func=TABELAS_EXPORTACAO.get, key=f"{chave}_tab")
+        formato = st.radio("Formato", ["Excel (.xlsx)", "CSV (.zip)"], horizontal=True, key=f"{chave}_fmt")
+        if not tabelas or not st.button("Gerar arquivo", key=f"{chave}_gerar"): return
+
+        aviso = st.empty()
+        ao_progredir = lambda tabela, n: aviso.caption(f"⏳ {TABELAS_EXPORTACAO[tabela]}: {n} linhas...")
+        excel = formato.startswith("Excel")
+        # O arquivo é montado em disco; só o resultado final vai para o download
+        with tempfile.TemporaryFile() as arquivo:
+            exportar = exportar_xlsx if excel else exportar_csv_zip
+            contagem = exportar(arquivo, repo, empresas, inicio, fim, tabelas, ao_progredir)
+            arquivo.flush()
+            aviso.caption(" · ".join(f"{TABELAS_EXPORTACAO[t]}: {n} linhas" for t, n in contagem.items()))
+            nome = f"metas_{inicio:%Y%m%d}_{fim:%Y%m%d}.{'xlsx' if excel else 'zip'}"
+            # O download recebe o arquivo aberto, sem uma cópia em bytes aqui; o st.download_button aceita
+            # arquivos abertos só para leitura, então o mesmo descritor é reaberto em modo "rb"
+            with open(arquivo.fileno(), "rb", closefd=False) as leitura:
+                st.download_button(
+                    "💾 Baixar arquivo", leitura, file_name=nome, key=f"{chave}_baixar",
+                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet" if excel else "application/zip"
+                )
@@ -0,0 +1,18 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from repositorio import RepositorioSQLite
+
+
+@pytest.fixture
+def repo():
+    return RepositorioSQLite(":memory:")
+
+
+@pytest.fixture
+def empresa(repo):
+    return repo.criar_empresa("Empresa Teste")
@@ -0,0 +1,51 @@
+from datetime import date
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from calendario_uteis import CalendarioUteis
+
+SEG_A_SEX = [0, 1, 2, 3, 4]
+
+
+def test_dias_uteis_do_mes_com_feriado():
+    # Março/2026: 22 dias de segunda a sexta; 2026-03-10 (terça) é feriado e 2026-03-14 (sábado) não conta
+    cal = CalendarioUteis(SEG_A_SEX, ["2026-03-10", "2026-03-14"])
+    uteis = cal.dias_uteis_meses([2026], [3], referencia=date(2026, 3, 1))
+    assert (uteis["total"][0], uteis["decorridos"][0], uteis["restantes"][0]) == (21, 0, 21)
+
+
+@pytest.mark.parametrize("referencia, decorridos", [
+    (date(2026, 2, 15), 0),   # antes do mês: nada decorrido
+    (date(2026, 3, 2), 0),    # primeiro dia útil: hoje ainda é restante
+    (date(2026, 3, 3), 1),
+    (date(2026, 3, 31), 21),  # último dia do mês (útil): só ele resta
+    (date(2026, 4, 1), 22),   # mês encerrado: nada resta
+])
+def test_referencia_nas_bordas_do_mes(referencia, decorridos):
+    cal = CalendarioUteis(SEG_A_SEX, [])
+    uteis = cal.dias_uteis_meses([2026], [3], referencia=referencia)
+    assert uteis["decorridos"][0] == decorridos
+    assert uteis["restantes"][0] == 22 - decorridos
+
+
+def test_varios_meses_numa_chamada_e_virada_de_ano():
+    cal = CalendarioUteis(SEG_A_SEX + [5], ["2026-01-01"])
+    uteis = cal.dias_uteis_meses([2025, 2026, 2026], [12, 1, 2], referencia=date(2026, 1, 1))
+    assert uteis["total"].tolist() == [27, 26, 24]
+    assert uteis["restantes"].tolist() == [0, 26, 24]
+
+
+def test_semana_sem_dia_de_trabalho():
+    cal = CalendarioUteis([], ["2026-03-10"])
+    assert cal.dias_uteis_restantes(2026, 3, date(2026, 3, 1)) == 0
+    assert not cal.eh_dia_util(["2026-03-10", "2026-03-11"]).any()
+    assert np.isnat(cal.proximo_dia_util(["2026-03-10"])).all()
+
+
+def test_proximo_dia_util_pula_fim_de_semana_e_feriado():
+    cal = CalendarioUteis(SEG_A_SEX, ["2026-03-16"])
+    proximos = cal.proximo_dia_util(["2026-03-12", "2026-03-13", "2026-03-14", "2026-03-16"])
+    assert proximos.astype(str).tolist() == ["2026-03-13", "2026-03-17", "2026-03-17", "2026-03-17"]
+
@@ -0,0 +1,34 @@
+from datetime import date
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+from paginas.edicao_feriados import diff_feriados
+
+
+def test_diff_feriados():
+    orig = pd.DataFrame({"id": [1, 2, 3], "data": ["2026-01-01", "2026-04-21", "2026-12-25"],
+                         "descricao": ["Ano Novo", "Tiradentes", "Natal"]})
+    editado = pd.DataFrame({
+        "id": [1, 2, None],
+        "data": [date(2026, 1, 1), date(2026, 4, 22), date(2026, 11, 2)],  # 2 mudou de data; 3 saiu
+        "descricao": ["Confraternização", "Tiradentes", " Finados "],
+    })
+    erros, upserts, ids_del = diff_feriados(orig, editado)
+    assert erros == []
+    assert sorted(ids_del) == [2, 3]
+    assert sorted(upserts, key=lambda u: u["data"]) == [
+        {"data": "2026-01-01", "descricao": "Confraternização"},
+        {"data": "2026-04-22", "descricao": "Tiradentes"},
+        {"data": "2026-11-02", "descricao": "Finados"},
+    ]
+
+
+def test_diff_feriados_recusa_linhas_invalidas():
+    orig = pd.DataFrame({"id": [1], "data": ["2026-01-01"], "descricao": ["Ano Novo"]})
+    editado = pd.DataFrame({"id": [1, None, None], "data": [date(2026, 1, 1), date(2026, 1, 1), None],
+                            "descricao": ["Ano Novo", "", "Sem data"]})
+    erros, upserts, ids_del = diff_feriados(orig, editado)
+    assert erros == ["Há feriados sem data.", "Há feriados sem nome.", "Datas duplicadas: 01/01/2026"]
+    assert (upserts, ids_del) == ([], [])
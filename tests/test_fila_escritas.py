@@ -0,0 +1,83 @@
+import threading
+import time
+
+from fila_escritas import FilaEscritas
+
+
+def esperar(condicao, timeout=5):
+    limite = time.monotonic() + timeout
+    while not condicao():
+        assert time.monotonic() < limite, "tempo esgotado"
+        time.sleep(0.005)
+
+
+def test_envios_da_mesma_chave_se_fundem_enquanto_esperam():
+    fila = FilaEscritas(workers=1, espera_base=0)
+    liberar, gravados = threading.Event(), []
+    fila.enviar(("c", "bloqueio"), liberar.wait)
+    esperar(lambda: fila.em_aberto(("c", "bloqueio"))[0].status == "gravando")
+
+    for valor in (1, 2, 3):
+        fila.enviar(("c", "venda", "2026-03-10"), gravados.append, valor, dados={"valor": valor})
+    assert [e.dados["valor"] for e in fila.em_aberto(("c", "venda"))] == [3]
+
+    liberar.set()
+    esperar(lambda: not fila.em_aberto(("c",)))
+    assert gravados == [3]
+
+
+def test_mesma_chave_nao_roda_em_paralelo_e_segue_a_ordem():
+    fila = FilaEscritas(workers=2, espera_base=0)
+    liberar, gravados = threading.Event(), []
+
+    def primeira():
+        liberar.wait()
+        gravados.append("primeira")
+
+    fila.enviar(("c", "venda", "d"), primeira)
+    esperar(lambda: fila.em_aberto(("c",))[0].status == "gravando")
+    fila.enviar(("c", "venda", "d"), gravados.append, "segunda")
+    time.sleep(0.05)  # o segundo worker está livre, mas a chave está ocupada
+    assert gravados == []
+
+    liberar.set()
+    esperar(lambda: not fila.em_aberto(("c",)))
+    assert gravados == ["primeira", "segunda"]
+
+
+def test_nova_tentativa_ate_gravar():
+    fila = FilaEscritas(workers=1, tentativas=3, espera_base=0)
+    chamadas, gravou = [], threading.Event()
+
+    def instavel():
+        chamadas.append(1)
+        if len(chamadas) < 3: raise ConnectionError("rede")
+
+    escrita = fila.enviar(("c", "venda", "d"), instavel, ao_gravar=gravou.set)
+    assert gravou.wait(5)
+    assert (escrita.status, escrita.tentativas) == ("ok", 3)
+    assert fila.falhas(("c",)) == []
+
+
+def test_falha_fica_visivel_para_o_autor_ate_reenviar_ou_descartar():
+    fila = FilaEscritas(workers=1, tentativas=2, espera_base=0)
+    falhar = [True]
+
+    def gravar():
+        if falhar[0]: raise ValueError("recusado")
+
+    escrita = fila.enviar(("c", "venda", "d"), gravar, autor="ana")
+    esperar(lambda: fila.falhas(("c",)))
+    assert (escrita.status, escrita.tentativas, escrita.erro) == ("falhou", 2, "recusado")
+    assert fila.falhas(("c",), autor="bruno") == []
+
+    falhar[0] = False
+    nova = fila.reenviar(escrita)
+    assert fila.falhas(("c",)) == []
+    esperar(lambda: nova.status == "ok")
+
+    falhar[0] = True
+    fila.enviar(("c", "venda", "e"), gravar)
+    esperar(lambda: fila.falhas(("c",)))
+    fila.descartar(("c", "venda", "e"))
+    assert fila.falhas(("c",)) == []
@@ -0,0 +1,28 @@
+from datetime import date
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+from importacao_vendas import validar_bloco
+
+
+def test_chaves_estaveis_entre_importacoes_e_blocos():
+    arquivo = pd.DataFrame({
+        "Data": ["2026-03-10", "2026-03-10", "10/03/2026", "2026-03-11"],
+        "Valor": ["100,00", "100.00", "50", "20"],
+        "Vendedor": ["Ana", "Ana", "Ana", ""],
+    })
+
+    def importar(tamanho_bloco):
+        chaves, ocorrencias = [], {}
+        for inicio in range(0, len(arquivo), tamanho_bloco):
+            bloco = arquivo.iloc[inicio:inicio + tamanho_bloco].reset_index(drop=True)
+            validas, erros = validar_bloco(bloco, date(2026, 3, 31), inicio + 2, set(), ocorrencias)
+            assert erros.empty
+            chaves += [v["chave_importacao"] for v in validas]
+        return chaves
+
+    inteiro = importar(10)
+    assert len(set(inteiro)) == 4  # duas vendas iguais no mesmo dia continuam sendo duas
+    assert importar(1) == inteiro
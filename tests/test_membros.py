@@ -0,0 +1,23 @@
+def test_atualizar_membros_nao_recria_removido(repo, empresa):
+    ana = repo.cadastrar("ana@teste", "senha")
+    bruno = repo.cadastrar("bruno@teste", "senha")
+    repo.adicionar_membro(empresa, ana.id, "viewer", ["Dashboard"])
+    repo.adicionar_membro(empresa, bruno.id, "viewer", ["Dashboard"])
+    repo.remover_membros(empresa, [bruno.id])
+
+    repo.atualizar_membros(empresa, [
+        {"user_id": ana.id, "role": "data_entry", "permissions": ["Dashboard", "Relatorio Antigo"]},
+        {"user_id": bruno.id, "role": "admin", "permissions": ["Dashboard"]},
+    ])
+    assert repo.get_membro(empresa, ana.id)['role'] == "data_entry"
+    assert "Relatorio Antigo" in repo.get_membro(empresa, ana.id)['permissions']
+    assert repo.get_membro(empresa, bruno.id) is None
+
+
+def test_busca_de_membros_e_literal(repo, empresa):
+    for email in ("ana_lima@teste", "anaxlima@teste", "100%@teste"):
+        repo.adicionar_membro(empresa, repo.cadastrar(email, "senha").id, "viewer", ["Dashboard"])
+
+    assert [m['email'] for m in repo.listar_membros(empresa, 10, 0, "ana_")] == ["ana_lima@teste"]
+    assert [m['email'] for m in repo.listar_membros(empresa, 10, 0, "%")] == ["100%@teste"]
+    assert len(repo.listar_membros(empresa, 10, 0, "lima")) == 2
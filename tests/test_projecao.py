@@ -0,0 +1,87 @@
+from datetime import date, timedelta
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from calendario_uteis import CalendarioUteis
+from projecao import projetar_empresas, projetar_mes
+
+SEG_A_SEX = [0, 1, 2, 3, 4]
+
+
+def historico(cal, inicio, fim, valor_por_dia_semana):
+    """Dias úteis em [inicio, fim) com um valor fixo por dia da semana"""
+    dias = [inicio + timedelta(days=i) for i in range((fim - inicio).days)]
+    dias = [d for d in dias if cal.eh_dia_util([d])[0]]
+    return [str(d) for d in dias], [float(valor_por_dia_semana[d.weekday()]) for d in dias]
+
+
+def test_historico_constante_por_dia_da_semana_da_projecao_exata():
+    cal = CalendarioUteis(SEG_A_SEX, ["2026-03-20"])
+    valores_semana = {0: 100, 1: 200, 2: 300, 3: 400, 4: 500}
+    hoje = date(2026, 3, 16)  # segunda, ainda sem venda
+    datas, valores = historico(cal, date(2025, 9, 1), hoje, valores_semana)
+    realizado = sum(v for d, v in zip(datas, valores) if d >= "2026-03-01")
+
+    p = projetar_mes(cal, datas, valores, 2026, 3, meta=realizado + 3000, referencia=hoje, simulacoes=200,
+                     rng=np.random.default_rng(1))
+
+    # Restam 16-31/03 sem a sexta 20 (feriado): 11 dias úteis
+    restantes = [d for d in (date(2026, 3, 16) + timedelta(days=i) for i in range(16)) if cal.eh_dia_util([d])[0]]
+    esperado = realizado + sum(valores_semana[d.weekday()] for d in restantes)
+    assert p["dias_restantes"].astype(str).tolist() == [str(d) for d in restantes]
+    assert p["realizado"] == realizado
+    assert p["banda"] == {10: esperado, 50: esperado, 90: esperado}
+    assert p["projecao"] == pytest.approx(esperado)
+    assert p["probabilidade"] == (1.0 if esperado >= realizado + 3000 else 0.0)
+    # Meta restante repartida pelo peso de cada dia da semana
+    assert p["alvo_dias"].sum() == pytest.approx(3000)
+    assert p["alvo_proximo"] == pytest.approx(3000 * 100 / sum(valores_semana[d.weekday()] for d in restantes))
+
+
+def test_hoje_com_venda_conta_como_realizado():
+    cal = CalendarioUteis(SEG_A_SEX, [])
+    hoje = date(2026, 3, 16)
+    datas, valores = historico(cal, date(2025, 12, 1), hoje + timedelta(days=1), {d: 10 for d in range(5)})
+    p = projetar_mes(cal, datas, valores, 2026, 3, meta=0, referencia=hoje, simulacoes=10)
+    assert str(p["dias_restantes"][0]) == "2026-03-17"
+    assert p["probabilidade"] is None
+
+
+def test_mes_encerrado_e_sem_historico():
+    cal = CalendarioUteis(SEG_A_SEX, [])
+    datas, valores = ["2026-02-02", "2026-02-03"], [50.0, 70.0]
+    p = projetar_mes(cal, datas, valores, 2026, 2, meta=100, referencia=date(2026, 3, 5), simulacoes=10)
+    assert p["dias_restantes"].size == 0
+    assert (p["realizado"], p["banda"][50], p["probabilidade"]) == (120.0, 120.0, 1.0)
+
+    assert projetar_mes(cal, [], [], 2026, 3, meta=100, referencia=date(2026, 3, 5)) is None
+
+
+def test_dia_da_semana_com_poucas_amostras_sorteia_no_historico_inteiro():
+    # Sábado passa a ser dia de trabalho agora: sem histórico de sábados, sorteia entre todos os dias
+    cal = CalendarioUteis(SEG_A_SEX + [5], [])
+    hoje = date(2026, 3, 28)  # sábado
+    dias_semana = CalendarioUteis(SEG_A_SEX, [])
+    datas, valores = historico(dias_semana, date(2025, 10, 1), hoje, {d: 100 for d in range(5)})
+    p = projetar_mes(cal, datas, valores, 2026, 3, meta=0, referencia=hoje, simulacoes=50)
+    assert p["dias_restantes"].astype(str).tolist() == ["2026-03-28", "2026-03-30", "2026-03-31"]
+    # O histórico tem zeros nos sábados passados (agora úteis, sem venda) e 100 nos demais dias
+    assert p["banda"][10] >= p["realizado"] + 100
+
+
+def test_lote_igual_a_uma_chamada_por_empresa():
+    cal = CalendarioUteis(SEG_A_SEX, [])
+    hoje = date(2026, 3, 16)
+    rng = np.random.default_rng(7)
+    entradas = {}
+    for cid in ("a", "b"):
+        datas, _ = historico(cal, date(2025, 10, 1), hoje, {d: 0 for d in range(5)})
+        entradas[cid] = (cal, datas, rng.gamma(4.0, 250.0, len(datas)).tolist(), 20000.0)
+    lote = projetar_empresas(entradas, 2026, 3, hoje, simulacoes=2000, seed=3)
+    for cid, (c, datas, valores, meta) in entradas.items():
+        p = lote[cid]
+        assert p["banda"][10] <= p["banda"][50] <= p["banda"][90]
+        assert 0 <= p["probabilidade"] <= 1
+        assert p["alvo_dias"].sum() == pytest.approx(max(0.0, meta - p["realizado"]))
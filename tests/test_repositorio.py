@@ -0,0 +1,41 @@
+import pytest
+
+from repositorio import RepositorioSQLite, copiar_empresa
+
+
+def test_cadastro_e_login(repo):
+    usuario = repo.cadastrar("ana@exemplo.com", "segredo")
+    assert repo.entrar("ana@exemplo.com", "segredo").id == usuario.id
+    with pytest.raises(ValueError):
+        repo.entrar("ana@exemplo.com", "errada")
+
+
+def test_metas_e_feriados_sobrescrevem_a_mesma_chave(repo, empresa):
+    repo.salvar_meta(empresa, 2026, 3, 1000.0)
+    repo.salvar_meta(empresa, 2026, 3, 1500.0)
+    assert [m['meta_mensal'] for m in repo.listar_metas(empresa)] == [1500.0]
+
+    repo.salvar_feriados(empresa, [{"data": "2026-04-21", "descricao": "Tiradentes"}])
+    repo.salvar_feriados(empresa, [{"data": "2026-04-21", "descricao": "Feriado"}])
+    assert [(f['data'], f['descricao']) for f in repo.listar_feriados(empresa)] == [("2026-04-21", "Feriado")]
+
+
+def test_copiar_empresa_entre_backends(repo, empresa):
+    usuario = repo.cadastrar("ana@exemplo.com", "segredo")
+    repo.adicionar_membro(empresa, usuario.id, "admin", ["dashboard"])
+    repo.salvar_config_dias(empresa, [0, 1, 2, 3, 4])
+    repo.salvar_feriados(empresa, [{"data": "2026-04-21", "descricao": "Tiradentes"}])
+    repo.salvar_meta(empresa, 2026, 3, 1000.0)
+    repo.salvar_venda(empresa, "2026-03-10", 100.0)
+    repo.registrar_vendas(empresa, [{"data_venda": "2026-03-10", "valor_venda": 40.0, "vendedor": "Ana"}])
+
+    destino = RepositorioSQLite(":memory:")
+    membros = [(usuario.id, "ana@exemplo.com", "admin", ["dashboard"])]
+    assert copiar_empresa(repo, destino, empresa, "Cópia", membros) == 2
+
+    assert destino.get_membro(empresa, usuario.id)['role'] == "admin"
+    assert destino.get_meta(empresa, 2026, 3)['meta_mensal'] == 1000.0
+    assert [f['data'] for f in destino.listar_feriados(empresa)] == ["2026-04-21"]
+    sem_id = lambda linhas: [{k: v for k, v in l.items() if k != 'id'} for l in linhas]
+    assert sem_id(destino.listar_transacoes(empresa)) == sem_id(repo.listar_transacoes(empresa))
+    assert destino.buscar_venda(empresa, "2026-03-10")['valor_venda'] == 140.0
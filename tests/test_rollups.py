@@ -0,0 +1,75 @@
+from datetime import date
+
+from repositorio import RECONSTRUIR_ROLLUPS_SQLITE
+
+
+def rollup(repo, cid, nivel, periodo):
+    linhas = repo.listar_rollups(cid, nivel, periodo, periodo)
+    return linhas[0] if linhas else None
+
+
+def test_duas_vendas_no_mesmo_dia_contam_duas(repo, empresa):
+    repo.registrar_vendas(empresa, [
+        {"data_venda": "2026-03-10", "valor_venda": 100.0, "vendedor": "Ana", "canal": "Loja"},
+        {"data_venda": "2026-03-10", "valor_venda": 50.0, "vendedor": "Bruno", "canal": "Online"},
+    ])
+    dia = rollup(repo, empresa, 'D', date(2026, 3, 10))
+    assert (dia['total'], dia['qtd']) == (150, 2)
+    assert rollup(repo, empresa, 'M', date(2026, 3, 1))['qtd'] == 2
+    assert rollup(repo, empresa, 'A', date(2026, 1, 1))['qtd'] == 2
+    resumo = repo.resumo_vendas(empresa, date(2026, 3, 1), date(2026, 3, 31))
+    assert (resumo['qtd'], resumo['dias']) == (2, 1)
+
+
+def test_rollups_acompanham_edicao_e_exclusao(repo, empresa):
+    repo.salvar_venda(empresa, "2026-03-10", 100.0)
+    repo.registrar_vendas(empresa, [{"data_venda": "2026-03-10", "valor_venda": 40.0, "vendedor": "Ana"}])
+    repo.salvar_venda(empresa, "2026-03-11", 70.0)
+
+    repo.salvar_venda(empresa, "2026-03-10", 120.0)  # regrava o avulso do dia
+    dia = rollup(repo, empresa, 'D', date(2026, 3, 10))
+    assert (dia['total'], dia['qtd']) == (160, 2)
+    mes = rollup(repo, empresa, 'M', date(2026, 3, 1))
+    assert (mes['total'], mes['qtd'], mes['minimo'], mes['maximo']) == (230, 3, 70, 160)
+
+    repo.excluir_vendas_dia(empresa, "2026-03-10")
+    assert rollup(repo, empresa, 'D', date(2026, 3, 10)) is None
+    assert repo.buscar_venda(empresa, "2026-03-10") is None
+    mes = rollup(repo, empresa, 'M', date(2026, 3, 1))
+    assert (mes['total'], mes['qtd']) == (70, 1)
+
+
+def test_reconstrucao_igual_aos_triggers(repo, empresa):
+    repo.registrar_vendas(empresa, [
+        {"data_venda": d, "valor_venda": v, "vendedor": "Ana"}
+        for d, v in [("2025-12-31", 10.0), ("2026-01-02", 20.0), ("2026-01-02", 30.0), ("2026-02-15", 5.0)]
+    ])
+    antes = repo.listar_rollups(empresa, 'D', date(2025, 1, 1), date(2026, 12, 31))
+    antes += repo.listar_rollups(empresa, 'A', date(2025, 1, 1), date(2026, 12, 31))
+    repo.reconstruir_rollups(empresa)
+    depois = repo.listar_rollups(empresa, 'D', date(2025, 1, 1), date(2026, 12, 31))
+    depois += repo.listar_rollups(empresa, 'A', date(2025, 1, 1), date(2026, 12, 31))
+    assert antes == depois
+    assert "count(*)" not in RECONSTRUIR_ROLLUPS_SQLITE
+
+
+def test_vendas_por_vendedor(repo, empresa):
+    repo.registrar_vendas(empresa, [
+        {"data_venda": "2026-03-10", "valor_venda": 100.0, "vendedor": "Ana", "canal": "Loja"},
+        {"data_venda": "2026-03-11", "valor_venda": 60.0, "vendedor": "Ana", "canal": "Loja"},
+        {"data_venda": "2026-03-11", "valor_venda": 50.0, "vendedor": "Bruno"},
+    ])
+    resumo = repo.resumo_vendedores(empresa, date(2026, 3, 1), date(2026, 3, 31))
+    assert [(r['vendedor'], r['canal'], r['total'], r['qtd']) for r in resumo] == [("Ana", "Loja", 160, 2), ("Bruno", "", 50, 1)]
+
+
+def test_chave_importacao_repetida_nao_duplica(repo, empresa):
+    linhas = [
+        {"data_venda": "2026-03-10", "valor_venda": 100.0, "vendedor": "Ana", "chave_importacao": "a"},
+        {"data_venda": "2026-03-10", "valor_venda": 100.0, "vendedor": "Ana", "chave_importacao": "b"},
+    ]
+    assert repo.registrar_vendas(empresa, linhas) == 2
+    assert repo.registrar_vendas(empresa, linhas) == 0
+    assert repo.registrar_vendas(empresa, [{"data_venda": "2026-03-10", "valor_venda": 5.0}] * 2) == 2
+    dia = rollup(repo, empresa, 'D', date(2026, 3, 10))
+    assert (dia['total'], dia['qtd']) == (210, 4)
@@ -0,0 +1,51 @@
+import threading
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("pyarrow")
+
+from sandbox_analista import ErroSandbox, executar_codigo
+
+
+@pytest.fixture(scope="module")
+def df():
+    return pd.DataFrame({"data_venda": ["2026-03-10", "2026-03-11"], "valor_venda": [100.0, 50.5]})
+
+
+def test_resultado_volta_como_texto(df):
+    assert executar_codigo("resultado = df['valor_venda'].sum()", df) == "150.5"
+    assert executar_codigo("x = len(df)", df) is None
+
+
+def test_import_fora_da_lista_e_bloqueado(df):
+    with pytest.raises(ErroSandbox, match="Módulo não permitido na análise: os"):
+        executar_codigo("import os\nresultado = os.getcwd()", df)
+
+
+def test_limite_de_cpu(df):
+    with pytest.raises(ErroSandbox, match="limite de 1s de processamento"):
+        executar_codigo("while True: pass", df, limite_cpu=1, tempo_maximo=15)
+    # O worker segue vivo e com o limite restaurado
+    assert executar_codigo("resultado = len(df)", df) == "2"
+
+
+def test_saida_truncada(df):
+    texto = executar_codigo("resultado = 'x' * 100", df, limite_saida=10)
+    assert texto == "x" * 10 + "\n\n*(resposta truncada)*"
+
+
+def test_worker_travado_nao_derruba_as_outras_analises(df):
+    outra = {}
+
+    def outra_analise():
+        outra["texto"] = executar_codigo("resultado = sum(range(3_000_000))", df)
+
+    paralela = threading.Thread(target=outra_analise)
+    with pytest.raises(ErroSandbox, match="não terminou em 1s"):
+        paralela.start()
+        executar_codigo("while True: pass", df, limite_cpu=60, tempo_maximo=1)
+    paralela.join()
+    assert outra["texto"] == str(sum(range(3_000_000)))
+    # O Pool repõe o worker morto
+    assert executar_codigo("resultado = df.shape", df) == "(2, 2)"